@@ -0,0 +1,216 @@
+import os
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from frame_pool import reuse
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+# 回放模式: paced 按原始时间戳回放（模拟实时摄像头）, unthrottled 不限速（测最大吞吐量）
+PACED = "paced"
+UNTHROTTLED = "unthrottled"
+
+
+class CameraSource:
+    """摄像头帧源，Windows下使用DirectShow后端"""
+    live = True
+
+    def __init__(self, index=0, width=640, height=480, fps=30):
+        backend = cv2.CAP_DSHOW if sys.platform.startswith("win") else cv2.CAP_ANY
+        self.cap = cv2.VideoCapture(index, backend)
+        if self.cap.isOpened():
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            self.cap.set(cv2.CAP_PROP_FPS, fps)
+        self.name = f"摄像头 {index}"
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def read(self, image=None):
+        return self.cap.read(image)
+
+    def release(self):
+        self.cap.release()
+
+
+class _PacedSource:
+    """回放帧源基类：paced模式下按帧时间戳等待，unthrottled模式下立即返回"""
+
+    def __init__(self, mode):
+        if mode not in (PACED, UNTHROTTLED):
+            raise ValueError(f"未知回放模式: {mode}")
+        self.mode = mode
+        self.live = mode == PACED  # 按原速回放时与摄像头一样当作实时源
+        self._start = None
+
+    def _wait_until(self, media_time):
+        if self.mode != PACED:
+            return
+        now = time.perf_counter()
+        if self._start is None:
+            self._start = now - media_time
+        delay = self._start + media_time - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def set(self, prop, value):
+        return False
+
+
+class VideoFileSource(_PacedSource):
+    """视频文件帧源 (MP4/AVI 等)"""
+
+    def __init__(self, path, mode=PACED):
+        super().__init__(mode)
+        self.cap = cv2.VideoCapture(path)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self._index = 0
+        self.name = os.path.basename(path)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self, image=None):
+        ret, frame = self.cap.read(image)
+        if ret:
+            # 读帧后 POS_MSEC 才是刚解码这一帧的时间戳（读之前是上一帧的），缺失时按帧率推算
+            media_time = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            if media_time <= 0 and self._index > 0:
+                media_time = self._index / self.fps
+            self._wait_until(media_time)
+            self._index += 1
+        return ret, frame
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageSequenceSource(_PacedSource):
+    """图片序列帧源：按文件名顺序读取目录下的 PNG/JPEG"""
+
+    def __init__(self, directory, mode=PACED, fps=30.0):
+        super().__init__(mode)
+        self.files = sorted(
+            os.path.join(directory, f) for f in os.listdir(directory)
+            if f.lower().endswith(IMAGE_EXTENSIONS))
+        self.fps = fps
+        self._index = 0
+        self.name = os.path.basename(os.path.normpath(directory))
+
+    def isOpened(self):
+        return len(self.files) > 0
+
+    def read(self, image=None):
+        if self._index >= len(self.files):
+            return False, None
+        frame = cv2.imread(self.files[self._index])
+        if frame is None:
+            return False, None
+        self._wait_until(self._index / self.fps)
+        self._index += 1
+        return True, frame
+
+    def release(self):
+        self.files = []
+
+
+def open_source(spec=0, mode=PACED, width=640, height=480, fps=30):
+    """
+    根据描述打开帧源
+    :param spec: 摄像头编号(int或数字字符串)、视频文件路径或图片目录
+    :param mode: PACED 或 UNTHROTTLED（仅对文件/图片序列有效）
+    """
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return CameraSource(int(spec), width, height, fps)
+    if os.path.isdir(spec):
+        return ImageSequenceSource(spec, mode, fps)
+    return VideoFileSource(spec, mode)
+
+
+class FrameGrabber:
+    """独立采集线程：单槽信箱只保留最新一帧，推理线程总是拿到最新画面"""
+
+    def __init__(self, cap):
+        self.cap = cap
+        self._cond = threading.Condition()
+        self._frame = None      # 信箱中的最新帧
+        self._back = None       # 采集线程写入的后台缓冲，与信箱交替使用
+        self._timestamp = 0.0   # 帧到达时间 (time.perf_counter)
+        self._seq = 0           # 帧序号，从1开始
+        self._ok = True
+        self._thread = None
+        self.running = False
+
+        # 统计信息
+        self.captured = 0       # 采集到的总帧数
+        self.dropped = 0        # 未被消费就被新帧覆盖的帧数
+        self._consumed_seq = 0
+
+    def start(self):
+        # 驱动缓冲区只留1帧，避免积压旧画面（部分后端不支持，忽略返回值）
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while self.running:
+            # 直接解码到后台缓冲，采集稳定后不再分配新数组
+            ret, frame = self.cap.read(self._back)
+            now = time.perf_counter()
+            with self._cond:
+                if not ret:
+                    self._ok = False
+                    self.running = False
+                    self._cond.notify_all()
+                    break
+                if self._seq > self._consumed_seq:
+                    self.dropped += 1
+                self._back = self._frame
+                self._frame = frame
+                self._timestamp = now
+                self._seq += 1
+                self.captured += 1
+                self._cond.notify_all()
+
+    def read(self, out=None, timeout=1.0):
+        """
+        阻塞等待比上次读取更新的一帧，并拷贝到调用方的缓冲中
+        :param out: 调用方预分配的缓冲，尺寸不符时重新分配
+        :return: (ret, frame, timestamp, seq)，超时或采集结束时ret为False
+        """
+        with self._cond:
+            if not self._cond.wait_for(
+                    lambda: self._seq > self._consumed_seq or not self._ok, timeout):
+                return False, None, 0.0, self._consumed_seq
+            if self._seq <= self._consumed_seq:
+                return False, None, 0.0, self._consumed_seq
+            self._consumed_seq = self._seq
+            # 信箱缓冲之后会被采集线程复用，必须在锁内拷贝出去
+            out = reuse(out, self._frame.shape, self._frame.dtype)
+            np.copyto(out, self._frame)
+            return True, out, self._timestamp, self._seq
+
+    def stats(self):
+        """返回采集统计: 总帧数、丢弃帧数、丢帧率"""
+        with self._cond:
+            rate = self.dropped / self.captured if self.captured else 0.0
+            return {"captured": self.captured, "dropped": self.dropped, "drop_rate": rate}
+
+    def stop(self):
+        self.running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        with self._cond:
+            self._ok = False
+            self._cond.notify_all()
@@ -6,6 +6,9 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout
                              QGroupBox, QCheckBox, QTextEdit, QSpinBox)
 from PyQt5.QtCore import QThread, pyqtSignal
 
+MAX_LINE = 256  # 单行最大长度
+
+
 class SerialThread(QThread):
     data_received = pyqtSignal(str)
     connection_status = pyqtSignal(bool)
@@ -16,6 +19,8 @@ class SerialThread(QThread):
         self.baudrate = baudrate
         self.serial_conn = None
         self.running = False
+        self._stopping = False  # stop() 主动关闭时读取异常不再报告
+        self._pending = b''  # 超时时尚未收完的半行
         
     def run(self):
         if not self.port:
@@ -26,26 +31,38 @@ class SerialThread(QThread):
             self.serial_conn = serial.Serial(
                 port=self.port,
                 baudrate=self.baudrate,
-                timeout=1
+                timeout=0.2
             )
             self.connection_status.emit(True)
             self.running = True
             
+            # 阻塞读取一行（超时后检查停止标志），空闲时不占CPU；单行长度有上限
             while self.running:
-                if self.serial_conn.in_waiting:
-                    data = self.serial_conn.readline().decode('utf-8').strip()
-                    if data:
-                        self.data_received.emit(data)
+                line = self.serial_conn.read_until(b'\n', MAX_LINE)
+                if not line.endswith(b'\n'):
+                    # 超时的半行留到下次拼接，超长行丢弃
+                    pending = self._pending + line
+                    self._pending = pending if len(pending) <= MAX_LINE else b''
+                    continue
+                data = (self._pending + line).decode('utf-8', errors='replace').strip()
+                self._pending = b''
+                if data:
+                    self.data_received.emit(data)
                         
         except Exception as e:
-            self.connection_status.emit(False)
-            self.data_received.emit(f"Error: {str(e)}")
+            if not self._stopping:
+                self.connection_status.emit(False)
+                self.data_received.emit(f"Error: {str(e)}")
             
     def stop(self):
+        # 先让读取线程退出，再关闭串口
+        self._stopping = True
         self.running = False
         if self.serial_conn and self.serial_conn.is_open:
-            self.serial_conn.close()
+            self.serial_conn.cancel_read()
         self.wait()
+        if self.serial_conn and self.serial_conn.is_open:
+            self.serial_conn.close()
         
     def send_data(self, data):
         if self.serial_conn and self.serial_conn.is_open:
@@ -72,6 +89,7 @@ class HandControlApp(QMainWindow):
         serial_layout = QHBoxLayout()
         
         self.port_combo = QComboBox()
+        self.port_combo.setEditable(True)  # 可手动输入串口，如仿真下位机的伪终端 /tmp/ttyHAND0
         self.refresh_ports()
         
         self.baudrate_combo = QComboBox()
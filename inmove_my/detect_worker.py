@@ -0,0 +1,155 @@
+import multiprocessing
+import queue
+from collections import deque
+from multiprocessing import shared_memory
+
+import mediapipe as mp
+import numpy as np
+
+from hand_detector import HandDetector, NUM_LANDMARKS, EMPTY_RESULTS, results_from_array
+
+
+def _worker_main(shm_name, slots, shape, detector_kwargs, requests, responses):
+    """子进程：从共享内存取帧做MediaPipe推理，只回传关键点数组"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    frames = np.ndarray((slots,) + shape, dtype=np.uint8, buffer=shm.buf)
+    detector = HandDetector(**detector_kwargs)
+    responses.put("ready")
+    try:
+        while True:
+            msg = requests.get()
+            if msg is None:
+                break
+            seq, slot = msg
+            detector.findHands(frames[slot], draw=False)
+            results = detector.results
+            landmarks = detector._landmark_array()
+            labels = list(detector.handedness) if results.multi_hand_landmarks else []
+            responses.put((seq, landmarks, labels, dict(getattr(detector, 'roi_stats', {}))))
+    finally:
+        detector.close()
+        del frames
+        shm.close()
+
+
+class RemoteHandDetector:
+    """
+    在独立进程中运行HandDetector，接口与HandDetector一致
+    帧通过共享内存环传递，只有关键点数组经队列返回，避免与GUI线程争抢GIL
+    """
+
+    # 结果已还原成MediaPipe结构，直接复用本地实现
+    findPosition = HandDetector.findPosition
+    findLandmarks = HandDetector.findLandmarks
+
+    def __init__(self, slots=2, **detector_kwargs):
+        self.mpHands = mp.solutions.hands
+        self.mpDraw = mp.solutions.drawing_utils
+
+        self.slots = slots
+        self.detector_kwargs = detector_kwargs
+        self.roiMode = detector_kwargs.get('roiMode', False)
+        self.rgbInput = detector_kwargs.get('rgbInput', False)
+        self.roi_stats = {}
+        self.handedness = None
+        self.results = EMPTY_RESULTS
+        self.landmarks = np.zeros((0, NUM_LANDMARKS, 3), dtype=np.float32)
+
+        self._shape = None
+        self._shm = None
+        self._frames = None
+        self._process = None
+        self._requests = None
+        self._responses = None
+        self._free_slots = deque()
+        self._pending = {}      # seq -> slot
+        self._ready = deque()   # 为腾出槽位提前取回、尚未被result()返回的结果
+        self._seq = 0
+
+    def _start(self, shape):
+        self.close()
+        ctx = multiprocessing.get_context("spawn")
+        self._shape = shape
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slots * int(np.prod(shape)))
+        self._frames = np.ndarray((self.slots,) + shape, dtype=np.uint8, buffer=self._shm.buf)
+        self._requests = ctx.Queue()
+        self._responses = ctx.Queue()
+        self._free_slots = deque(range(self.slots))
+        self._pending = {}
+        self._ready.clear()
+        self._process = ctx.Process(
+            target=_worker_main,
+            args=(self._shm.name, self.slots, shape, self.detector_kwargs,
+                  self._requests, self._responses),
+            daemon=True)
+        self._process.start()
+        # 等待子进程导入MediaPipe并加载模型
+        if self._responses.get(timeout=60) != "ready":
+            raise RuntimeError("推理进程启动失败")
+
+    def submit(self, frame):
+        """把帧写入空闲槽位并提交推理，返回序号；槽位用尽时先等待最早的结果，暂存到下次result()返回"""
+        if frame.shape != self._shape:
+            self._start(frame.shape)
+        if not self._free_slots:
+            self._ready.append(self._receive(timeout=5.0))
+        slot = self._free_slots.popleft()
+        np.copyto(self._frames[slot], frame)
+        self._seq += 1
+        self._pending[self._seq] = slot
+        self._requests.put((self._seq, slot))
+        return self._seq
+
+    def result(self, timeout=5.0):
+        """等待下一个推理结果，返回 (seq, landmarks, labels)，landmarks为(hands, 21, 3)归一化坐标"""
+        if self._ready:
+            seq, landmarks, labels, roi_stats = self._ready.popleft()
+        else:
+            seq, landmarks, labels, roi_stats = self._receive(timeout)
+        self.roi_stats = roi_stats
+        return seq, landmarks, labels
+
+    def _receive(self, timeout):
+        """从子进程取回一个结果并释放其槽位"""
+        try:
+            seq, landmarks, labels, roi_stats = self._responses.get(timeout=timeout)
+        except queue.Empty:
+            if self._process is not None and not self._process.is_alive():
+                raise RuntimeError("推理进程已退出")
+            raise
+        self._free_slots.append(self._pending.pop(seq))
+        return seq, landmarks, labels, roi_stats
+
+    def findHands(self, frame, draw=True):
+        seq = self.submit(frame)
+        while True:
+            done, landmarks, labels = self.result()
+            if done == seq:
+                break
+        self.landmarks = landmarks
+        self.results = results_from_array(landmarks, labels)
+
+        if self.results.multi_hand_landmarks:
+            self.handedness = list(labels)
+            if draw:
+                for hand_landmarks in self.results.multi_hand_landmarks:
+                    self.mpDraw.draw_landmarks(frame, hand_landmarks, self.mpHands.HAND_CONNECTIONS)
+        return frame
+
+    def _landmark_array(self):
+        # 子进程已经回传数组，无需再从结果结构转换
+        return self.landmarks
+
+    def close(self):
+        if self._process is not None:
+            self._requests.put(None)
+            self._process.join(timeout=2.0)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+        if self._shm is not None:
+            self._frames = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+        self._shape = None
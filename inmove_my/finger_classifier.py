@@ -0,0 +1,219 @@
+import os
+import time
+
+import numpy as np
+
+from finger_state import FINGER_CHAINS, CHAIN_SLOTS, fingers_bent
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATASET_PATH = os.path.join(_HERE, "finger_dataset.npz")
+DEFAULT_CLASSIFIER_PATH = os.path.join(_HERE, "finger_model.npz")
+
+PALM_BASE = 9
+THUMB_TIP = 4
+THUMB_TARGETS = [5, 9, 17]      # 食指/中指/小指根部，拇指内收时指尖靠近它们
+NUM_FEATURES = 15 + 5 + 3
+
+
+def finger_features(landmarks):
+    """
+    与旋转、尺度、左右手都无关的特征，不依赖 handType 标签
+    15个关节弯曲角 + 5个指尖到手腕距离 + 拇指尖到3个指根距离（距离以手掌长度为单位）
+    :param landmarks: (hands, 21, 3) 像素坐标
+    :return: float32 (hands, 23)
+    """
+    points = np.asarray(landmarks, dtype=np.float32)
+    chains = points[:, FINGER_CHAINS]
+    bones = chains[:, :, 1:] - chains[:, :, :-1]
+    bones /= np.linalg.norm(bones, axis=-1, keepdims=True) + 1e-6
+    cos = np.einsum("hfjc,hfjc->hfj", bones[:, :, :-1], bones[:, :, 1:])
+    angles = np.arccos(np.clip(cos, -1.0, 1.0)).reshape(len(points), -1)
+
+    size = np.linalg.norm(points[:, PALM_BASE] - points[:, 0], axis=-1, keepdims=True) + 1e-6
+    tips = np.linalg.norm(chains[:, :, -1] - points[:, :1], axis=-1) / size
+    thumb = np.linalg.norm(points[:, THUMB_TARGETS] - points[:, THUMB_TIP:THUMB_TIP + 1], axis=-1) / size
+    return np.concatenate([angles, tips, thumb], axis=1)
+
+
+class FingerClassifier:
+    """
+    小型MLP（一层tanh隐层 + 每根手指一个sigmoid输出），纯NumPy训练和推理
+    predict 与 fingers_bent 输出格式一致，可直接替换启发式判断
+    """
+
+    def __init__(self, hidden=16):
+        self.hidden = hidden
+        self.mean = np.zeros(NUM_FEATURES, dtype=np.float32)
+        self.std = np.ones(NUM_FEATURES, dtype=np.float32)
+        rng = np.random.default_rng(0)
+        self.w1 = (rng.standard_normal((NUM_FEATURES, hidden)) / np.sqrt(NUM_FEATURES)).astype(np.float32)
+        self.b1 = np.zeros(hidden, dtype=np.float32)
+        self.w2 = (rng.standard_normal((hidden, len(CHAIN_SLOTS))) / np.sqrt(hidden)).astype(np.float32)
+        self.b2 = np.zeros(len(CHAIN_SLOTS), dtype=np.float32)
+
+    def _forward(self, x):
+        h = np.tanh(x @ self.w1 + self.b1)
+        return h, 1.0 / (1.0 + np.exp(-(h @ self.w2 + self.b2)))
+
+    def fit(self, landmarks, labels, epochs=2000, lr=0.01, l2=1e-4):
+        """
+        全批量Adam训练
+        :param labels: bool (N, 6)，顺序同 FINGER_NAMES（手腕列忽略）
+        :return: 最终训练损失
+        """
+        x = finger_features(landmarks)
+        y = np.asarray(labels, dtype=np.float32)[:, CHAIN_SLOTS]
+        self.mean = x.mean(axis=0)
+        self.std = x.std(axis=0) + 1e-6
+        x = (x - self.mean) / self.std
+
+        params = [self.w1, self.b1, self.w2, self.b2]
+        m = [np.zeros_like(p) for p in params]
+        v = [np.zeros_like(p) for p in params]
+        loss = 0.0
+        for step in range(1, epochs + 1):
+            h, p = self._forward(x)
+            loss = -np.mean(y * np.log(p + 1e-7) + (1 - y) * np.log(1 - p + 1e-7))
+            d_out = (p - y) / len(x)
+            d_h = (d_out @ self.w2.T) * (1 - h * h)
+            grads = [x.T @ d_h + l2 * self.w1, d_h.sum(axis=0),
+                     h.T @ d_out + l2 * self.w2, d_out.sum(axis=0)]
+            for i, (param, grad) in enumerate(zip(params, grads)):
+                m[i] = 0.9 * m[i] + 0.1 * grad
+                v[i] = 0.999 * v[i] + 0.001 * grad * grad
+                param -= lr * (m[i] / (1 - 0.9 ** step)) / (np.sqrt(v[i] / (1 - 0.999 ** step)) + 1e-8)
+        return float(loss)
+
+    def predict_proba(self, landmarks):
+        """(hands, 21, 3) -> float32 (hands, 6) 各手指弯曲概率，手腕恒为0"""
+        proba = np.zeros((len(landmarks), 6), dtype=np.float32)
+        if len(landmarks) == 0:
+            return proba
+        _, p = self._forward((finger_features(landmarks) - self.mean) / self.std)
+        proba[:, CHAIN_SLOTS] = p
+        return proba
+
+    def predict(self, landmarks, handTypes=None):
+        """与 fingers_bent 同签名，handTypes 不参与判断"""
+        return self.predict_proba(landmarks) > 0.5
+
+    def save(self, path=DEFAULT_CLASSIFIER_PATH):
+        np.savez(path, mean=self.mean, std=self.std, w1=self.w1, b1=self.b1, w2=self.w2, b2=self.b2)
+
+    @classmethod
+    def load(cls, path=DEFAULT_CLASSIFIER_PATH):
+        with np.load(path) as data:
+            model = cls(hidden=data["w1"].shape[1])
+            for name in ("mean", "std", "w1", "b1", "w2", "b2"):
+                setattr(model, name, data[name].astype(np.float32))
+        return model
+
+
+def load_dataset(path=DEFAULT_DATASET_PATH):
+    """:return: (landmarks (N,21,3), handTypes (N,), labels bool (N,6))"""
+    with np.load(path) as data:
+        return data["landmarks"], data["handTypes"], data["labels"]
+
+
+def save_dataset(path, landmarks, handTypes, labels, append=True):
+    """保存标注帧，append 时与已有数据集合并"""
+    landmarks = np.asarray(landmarks, dtype=np.float32).reshape(-1, 21, 3)
+    handTypes = np.asarray(handTypes, dtype=str)
+    labels = np.asarray(labels, dtype=bool).reshape(-1, 6)
+    if append and os.path.exists(path):
+        old_landmarks, old_types, old_labels = load_dataset(path)
+        landmarks = np.concatenate([old_landmarks, landmarks])
+        handTypes = np.concatenate([old_types, handTypes])
+        labels = np.concatenate([old_labels, labels])
+    np.savez_compressed(path, landmarks=landmarks, handTypes=handTypes, labels=labels)
+    return len(labels)
+
+
+def compare(landmarks, handTypes, labels, test_ratio=0.2, seed=0, **fit_kwargs):
+    """
+    在同一测试集上比较启发式判断与学习分类器的准确率和单帧耗时
+    :return: {"heuristic": {...}, "classifier": {...}}
+    """
+    order = np.random.default_rng(seed).permutation(len(labels))
+    split = int(len(order) * (1 - test_ratio))
+    train, test = order[:split], order[split:]
+    model = FingerClassifier()
+    model.fit(landmarks[train], labels[train], **fit_kwargs)
+
+    results = {}
+    for name, predict in (("heuristic", fingers_bent), ("classifier", model.predict)):
+        predicted = predict(landmarks[test], handTypes[test])
+        correct = predicted[:, CHAIN_SLOTS] == labels[test][:, CHAIN_SLOTS]
+        # 单帧（一只手）耗时，与实际运行时的调用方式一致
+        sample, sample_type = landmarks[test[:1]], handTypes[test[:1]]
+        start = time.perf_counter()
+        for _ in range(1000):
+            predict(sample, sample_type)
+        results[name] = {
+            "finger_accuracy": float(correct.mean()),
+            "frame_accuracy": float(correct.all(axis=1).mean()),
+            "per_finger": correct.mean(axis=0).round(3).tolist(),
+            "us_per_frame": (time.perf_counter() - start) * 1000,
+        }
+    return model, results
+
+
+if __name__ == "__main__":
+    # 数据集导出 / 训练 / 对比：
+    #   python finger_classifier.py export --source 0 --label 011111     摆好手势后录制，整段使用同一标签
+    #   python finger_classifier.py export --source video.mp4            无标签时用当前启发式结果作为标签
+    #   python finger_classifier.py train                                训练并保存模型
+    #   python finger_classifier.py compare                              启发式 vs 分类器 准确率和速度
+    import argparse
+
+    import cv2
+
+    parser = argparse.ArgumentParser(description="手指状态分类器")
+    parser.add_argument("command", choices=["export", "train", "compare"])
+    parser.add_argument("--dataset", default=DEFAULT_DATASET_PATH)
+    parser.add_argument("--model", default=DEFAULT_CLASSIFIER_PATH)
+    parser.add_argument("--source", default="0", help="摄像头编号、视频文件或图片目录")
+    parser.add_argument("--label", default=None, help="整段录制的6位标签，顺序同 FINGER_NAMES")
+    parser.add_argument("--frames", type=int, default=300, help="最多导出帧数")
+    parser.add_argument("--epochs", type=int, default=2000)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        from capture import open_source, UNTHROTTLED
+        from hand_detector import HandDetector
+
+        cap = open_source(args.source, UNTHROTTLED)
+        detector = HandDetector(maxHands=2, detectionCon=0.7)
+        rows = ([], [], [])
+        while len(rows[0]) < args.frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frame = cv2.flip(frame, 1)  # 与 VideoThread 一致先镜像
+            detector.findHands(frame, draw=False)
+            _, landmarks, handTypes = detector.findLandmarks(frame)
+            if not len(landmarks):
+                continue
+            if args.label:
+                labels = np.tile([c == "1" for c in args.label], (len(landmarks), 1))
+            else:
+                labels = fingers_bent(landmarks, handTypes)
+            rows[0].extend(landmarks)
+            rows[1].extend(handTypes)
+            rows[2].extend(labels)
+        cap.release()
+        detector.close()
+        total = save_dataset(args.dataset, *rows)
+        print(f"导出 {len(rows[0])} 帧，数据集共 {total} 帧: {args.dataset}")
+    elif args.command == "train":
+        landmarks, _, labels = load_dataset(args.dataset)
+        model = FingerClassifier()
+        loss = model.fit(landmarks, labels, epochs=args.epochs)
+        model.save(args.model)
+        print(f"训练完成: {len(labels)} 帧, loss {loss:.4f}, 模型 {args.model}")
+    else:
+        landmarks, handTypes, labels = load_dataset(args.dataset)
+        _, results = compare(landmarks, handTypes, labels, epochs=args.epochs)
+        for name, info in results.items():
+            print(f"{name:>10}: 单指准确率 {info['finger_accuracy']:.1%}, 整手准确率 {info['frame_accuracy']:.1%}, "
+                  f"各指 {info['per_finger']}, {info['us_per_frame']:.1f}us/帧")
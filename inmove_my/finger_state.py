@@ -0,0 +1,154 @@
+import numpy as np
+
+# 下位机指令顺序: 手腕, 食指, 中指, 无名指, 拇指, 小指
+FINGER_NAMES = ["手腕", "食指", "中指", "无名指", "拇指", "小指"]
+WRIST, INDEX, MIDDLE, RING, THUMB, PINKY = range(6)
+
+# 四指(食指、中指、无名指、小指)的指尖和PIP关节编号，以及在指令中的位置
+FOUR_TIPS = np.array([8, 12, 16, 20])
+FOUR_PIPS = np.array([6, 10, 14, 18])
+FOUR_SLOTS = np.array([INDEX, MIDDLE, RING, PINKY])
+THUMB_TIP, THUMB_IP = 4, 3
+
+# 检测在未镜像的帧上进行，关键点x坐标和左右手标签镜像后与镜像画面一致
+MIRROR = np.array([-1, 1, 1], dtype=np.float32)
+MIRRORED_LABEL = {"Left": "Right", "Right": "Left"}
+
+
+def fingers_bent(landmarks, handTypes):
+    """
+    根据关键点判断各手指是否弯曲（向量化，一次处理所有手）
+    :param landmarks: (hands, 21, 3) 像素或归一化坐标，x/y同一坐标系即可
+    :param handTypes: 每只手的左右标签 "Left"/"Right"
+    :return: bool (hands, 6)，顺序同 FINGER_NAMES，手腕恒为False
+    """
+    landmarks = np.asarray(landmarks)
+    bent = np.zeros((len(landmarks), 6), dtype=bool)
+    if len(landmarks) == 0:
+        return bent
+
+    # 四指：指尖低于PIP关节（图像y向下）视为弯曲
+    bent[:, FOUR_SLOTS] = landmarks[:, FOUR_TIPS, 1] > landmarks[:, FOUR_PIPS, 1]
+
+    # 拇指：按左右手比较指尖与IP关节的x坐标
+    labels = np.asarray(handTypes, dtype=object)
+    dx = landmarks[:, THUMB_TIP, 0] - landmarks[:, THUMB_IP, 0]
+    bent[:, THUMB] = ((labels == "Left") & (dx <= 0)) | ((labels == "Right") & (dx > 0))
+    return bent
+
+# 各手指关节链：腕 -> 根部关节 -> 中间关节 -> 末端关节 -> 指尖，按指令顺序排列
+FINGER_CHAINS = np.array([
+    [0, 5, 6, 7, 8],        # 食指
+    [0, 9, 10, 11, 12],     # 中指
+    [0, 13, 14, 15, 16],    # 无名指
+    [0, 1, 2, 3, 4],        # 拇指
+    [0, 17, 18, 19, 20],    # 小指
+])
+CHAIN_SLOTS = np.array([INDEX, MIDDLE, RING, THUMB, PINKY])
+
+# 三个关节弯曲角之和（弧度）在伸直/握紧时的典型值，用于归一化到0~1，可按使用者标定
+REST_ANGLE = np.array([0.25, 0.25, 0.25, 0.60, 0.25], dtype=np.float32)
+FULL_ANGLE = np.array([4.00, 4.20, 4.00, 1.90, 3.80], dtype=np.float32)
+
+
+def finger_flexion(landmarks):
+    """
+    由关节角计算每根手指的连续弯曲程度（向量化，一次处理所有手）
+    :param landmarks: (hands, 21, 3) 像素坐标（x/y/z同尺度，见 HandDetector.findLandmarks）
+    :return: float32 (hands, 6)，0为伸直、1为完全弯曲，顺序同 FINGER_NAMES，手腕恒为0
+    """
+    landmarks = np.asarray(landmarks, dtype=np.float32)
+    flexion = np.zeros((len(landmarks), 6), dtype=np.float32)
+    if len(landmarks) == 0:
+        return flexion
+
+    # 相邻骨段向量 (hands, 5, 4, 3)
+    points = landmarks[:, FINGER_CHAINS]
+    bones = points[:, :, 1:] - points[:, :, :-1]
+    bones /= np.linalg.norm(bones, axis=-1, keepdims=True) + 1e-6
+
+    # 相邻骨段夹角即关节弯曲角 (hands, 5, 3)，三个关节求和
+    cos = np.einsum("hfjc,hfjc->hfj", bones[:, :, :-1], bones[:, :, 1:])
+    total = np.arccos(np.clip(cos, -1.0, 1.0)).sum(axis=-1)
+
+    flexion[:, CHAIN_SLOTS] = np.clip((total - REST_ANGLE) / (FULL_ANGLE - REST_ANGLE), 0.0, 1.0)
+    return flexion
+
+# 6位状态码：FINGER_NAMES[i] 对应第 5-i 位，保证 int(msg, 2) == 状态码
+BIT_SHIFTS = np.arange(5, -1, -1)
+BIT_WEIGHTS = (1 << BIT_SHIFTS).astype(np.uint8)
+STATE_BITS = ((np.arange(64)[:, None] >> BIT_SHIFTS) & 1).astype(bool)  # (64, 6) 状态码 -> 各手指
+STATE_MESSAGES = [f"{code:06b}" for code in range(64)]                   # 状态码 -> 下位机指令
+
+
+def encode_state(bent):
+    """bool (6,) -> 6位状态码"""
+    return int(BIT_WEIGHTS[np.asarray(bent, dtype=bool)].sum())
+
+
+class FingerStateEngine:
+    """
+    手指状态投票引擎：状态码环形缓冲 + 毫秒时间窗
+    - window_ms 内的帧参与投票，弯曲比例 >= on_ratio 才判为弯曲，<= off_ratio 才判为伸直（滞回）
+    - 每根手指状态改变后至少保持 hold_ms，抑制抖动
+    - 历史不足一个时间窗（刚创建、重置或时钟回退后）不改变状态，单帧不能绕过投票
+    时间窗按毫秒计算，行为不随帧率变化
+    """
+
+    def __init__(self, window_ms=60, hold_ms=100, on_ratio=0.75, off_ratio=0.25, capacity=64):
+        self.window_ms = window_ms
+        self.hold_ms = hold_ms
+        self.on_ratio = on_ratio
+        self.off_ratio = off_ratio
+        self._codes = np.zeros(capacity, dtype=np.uint8)
+        self._times = np.full(capacity, -np.inf)
+        self._head = 0
+        self._last_time = -np.inf
+        self._first_time = None     # 本轮历史的第一帧时间
+        self._changed_at = np.full(6, -np.inf)
+        self.state = 0  # 当前6位状态码
+
+    def reset(self):
+        """
+        清空投票历史，状态归零
+        :return: 被清除的手指位掩码，非0时调用方需把新状态（全部伸直）同步给下位机
+        """
+        cleared = self.state
+        self._times.fill(-np.inf)
+        self._changed_at.fill(-np.inf)
+        self._last_time = -np.inf
+        self._first_time = None
+        self.state = 0
+        return cleared
+
+    def update(self, bent, timestamp_ms):
+        """
+        加入一帧的判断结果并投票
+        :param bent: bool (6,)，本帧各手指是否弯曲
+        :param timestamp_ms: 帧时间（毫秒，单调递增）
+        :return: 发生变化的手指位掩码，0表示状态不变；新状态见 self.state
+        """
+        cleared = 0
+        if timestamp_ms < self._last_time:
+            cleared = self.reset()  # 时钟回退（如视频重新播放）
+        if self._first_time is None:
+            self._first_time = timestamp_ms
+        self._last_time = timestamp_ms
+        self._codes[self._head] = encode_state(bent)
+        self._times[self._head] = timestamp_ms
+        self._head = (self._head + 1) % len(self._codes)
+        if timestamp_ms - self._first_time < self.window_ms:
+            return cleared
+
+        recent = self._codes[self._times >= timestamp_ms - self.window_ms]
+        ratio = STATE_BITS[recent].mean(axis=0)
+        current = STATE_BITS[self.state]
+        ready = timestamp_ms - self._changed_at >= self.hold_ms
+        flip = ready & np.where(current, ratio <= self.off_ratio, ratio >= self.on_ratio)
+        if not flip.any():
+            return cleared
+
+        self._changed_at[flip] = timestamp_ms
+        changed = int(BIT_WEIGHTS[flip].sum())
+        self.state ^= changed
+        return cleared ^ changed
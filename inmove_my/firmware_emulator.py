@@ -0,0 +1,426 @@
+import heapq
+import os
+import random
+import select
+import termios
+import threading
+import time
+import tty
+
+import numpy as np
+
+from serial_protocol import (SYNC, VERSION, HEADER_SIZE, PAYLOAD_LENGTHS, FRAME_STATE, FRAME_POSITIONS,
+                             FRAME_BAUD, FRAME_PING, DEFAULT_BAUDRATE, crc8)
+
+# 与 low_esp32/music_low/music_low.ino 保持一致
+GESTURE_LENGTH = 6
+POSITION_LENGTH = 13
+POSITION_MAX = 255
+MAX_ITERATIONS = 150
+STEP_SIZE = 10
+STEP_MS = 5             # 扫动每步 delay(5)
+LOOP_MS = 5             # loop() 末尾 delay(5)
+BOOT_MS = 1000          # initializeServos() 中的 delay(1000)，期间不处理串口数据
+FRAME_TIMEOUT_MS = 20
+BAUD_CONFIRM_MS = 1000
+# 各手指 (伸直, 弯曲) PWM，music_2 配置，顺序同 FINGER_NAMES
+PWM_RANGES = [(102, 502), (120, 380), (450, 220), (500, 250), (110, 270), (500, 250)]
+HEX_DIGITS = set(b"0123456789abcdefABCDEF")
+# termios 速率常量 -> 波特率，用于检查上位机在伪终端上设置的波特率
+TERMIOS_BAUDRATES = {getattr(termios, f"B{baud}"): baud
+                     for baud in (1200, 2400, 4800, 9600, 19200, 38400, 57600, 115200, 230400, 460800, 921600)
+                     if hasattr(termios, f"B{baud}")}
+
+
+class FirmwareEmulator:
+    """
+    music_low.ino 下位机仿真，运行在 Linux 伪终端上，上位机把 port 当作串口打开即可
+    复现文本/二进制指令的解析和校验、"Received:" 等回显、波特率协商，
+    以及 150 步扫动（每步5ms）的真实时序；扫动期间收到的新状态与固件一样在下一步生效
+    上位机在伪终端上设置的波特率（termios）与仿真下位机当前波特率不一致时，双向数据都变成乱码
+    可注入线路噪声（每字节按概率翻转1位，双向）和单向延迟，并按波特率模拟每字节的传输时间
+    """
+
+    def __init__(self, link=None, noise=0.0, latency_ms=0.0, jitter_ms=0.0, boot_ms=BOOT_MS,
+                 wire_time=True, seed=None):
+        self.link = link                # 额外创建的符号链接路径，如 /tmp/ttyHAND0
+        self.noise = noise              # 每字节出错概率
+        self.latency_ms = latency_ms    # 每个方向的固定延迟
+        self.jitter_ms = jitter_ms      # 延迟抖动（均匀分布 0~jitter）
+        self.boot_ms = boot_ms
+        self.wire_time = wire_time      # 按波特率模拟传输时间
+        self._random = random.Random(seed)
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+        self._events = []               # (时间, 序号, 回调, 参数)
+        self._counter = 0
+        self._thread = None
+        self.running = False
+        self.baudrate = DEFAULT_BAUDRATE
+        self._rx_free = 0.0             # 接收/发送方向线路空闲的时间
+        self._tx_free = 0.0
+        self._ready = threading.Event()
+        # 固件状态
+        self.state0 = [False] * GESTURE_LENGTH     # 目标状态
+        self.state1 = [False] * GESTURE_LENGTH     # 当前状态
+        self.change = False
+        self.target_pos = [0] * GESTURE_LENGTH
+        self.position_update = False
+        self.current_pos = [0] * GESTURE_LENGTH     # 各舵机当前位置，比例控制可能停在中间位置
+        self.state_seq = None
+        self.pwm = np.array([straighten for straighten, _ in PWM_RANGES])
+        self._frame = bytearray()
+        self._line = bytearray()
+        self._last_byte = 0.0
+        self._baud_deadline = None
+        # 统计
+        self.frames = 0
+        self.crc_errors = 0
+        self.commands = 0
+        self.sweeps = 0
+        self.corrupted = 0
+        self.baud_mismatches = 0    # 因波特率不一致变成乱码的字节数
+
+    # ---- 事件调度 ----
+
+    def _schedule(self, when, callback, *args):
+        self._counter += 1
+        heapq.heappush(self._events, (when, self._counter, callback, args))
+
+    def _delay(self):
+        delay = self.latency_ms + (self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0)
+        return delay / 1000.0
+
+    def _byte_time(self):
+        return 10.0 / self.baudrate if self.wire_time else 0.0
+
+    def _corrupt(self, data):
+        if not self.noise:
+            return data
+        data = bytearray(data)
+        for i in range(len(data)):
+            if self._random.random() < self.noise:
+                data[i] ^= 1 << self._random.randrange(8)
+                self.corrupted += 1
+        return bytes(data)
+
+    def _host_speeds(self):
+        """上位机设置的 (接收, 发送) 波特率，无法识别的速率为None"""
+        try:
+            attrs = termios.tcgetattr(self._slave)
+        except termios.error:
+            return None, None
+        return TERMIOS_BAUDRATES.get(attrs[4]), TERMIOS_BAUDRATES.get(attrs[5])
+
+    def _garble(self, data, host_baud):
+        """双方波特率不一致时，线路上的每个字节都按乱码处理"""
+        if host_baud is None or host_baud == self.baudrate:
+            return data
+        self.baud_mismatches += len(data)
+        return bytes(self._random.randrange(256) for _ in data)
+
+    def _print(self, text="", end="\r\n"):
+        """Serial.print：经过噪声、延迟和传输时间后写到上位机"""
+        now = time.perf_counter()
+        data = self._corrupt((text + end).encode("utf-8"))
+        self._tx_free = max(self._tx_free, now + self._delay()) + len(data) * self._byte_time()
+        self._schedule(self._tx_free, self._write, data)
+
+    def _write(self, data):
+        data = self._garble(data, self._host_speeds()[0])
+        try:
+            os.write(self._master, data)
+        except OSError:
+            pass
+
+    # ---- 运行 ----
+
+    def start(self):
+        self.running = True
+        if self.link:
+            if os.path.lexists(self.link):
+                os.remove(self.link)
+            os.symlink(self.port, self.link)
+        self._thread = threading.Thread(target=self._run, name="firmware_emulator", daemon=True)
+        self._thread.start()
+        return self
+
+    def wait_ready(self, timeout=None):
+        """等待仿真的 setup() 结束（开始处理串口数据）"""
+        return self._ready.wait(timeout)
+
+    def stop(self):
+        self.running = False
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+        if self.link and os.path.islink(self.link):
+            os.remove(self.link)
+        for fd in (self._master, self._slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def _setup(self):
+        now = time.perf_counter()
+        self._print("ESP32 Hand Control Started")
+        self._print("Initializing servos...")
+        self._boot_end = now + self.boot_ms / 1000.0
+        self._schedule(self._boot_end, self._booted)
+
+    def _booted(self):
+        self._ready.set()
+        self._loop()
+
+    def _run(self):
+        self._boot_end = 0.0
+        self._setup()
+        while self.running:
+            now = time.perf_counter()
+            timeout = min(max(self._events[0][0] - now, 0.0), 0.05) if self._events else 0.05
+            readable, _, _ = select.select([self._master], [], [], timeout)
+            if readable:
+                try:
+                    data = os.read(self._master, 4096)
+                except OSError:
+                    data = b""
+                data = self._garble(data, self._host_speeds()[1])
+                self._receive(self._corrupt(data), time.perf_counter())
+            now = time.perf_counter()
+            while self._events and self._events[0][0] <= now:
+                _, _, callback, args = heapq.heappop(self._events)
+                callback(*args)
+            self._check_timeouts(now)
+
+    def _receive(self, data, now):
+        """按延迟和逐字节传输时间安排到达；setup() 期间到达的数据在串口缓冲中等待"""
+        arrival = max(self._rx_free, now + self._delay())
+        for byte in data:
+            arrival += self._byte_time()
+            self._schedule(max(arrival, self._boot_end), self._rx_byte, byte)
+        self._rx_free = arrival
+
+    def _check_timeouts(self, now):
+        if self._frame and now - self._last_byte > FRAME_TIMEOUT_MS / 1000.0:
+            self._frame.clear()
+        if self._baud_deadline is not None and now > self._baud_deadline:
+            self._baud_deadline = None
+            self.baudrate = DEFAULT_BAUDRATE
+
+    # ---- receiveDataCode ----
+
+    def _rx_byte(self, byte):
+        self._last_byte = time.perf_counter()
+        if self._frame:
+            self._frame_byte(byte)
+        elif byte == SYNC:
+            self._frame.append(byte)
+        else:
+            self._text_byte(byte)
+
+    def _frame_byte(self, byte):
+        frame = self._frame
+        frame.append(byte)
+        if len(frame) == HEADER_SIZE:
+            if frame[1] >> 4 != VERSION or PAYLOAD_LENGTHS.get(frame[1] & 0x0F) != frame[3]:
+                self._print("Error: Unsupported frame")
+                frame.clear()
+        elif len(frame) > HEADER_SIZE and len(frame) == HEADER_SIZE + frame[3] + 1:
+            if crc8(frame[1:-1]) == frame[-1]:
+                self.frames += 1
+                self._handle_frame(frame[1] & 0x0F, frame[2], bytes(frame[HEADER_SIZE:-1]))
+            else:
+                self.crc_errors += 1
+                self._print(f"Error: CRC mismatch ({self.crc_errors})")
+            frame.clear()
+
+    def _handle_frame(self, frame_type, seq, payload):
+        if frame_type == FRAME_STATE:
+            self.state0 = [bool(payload[0] >> (GESTURE_LENGTH - 1 - i) & 1) for i in range(GESTURE_LENGTH)]
+            self.state_seq = seq
+            self.change = True
+            self.commands += 1
+            self._print("Received: " + "".join("1" if s else "0" for s in self.state0) + f" #{seq}")
+        elif frame_type == FRAME_POSITIONS:
+            self.target_pos = list(payload)
+            self.position_update = True
+            self.commands += 1
+        elif frame_type == FRAME_BAUD:
+            baud = int.from_bytes(payload, "little")
+            self._print(f"Baud: {baud}")
+            # Serial.flush() 之后切换：回复以旧波特率发完
+            self._schedule(self._tx_free, self._switch_baud, baud)
+            return
+        elif frame_type == FRAME_PING:
+            self._print("Pong")
+        self._baud_deadline = None
+
+    def _switch_baud(self, baud):
+        self.baudrate = baud
+        self._baud_deadline = time.perf_counter() + BAUD_CONFIRM_MS / 1000.0
+
+    def _text_byte(self, byte):
+        if byte == ord("\n"):
+            line = self._line.decode("ascii")
+            self._line.clear()
+            if line[:1] == "P":
+                self._parse_positions(line)
+            elif self._validate_gesture(line):
+                self.state0 = [c == "1" for c in line]
+                self.state_seq = None
+                self.change = True
+                self.commands += 1
+                self._print("Received: " + line)
+        elif byte in HEX_DIGITS or byte == ord("P"):
+            if len(self._line) < POSITION_LENGTH:
+                self._line.append(byte)
+            else:
+                self._line.clear()
+
+    def _validate_gesture(self, line):
+        if len(line) != GESTURE_LENGTH:
+            self._print("Error: Invalid data length")
+            return False
+        if set(line) - {"0", "1"}:
+            self._print("Error: Invalid character in gesture data")
+            return False
+        return True
+
+    def _parse_positions(self, line):
+        if len(line) != POSITION_LENGTH:
+            self._print("Error: Invalid position data")
+            return
+        try:
+            values = list(bytes.fromhex(line[1:]))
+        except ValueError:
+            self._print("Error: Invalid character in position data")
+            return
+        self.target_pos = values
+        self.position_update = True
+        self.commands += 1
+
+    # ---- loop() ----
+
+    def _loop(self):
+        if not self.running:
+            return
+        if self.position_update:
+            self.position_update = False
+            for j, position in enumerate(self.target_pos):
+                straighten, flex = PWM_RANGES[j]
+                self.pwm[j] = straighten + int((flex - straighten) * position / POSITION_MAX)
+                self.current_pos[j] = position
+                self.state1[j] = position > POSITION_MAX // 2
+        if self.change and any(self._needs_move(j) for j in range(GESTURE_LENGTH)):
+            self._sweep_start = list(self.current_pos)
+            self.sweeps += 1
+            self._print("Processing gesture change...")
+            self._sweep_step(0)
+            return
+        self._schedule(time.perf_counter() + LOOP_MS / 1000.0, self._loop)
+
+    def _needs_move(self, j):
+        """状态改变，或比例控制后停在中间位置、不在目标端点上"""
+        return self.state0[j] != self.state1[j] or self.current_pos[j] != (POSITION_MAX if self.state0[j] else 0)
+
+    def _sweep_step(self, iteration):
+        """扫动的一步；与固件一样每步重新读取目标状态"""
+        now = time.perf_counter()
+        if iteration > MAX_ITERATIONS:
+            # 序号与state0同时读取：扫动中途收到的新指令，回显的是它的序号
+            self.state1 = list(self.state0)
+            self.current_pos = [POSITION_MAX if s else 0 for s in self.state1]
+            self.change = False
+            suffix = f" #{self.state_seq}" if self.state_seq is not None else ""
+            self._print("Current state: " + "".join("1" if s else "0" for s in self.state1) + suffix)
+            self._schedule(now + LOOP_MS / 1000.0, self._loop)
+            return
+        progress = iteration / MAX_ITERATIONS
+        for j in range(GESTURE_LENGTH):
+            if self._needs_move(j):
+                straighten, flex = PWM_RANGES[j]
+                start, end = (straighten, flex) if self.state0[j] else (flex, straighten)
+                if self._sweep_start[j] not in (0, POSITION_MAX):
+                    start = straighten + int((flex - straighten) * self._sweep_start[j] / POSITION_MAX)
+                self.pwm[j] = int(start + (end - start) * progress)
+        self._schedule(now + STEP_MS / 1000.0, self._sweep_step, iteration + STEP_SIZE)
+
+    def stats(self):
+        return {"baudrate": self.baudrate, "commands": self.commands, "frames": self.frames,
+                "crc_errors": self.crc_errors, "sweeps": self.sweeps, "corrupted_bytes": self.corrupted,
+                "baud_mismatch_bytes": self.baud_mismatches}
+
+
+def benchmark(commands=100, interval=0.2, binary=False, **emulator_kwargs):
+    """
+    端到端串口链路基准：SerialWriter 发送 -> 仿真下位机 -> SerialReader 回显 -> LatencyTracker 统计
+    :return: (往返延迟统计, 写线程统计, 仿真下位机统计)
+    """
+    import serial
+
+    from serial_latency import LatencyTracker
+    from serial_protocol import FrameEncoder, negotiate_baud
+    from serial_reader import SerialReader
+    from serial_writer import SerialWriter
+
+    emulator = FirmwareEmulator(**emulator_kwargs).start()
+    emulator.wait_ready()
+    ser = serial.Serial(emulator.port, DEFAULT_BAUDRATE, timeout=0.1, write_timeout=1)
+    encoder = FrameEncoder() if binary else None
+    if encoder is not None and not negotiate_baud(ser, encoder):
+        encoder = None
+    tracker = LatencyTracker("emulator")
+    writer = SerialWriter(ser, on_write=tracker.sent).start()
+    reader = SerialReader(ser, tracker.on_line).start()
+    patterns = ["011111", "000000", "001111", "000011"]
+    for i in range(commands):
+        command = patterns[i % len(patterns)]
+        writer.write(encoder.encode_command(command) if encoder is not None else (command + "\n").encode("ascii"))
+        time.sleep(interval)
+    time.sleep(0.5)
+    writer.stop()
+    reader.stop()
+    ser.close()
+    emulator.stop()
+    return tracker.summary(), writer.stats(), emulator.stats()
+
+
+if __name__ == "__main__":
+    # 无硬件测试：
+    #   python firmware_emulator.py serve --link /tmp/ttyHAND0        仿真下位机，界面/ceshi.py 中输入该串口
+    #   python firmware_emulator.py bench --binary --noise 0.001      端到端往返延迟基准
+    import argparse
+
+    parser = argparse.ArgumentParser(description="music_low.ino 下位机伪终端仿真")
+    parser.add_argument("command", nargs="?", default="serve", choices=["serve", "bench"])
+    parser.add_argument("--link", default=None, help="为伪终端创建的符号链接路径")
+    parser.add_argument("--noise", type=float, default=0.0, help="每字节出错概率")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="每个方向的注入延迟(ms)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="延迟抖动(ms)")
+    parser.add_argument("--boot-ms", type=float, default=BOOT_MS, help="启动时不处理串口数据的时间(ms)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--commands", type=int, default=100, help="bench: 发送指令数")
+    parser.add_argument("--interval", type=float, default=0.2, help="bench: 指令间隔(秒)")
+    parser.add_argument("--binary", action="store_true", help="bench: 使用二进制帧协议")
+    args = parser.parse_args()
+
+    options = dict(noise=args.noise, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                   boot_ms=args.boot_ms, seed=args.seed)
+    if args.command == "bench":
+        latency, writer_stats, emulator_stats = benchmark(args.commands, args.interval, args.binary, **options)
+        print(f"往返延迟: {latency}")
+        print(f"写线程: {writer_stats}")
+        print(f"下位机: {emulator_stats}")
+    else:
+        emulator = FirmwareEmulator(link=args.link, **options).start()
+        print(f"仿真下位机已启动: {args.link or emulator.port}" + (f" -> {emulator.port}" if args.link else ""))
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            emulator.stop()
+            print(f"已停止: {emulator.stats()}")
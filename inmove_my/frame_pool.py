@@ -0,0 +1,55 @@
+import threading
+from collections import deque
+
+import numpy as np
+
+
+def reuse(buf, shape, dtype=np.uint8):
+    """尺寸/类型一致时复用已有缓冲，否则重新分配（仅在分辨率变化时发生）"""
+    if buf is None or buf.shape != tuple(shape) or buf.dtype != dtype:
+        return np.empty(shape, dtype)
+    return buf
+
+
+class FramePool:
+    """
+    预分配帧缓冲环
+    处理线程 acquire() 取出空闲缓冲并写入，通过信号交给显示槽函数；
+    显示槽函数拷贝到 QPixmap 后 release() 归还。缓冲全部在显示端时返回 None，
+    调用方应跳过本帧显示，而不是新分配内存；不能丢帧时传入 timeout 等待归还。
+    """
+
+    def __init__(self, count=3, dtype=np.uint8):
+        self.count = count
+        self.dtype = dtype
+        self.shape = None
+        self._lock = threading.Condition()
+        self._free = deque()
+        self._owned = set()     # 本池分配的缓冲 id，防止归还外来数组
+        self.exhausted = 0      # 因显示端未归还而跳过的次数
+
+    def _allocate(self, shape):
+        self.shape = tuple(shape)
+        self._free.clear()
+        self._owned.clear()
+        for _ in range(self.count):
+            buf = np.empty(self.shape, self.dtype)
+            self._owned.add(id(buf))
+            self._free.append(buf)
+
+    def acquire(self, shape, timeout=0):
+        """取出空闲缓冲，timeout 秒内（None为一直等待）没有缓冲归还时返回None"""
+        with self._lock:
+            if self.shape != tuple(shape):
+                self._allocate(shape)
+            if not self._lock.wait_for(lambda: self._free, timeout):
+                self.exhausted += 1
+                return None
+            return self._free.popleft()
+
+    def release(self, buf):
+        with self._lock:
+            # 分辨率变化后旧缓冲直接丢弃
+            if id(buf) in self._owned and buf.shape == self.shape:
+                self._free.append(buf)
+                self._lock.notify()
@@ -0,0 +1,175 @@
+import os
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+DEFAULT_LIBRARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gestures.npz")
+
+# 常用手势对应的机械手姿态（6位指令，顺序同 FINGER_NAMES），录制同名模板后即可识别
+DEFAULT_ACTIONS = {
+    "张开": "000000",
+    "握拳": "111111",
+    "指向": "010000",
+    "OK": "001100",
+}
+
+PALM_BASE = 9   # 中指根部，手腕->中指根部的方向和长度用于旋转/尺度归一化
+
+
+def landmark_features(landmarks, handTypes):
+    """
+    关键点 -> 与位置、尺度、平面旋转、左右手无关的特征向量
+    :param landmarks: (hands, 21, 3) 像素坐标（x/y/z同尺度）
+    :param handTypes: 每只手的 "Left"/"Right"
+    :return: float32 (hands, 60)
+    """
+    points = np.asarray(landmarks, dtype=np.float32)
+    points = points - points[:, :1]
+
+    # 左手镜像成右手，同一模板可识别两只手
+    left = np.asarray(handTypes, dtype=object) == "Left"
+    points[left, :, 0] *= -1
+
+    # 平面内旋转到手腕->中指根部朝上(-y)，并按其长度缩放
+    palm = points[:, PALM_BASE, :2]
+    size = np.linalg.norm(palm, axis=-1) + 1e-6
+    cos, sin = -palm[:, 1] / size, -palm[:, 0] / size
+    x, y = points[..., 0], points[..., 1]
+    rotated = np.stack([x * cos[:, None] - y * sin[:, None],
+                        x * sin[:, None] + y * cos[:, None],
+                        points[..., 2]], axis=-1)
+    rotated /= size[:, None, None]
+    return rotated[:, 1:].reshape(len(points), -1)
+
+
+class GestureLibrary:
+    """
+    手势模板库：每个命名手势保存若干归一化特征向量，存盘为npz
+    识别时用预先构建的KD树做最近邻查询，数百个模板也在亚毫秒内完成
+    """
+
+    def __init__(self, path=DEFAULT_LIBRARY_PATH, max_distance=0.6):
+        self.path = path
+        self.max_distance = max_distance  # 最近模板距离超过该值视为未识别
+        self.names = []                   # 每个模板所属手势名
+        self.features = np.zeros((0, 60), dtype=np.float32)
+        self.actions = dict(DEFAULT_ACTIONS)
+        self._tree = None
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        return len(self.names)
+
+    def gestures(self):
+        """各手势的模板数"""
+        return {name: self.names.count(name) for name in dict.fromkeys(self.names)}
+
+    def _rebuild(self):
+        self._tree = cKDTree(self.features) if len(self.features) else None
+
+    def add(self, name, landmarks, handTypes, action=None):
+        """添加一只或多只手的模板"""
+        features = landmark_features(landmarks, handTypes)
+        self.features = np.concatenate([self.features, features])
+        self.names.extend([name] * len(features))
+        if action is not None:
+            self.actions[name] = action
+        self._rebuild()
+
+    def remove(self, name):
+        keep = np.array([n != name for n in self.names], dtype=bool)
+        self.features = self.features[keep]
+        self.names = [n for n in self.names if n != name]
+        self.actions.pop(name, None)
+        self._rebuild()
+
+    def match(self, landmarks, handTypes):
+        """
+        识别每只手的手势
+        :return: [(name, distance), ...]，未识别时name为None
+        """
+        if self._tree is None or len(landmarks) == 0:
+            return [(None, np.inf)] * len(landmarks)
+        distances, indices = self._tree.query(landmark_features(landmarks, handTypes))
+        return [(self.names[i] if d <= self.max_distance else None, float(d))
+                for d, i in zip(distances, indices)]
+
+    def action(self, name):
+        """手势对应的机械手姿态/动作，未配置返回None"""
+        return self.actions.get(name)
+
+    def save(self, path=None):
+        path = path or self.path
+        np.savez(path, features=self.features, names=np.array(self.names, dtype=str),
+                 action_names=np.array(list(self.actions), dtype=str),
+                 action_values=np.array(list(self.actions.values()), dtype=str))
+
+    def load(self, path=None):
+        with np.load(path or self.path) as data:
+            self.features = data["features"].astype(np.float32)
+            self.names = data["names"].tolist()
+            self.actions = dict(zip(data["action_names"].tolist(), data["action_values"].tolist()))
+        self._rebuild()
+
+
+if __name__ == "__main__":
+    # 录制/管理手势模板：
+    #   python gesture_library.py record 握拳 --action 111111 --samples 30
+    #   python gesture_library.py list
+    #   python gesture_library.py remove 握拳
+    #   python gesture_library.py action wave --action 111111  (为动态手势等无模板事件配置动作)
+    import argparse
+    import time
+
+    import cv2
+
+    from capture import open_source
+    from hand_detector import HandDetector
+
+    parser = argparse.ArgumentParser(description="手势模板库")
+    parser.add_argument("command", choices=["record", "list", "remove", "action"])
+    parser.add_argument("name", nargs="?")
+    parser.add_argument("--action", default=None, help="手势对应的6位姿态指令，如 111111")
+    parser.add_argument("--samples", type=int, default=30, help="录制的模板帧数")
+    parser.add_argument("--source", default="0", help="摄像头编号、视频文件或图片目录")
+    parser.add_argument("--library", default=DEFAULT_LIBRARY_PATH)
+    args = parser.parse_args()
+    if args.command == "action" and (args.name is None or args.action is None):
+        parser.error("action 需要手势名和 --action，如: action wave --action 111111")
+
+    library = GestureLibrary(args.library)
+    if args.command == "list":
+        for name, count in library.gestures().items():
+            print(f"{name}: {count} 个模板, 动作 {library.action(name)}")
+    elif args.command == "remove":
+        library.remove(args.name)
+        library.save()
+    elif args.command == "action":
+        library.actions[args.name] = args.action
+        library.save()
+    else:
+        cap = open_source(args.source)
+        detector = HandDetector(maxHands=1, detectionCon=0.7)
+        recorded = 0
+        while recorded < args.samples:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frame = cv2.flip(frame, 1)  # 与 VideoThread 一致先镜像
+            detector.findHands(frame)
+            _, landmarks, handTypes = detector.findLandmarks(frame)
+            if len(landmarks):
+                library.add(args.name, landmarks, handTypes, args.action)
+                recorded += 1
+            cv2.putText(frame, f"{recorded}/{args.samples}", (10, 40),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+            cv2.imshow("record", frame)
+            if cv2.waitKey(1) & 0xFF == 27:
+                break
+            time.sleep(0.05)  # 拉开采样间隔，覆盖更多姿态变化
+        cap.release()
+        detector.close()
+        cv2.destroyAllWindows()
+        library.save()
+        print(f"已录制 {args.name}: {recorded} 帧, 共 {len(library)} 个模板")
@@ -0,0 +1,327 @@
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import cv2
+import mediapipe as mp
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+from frame_pool import reuse
+
+# 推理后端
+SOLUTIONS = "solutions"     # 旧版 mp.solutions.hands 同步接口
+TASKS_VIDEO = "video"       # Tasks HandLandmarker VIDEO 模式（同步）
+TASKS_LIVE = "live_stream"  # Tasks HandLandmarker LIVE_STREAM 模式（异步回调，不阻塞调用方）
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hand_landmarker.task")
+MODEL_URL = "https://storage.googleapis.com/mediapipe-models/hand_landmarker/hand_landmarker/float16/latest/hand_landmarker.task"
+
+EMPTY_RESULTS = SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+NUM_LANDMARKS = 21
+HAND_CONNECTIONS = sorted(mp.solutions.hands.HAND_CONNECTIONS)  # 骨架连线 (起点, 终点)
+
+
+def results_from_array(landmarks, labels):
+    """把 (hands, 21, 3) 归一化关键点数组还原成MediaPipe结果结构，供绘制和findPosition使用"""
+    if len(landmarks) == 0:
+        return EMPTY_RESULTS
+    hands = []
+    for hand in landmarks:
+        landmark_list = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z in hand:
+            landmark_list.landmark.add(x=float(x), y=float(y), z=float(z))
+        hands.append(landmark_list)
+    handedness = [SimpleNamespace(classification=[SimpleNamespace(label=label)]) for label in labels]
+    return SimpleNamespace(multi_hand_landmarks=hands, multi_handedness=handedness)
+
+
+class SolutionsBackend:
+    """mp.solutions.hands 后端"""
+    is_async = False
+
+    def __init__(self, mode, maxHands, detectionCon, trackCon, modelComplexity=1):
+        self.hands = mp.solutions.hands.Hands(
+            static_image_mode=mode,
+            max_num_hands=maxHands,
+            model_complexity=modelComplexity,
+            min_detection_confidence=detectionCon,
+            min_tracking_confidence=trackCon
+        )
+
+    def process(self, imgRGB):
+        return self.hands.process(imgRGB)
+
+    def close(self):
+        self.hands.close()
+
+
+class TasksBackend:
+    """
+    MediaPipe Tasks HandLandmarker 后端
+    VIDEO 模式同步返回；LIVE_STREAM 模式提交后立即返回上一次回调得到的结果，
+    关键点会比当前帧滞后一次推理的时间
+    """
+
+    def __init__(self, runningMode, maxHands, detectionCon, trackCon,
+                 modelPath=None, delegate="cpu"):
+        from mediapipe.tasks import python as mp_tasks
+        from mediapipe.tasks.python import vision
+
+        modelPath = modelPath or DEFAULT_MODEL_PATH
+        if not os.path.exists(modelPath):
+            raise FileNotFoundError(f"未找到模型文件 {modelPath}，请从 {MODEL_URL} 下载")
+
+        self.is_async = runningMode == TASKS_LIVE
+        self._lock = threading.Lock()
+        self._latest = EMPTY_RESULTS
+        self._last_ts = -1
+
+        options = vision.HandLandmarkerOptions(
+            base_options=mp_tasks.BaseOptions(
+                model_asset_path=modelPath,
+                delegate=(mp_tasks.BaseOptions.Delegate.GPU if delegate == "gpu"
+                          else mp_tasks.BaseOptions.Delegate.CPU)),
+            running_mode=(vision.RunningMode.LIVE_STREAM if self.is_async
+                          else vision.RunningMode.VIDEO),
+            num_hands=maxHands,
+            min_hand_detection_confidence=detectionCon,
+            min_hand_presence_confidence=detectionCon,
+            min_tracking_confidence=trackCon,
+            result_callback=self._on_result if self.is_async else None)
+        self.landmarker = vision.HandLandmarker.create_from_options(options)
+
+    @staticmethod
+    def _convert(result):
+        """把Tasks结果转换成与mp.solutions一致的结构，后续绘制和定位逻辑不变"""
+        if not result.hand_landmarks:
+            return EMPTY_RESULTS
+        hands = []
+        for landmarks in result.hand_landmarks:
+            landmark_list = landmark_pb2.NormalizedLandmarkList()
+            for lm in landmarks:
+                landmark_list.landmark.add(x=lm.x, y=lm.y, z=lm.z)
+            hands.append(landmark_list)
+        handedness = [SimpleNamespace(classification=[SimpleNamespace(label=categories[0].category_name)])
+                      for categories in result.handedness]
+        return SimpleNamespace(multi_hand_landmarks=hands, multi_handedness=handedness)
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        converted = self._convert(result)
+        with self._lock:
+            self._latest = converted
+
+    def _timestamp(self):
+        # 时间戳必须严格递增
+        ts = int(time.perf_counter() * 1000)
+        if ts <= self._last_ts:
+            ts = self._last_ts + 1
+        self._last_ts = ts
+        return ts
+
+    def process(self, imgRGB):
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=imgRGB)
+        if self.is_async:
+            self.landmarker.detect_async(image, self._timestamp())
+            with self._lock:
+                return self._latest
+        return self._convert(self.landmarker.detect_for_video(image, self._timestamp()))
+
+    def close(self):
+        self.landmarker.close()
+
+
+def create_backend(backend, mode, maxHands, detectionCon, trackCon,
+                   modelComplexity=1, modelPath=None, delegate="cpu"):
+    if backend == SOLUTIONS:
+        return SolutionsBackend(mode, maxHands, detectionCon, trackCon, modelComplexity)
+    if backend in (TASKS_VIDEO, TASKS_LIVE):
+        return TasksBackend(backend, maxHands, detectionCon, trackCon, modelPath, delegate)
+    raise ValueError(f"未知推理后端: {backend}")
+
+
+class HandDetector():
+    def __init__(self, mode=False, maxHands=1, detectionCon=0.7, trackCon=0.5,
+                 roiMode=False, roiPadding=0.3, roiSize=256,
+                 backend=SOLUTIONS, modelComplexity=1, modelPath=None, delegate="cpu",
+                 rgbInput=False):
+        self.mode = mode
+        self.maxHands = maxHands
+        self.detectionCon = detectionCon
+        self.trackCon = trackCon
+        self.rgbInput = rgbInput  # 输入帧已是RGB时跳过颜色转换
+
+        # 推理后端：solutions / video / live_stream
+        # modelComplexity 仅对solutions有效(0更快, 1更准)；delegate 仅对Tasks有效
+        self.backend = create_backend(backend, mode, maxHands, detectionCon, trackCon,
+                                      modelComplexity, modelPath, delegate)
+
+        # ROI模式：只在上一帧关键点周围的区域内检测
+        # 异步后端返回的结果与提交的帧不对应，无法映射裁剪坐标，因此不启用
+        self.roiMode = roiMode and not self.backend.is_async
+        self.roiPadding = roiPadding  # 包围框每边外扩比例
+        self.roiSize = roiSize        # 裁剪区域统一缩放到的边长(像素)
+        self.roi = None               # 上一帧得到的检测区域 (x0, y0, side)
+        self._roi_buf = None
+        self.roi_stats = {"roi": 0, "full": 0, "fallback": 0}
+
+        self.mpHands = mp.solutions.hands
+        self.mpDraw = mp.solutions.drawing_utils
+        self.handedness = None  # 存储手的左右信息
+        self._rgb = None        # 复用的RGB转换缓冲
+
+    def _detect_full(self, frame):
+        if self.rgbInput:
+            imgRGB = frame
+        else:
+            self._rgb = reuse(self._rgb, frame.shape)
+            imgRGB = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        self.results = self.backend.process(imgRGB)
+        self.roi_stats["full"] += 1
+
+    def _detect_roi(self, frame):
+        """在上一帧区域内检测，并把关键点映射回整帧坐标；丢失时返回False"""
+        x0, y0, side = self.roi
+        h, w = frame.shape[:2]
+        self._roi_buf = reuse(self._roi_buf, (self.roiSize, self.roiSize, 3))
+        crop = cv2.resize(frame[y0:y0 + side, x0:x0 + side], (self.roiSize, self.roiSize),
+                          dst=self._roi_buf)
+        if not self.rgbInput:
+            cv2.cvtColor(crop, cv2.COLOR_BGR2RGB, dst=crop)
+        self.results = self.backend.process(crop)
+        if not self.results.multi_hand_landmarks:
+            return False
+
+        for hand_landmarks in self.results.multi_hand_landmarks:
+            for lm in hand_landmarks.landmark:
+                lm.x = (x0 + lm.x * side) / w
+                lm.y = (y0 + lm.y * side) / h
+                lm.z = lm.z * side / w  # z与图像宽度同尺度
+        self.roi_stats["roi"] += 1
+        return True
+
+    def _update_roi(self, frame):
+        """根据本帧所有手的关键点计算下一帧的正方形检测区域"""
+        # 手数不足时仍需整帧搜索其余的手
+        if not self.results.multi_hand_landmarks or \
+                len(self.results.multi_hand_landmarks) < self.maxHands:
+            self.roi = None
+            return
+        h, w = frame.shape[:2]
+        xs = [lm.x for hand in self.results.multi_hand_landmarks for lm in hand.landmark]
+        ys = [lm.y for hand in self.results.multi_hand_landmarks for lm in hand.landmark]
+        bw = (max(xs) - min(xs)) * w
+        bh = (max(ys) - min(ys)) * h
+        cx = (max(xs) + min(xs)) / 2 * w
+        cy = (max(ys) + min(ys)) / 2 * h
+
+        side = max(bw, bh) * (1 + 2 * self.roiPadding)
+        side = int(min(max(side, self.roiSize / 2), w, h))
+        x0 = int(min(max(cx - side / 2, 0), w - side))
+        y0 = int(min(max(cy - side / 2, 0), h - side))
+        self.roi = (x0, y0, side)
+
+    def findHands(self, frame, draw=True):
+        if self.roiMode and self.roi is not None:
+            if not self._detect_roi(frame):
+                # 跟踪丢失，回退到整帧检测
+                self.roi_stats["fallback"] += 1
+                self._detect_full(frame)
+        else:
+            self._detect_full(frame)
+        if self.roiMode:
+            self._update_roi(frame)
+        
+        if self.results.multi_hand_landmarks:
+            self.handedness = []
+            for hand_landmarks, handedness in zip(self.results.multi_hand_landmarks, self.results.multi_handedness):
+                if draw:
+                    self.mpDraw.draw_landmarks(frame, hand_landmarks, self.mpHands.HAND_CONNECTIONS)
+                # 获取手的左右信息
+                self.handedness.append(handedness.classification[0].label)
+        return frame
+    
+    def findPosition(self, frame, handNo=0, draw=False):
+        lmList = []
+        handType = None
+
+        if self.results.multi_hand_landmarks:
+            if handNo < len(self.results.multi_hand_landmarks):
+                myHand = self.results.multi_hand_landmarks[handNo]
+                if self.handedness and handNo < len(self.handedness):
+                    handType = self.handedness[handNo]
+
+                for id, lm in enumerate(myHand.landmark):
+                    h, w, c = frame.shape
+                    cx, cy = int(lm.x * w), int(lm.y * h)
+
+                    lmList.append([id, cx, cy])
+
+                    if draw and id == 0:
+                        cv2.circle(frame, (cx, cy), 10, (255, 0, 255), -1)
+        return lmList, handType
+
+    def _landmark_array(self):
+        """本帧所有手的归一化关键点，float32 (hands, 21, 3)"""
+        hands = self.results.multi_hand_landmarks
+        if not hands:
+            return np.zeros((0, NUM_LANDMARKS, 3), dtype=np.float32)
+        return np.array([[(lm.x, lm.y, lm.z) for lm in hand.landmark] for hand in hands],
+                        dtype=np.float32)
+
+    def findLandmarks(self, frame):
+        """
+        以数组形式返回本帧所有手的关键点（保留亚像素精度和z）
+        :return: (normalized, pixels, handTypes)，前两者为 float32 (hands, 21, 3)，
+                 像素坐标中z按图像宽度缩放；未检测到手时hands为0
+        """
+        h, w = frame.shape[:2]
+        normalized = self._landmark_array()
+        pixels = normalized * np.array((w, h, w), dtype=np.float32)
+        handTypes = list(self.handedness[:len(normalized)]) if len(normalized) else []
+        return normalized, pixels, handTypes
+
+    def close(self):
+        self.backend.close()
+
+
+if __name__ == "__main__":
+    # 在本机上比较各推理后端的速度，用于选择最快的配置
+    # 用法: python hand_detector.py 视频文件或图片目录 [--frames 300]
+    import argparse
+    from capture import open_source, UNTHROTTLED
+
+    parser = argparse.ArgumentParser(description="推理后端速度对比")
+    parser.add_argument("source", help="视频文件或图片目录")
+    parser.add_argument("--frames", type=int, default=300, help="每个后端最多处理的帧数")
+    args = parser.parse_args()
+
+    configs = [(SOLUTIONS, 0), (SOLUTIONS, 1), (TASKS_VIDEO, 1), (TASKS_LIVE, 1)]
+    for backend, complexity in configs:
+        name = f"{backend}(complexity={complexity})" if backend == SOLUTIONS else backend
+        try:
+            detector = HandDetector(backend=backend, modelComplexity=complexity)
+        except FileNotFoundError as e:
+            print(f"{name}: 跳过 - {e}")
+            continue
+
+        source = open_source(args.source, UNTHROTTLED)
+        count = found = 0
+        elapsed = 0.0
+        while count < args.frames:
+            ret, frame = source.read()
+            if not ret:
+                break
+            start = time.perf_counter()
+            detector.findHands(frame, draw=False)
+            elapsed += time.perf_counter() - start
+            count += 1
+            if detector.results.multi_hand_landmarks:
+                found += 1
+        source.release()
+        detector.close()
+
+        if count:
+            # LIVE_STREAM 计的是提交耗时（调用方实际被阻塞的时间）
+            print(f"{name}: {elapsed / count * 1000:.2f} ms/帧, 检出 {found}/{count} 帧")
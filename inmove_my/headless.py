@@ -0,0 +1,185 @@
+import time
+
+import cv2
+
+from capture import open_source, UNTHROTTLED
+from finger_state import (STATE_BITS, STATE_MESSAGES, FingerStateEngine, fingers_bent,
+                          MIRROR, MIRRORED_LABEL)
+from pipeline import Pipeline, END, BLOCK
+
+
+class NullSerial:
+    """没有下位机时的串口替身：只记录写入的数据，接口同 serial.Serial（write/flush/is_open/port）"""
+
+    def __init__(self, port="null"):
+        self.port = port
+        self.is_open = True
+        self.written = []
+
+    def write(self, data):
+        self.written.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.is_open = False
+
+
+class HeadlessRunner:
+    """
+    无界面运行 帧源 -> 检测 -> 手指状态投票 -> 串口 链路，阶段划分与 VideoThread 的流水线一致，
+    不需要显示器、音频和摄像头，用于在 Linux 构建机上做吞吐基准和回归测试
+    只处理单手（取检测到的第一只手）；所有队列阻塞不丢帧，每帧都会被检测
+    :param detector: HandDetector 或接口相同的检测器（rgbInput=True）
+    :param ser: 串口、SerialWriter 或 NullSerial
+    :param encoder: FrameEncoder，给定时按二进制帧发送
+    """
+
+    def __init__(self, detector, ser, source, mode=UNTHROTTLED, window_ms=60, hold_ms=100,
+                 encoder=None, classify=fingers_bent):
+        self.detector = detector
+        self.ser = ser
+        self.source = source
+        self.mode = mode
+        self.encoder = encoder
+        self.classify = classify
+        self.engine = FingerStateEngine(window_ms, hold_ms)
+        self.commands = []      # 按顺序发送的6位指令
+        self.processed = 0
+        self.pipeline = None
+        self._cap = None
+
+    def _capture_stage(self, _):
+        ret, frame = self._cap.read()
+        if not ret:
+            return END
+        media_time = self.processed / getattr(self._cap, 'fps', 30.0)
+        self.processed += 1
+        return {"frame": cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), "media_time": media_time,
+                "timestamp": time.perf_counter()}
+
+    def _detect_stage(self, packet):
+        frame = packet["frame"]
+        self.detector.findHands(frame, draw=False)
+        _, pixels, handTypes = self.detector.findLandmarks(frame)
+        packet["landmarks"] = pixels * MIRROR + (frame.shape[1], 0, 0)
+        packet["handTypes"] = [MIRRORED_LABEL.get(t, t) for t in handTypes]
+        return packet
+
+    def _classify_stage(self, packet):
+        landmarks, handTypes = packet["landmarks"], packet["handTypes"]
+        # 未检测到手时视为全部伸直，与 VideoThread 一致
+        bent = self.classify(landmarks, handTypes)[0] if len(handTypes) else STATE_BITS[0]
+        if not self.engine.update(bent, packet["media_time"] * 1000):
+            return None
+        packet["msg"] = STATE_MESSAGES[self.engine.state]
+        return packet
+
+    def _output_stage(self, packet):
+        msg = packet["msg"]
+        frame = self.encoder.encode_command(msg) if self.encoder is not None else None
+        self.ser.write(frame if frame is not None else (msg + "\n").encode("ascii"))
+        self.ser.flush()
+        self.commands.append(msg)
+        return None
+
+    def run(self):
+        """
+        回放整个帧源直到结束
+        :return: {"frames", "commands", "elapsed_s", "fps", "stages"}
+        """
+        self._cap = open_source(self.source, self.mode)
+        if not self._cap.isOpened():
+            raise IOError(f"视频源打开失败: {self._cap.name}")
+        self.pipeline = Pipeline()
+        self.pipeline.add_stage("capture", self._capture_stage)
+        self.pipeline.add_stage("detect", self._detect_stage, maxsize=1, policy=BLOCK)
+        self.pipeline.add_stage("classify", self._classify_stage, maxsize=2, policy=BLOCK)
+        self.pipeline.add_stage("output", self._output_stage, maxsize=4, policy=BLOCK)
+        start = time.perf_counter()
+        try:
+            self.pipeline.start()
+            while self.pipeline.is_alive():
+                time.sleep(0.01)
+        finally:
+            self.pipeline.stop()
+            self._cap.release()
+        elapsed = time.perf_counter() - start
+        for name, error in self.pipeline.errors().items():
+            raise RuntimeError(f"{name}阶段异常: {error}")
+        return {"frames": self.processed, "commands": list(self.commands), "elapsed_s": round(elapsed, 3),
+                "fps": round(self.processed / elapsed, 1) if elapsed > 0 else 0.0,
+                "stages": self.pipeline.stats()}
+
+
+if __name__ == "__main__":
+    # 无界面回放基准/回归：
+    #   python headless.py 视频或图片目录                     串口替身，只统计吞吐和发送的指令
+    #   python headless.py 视频或图片目录 --emulator --binary  经仿真下位机，统计指令往返延迟
+    #   python headless.py 视频或图片目录 --port /dev/ttyUSB0  真实下位机
+    import argparse
+
+    import serial
+
+    from hand_detector import HandDetector, SOLUTIONS, TASKS_VIDEO, TASKS_LIVE
+    from capture import PACED
+    from serial_latency import LatencyTracker
+    from serial_protocol import FrameEncoder, negotiate_baud, FAST_BAUDRATE, DEFAULT_BAUDRATE
+    from serial_reader import SerialReader
+    from serial_writer import SerialWriter
+
+    parser = argparse.ArgumentParser(description="无界面回放：检测 -> 手指状态 -> 串口")
+    parser.add_argument("source", help="视频文件(MP4/AVI)或图片目录(PNG/JPEG)")
+    parser.add_argument("--paced", action="store_true", help="按原始时间戳回放（默认不限速）")
+    parser.add_argument("--backend", default=SOLUTIONS, choices=[SOLUTIONS, TASKS_VIDEO, TASKS_LIVE])
+    parser.add_argument("--vote-window", type=int, default=60, help="手指状态投票窗口(ms)")
+    parser.add_argument("--port", default=None, help="下位机串口，默认不连接（串口替身）")
+    parser.add_argument("--emulator", action="store_true", help="连接 firmware_emulator.py 仿真下位机")
+    parser.add_argument("--binary", type=int, nargs="?", const=FAST_BAUDRATE, default=None, metavar="BAUD",
+                        help="协商二进制帧协议")
+    args = parser.parse_args()
+
+    emulator = None
+    if args.emulator:
+        from firmware_emulator import FirmwareEmulator
+        emulator = FirmwareEmulator().start()
+        emulator.wait_ready()
+        args.port = emulator.port
+
+    ser = reader = tracker = encoder = None
+    if args.port:
+        port = serial.Serial(args.port, DEFAULT_BAUDRATE, timeout=0.1, write_timeout=1)
+        if args.binary:
+            encoder = FrameEncoder()
+            if not negotiate_baud(port, encoder, args.binary):
+                print("下位机不支持二进制协议，使用文本指令")
+                encoder = None
+        tracker = LatencyTracker(port.port)
+        ser = SerialWriter(port, on_write=tracker.sent).start()
+        reader = SerialReader(port, tracker.on_line).start()
+    else:
+        ser = NullSerial()
+
+    detector = HandDetector(maxHands=1, rgbInput=True, backend=args.backend)
+    runner = HeadlessRunner(detector, ser, args.source, PACED if args.paced else UNTHROTTLED,
+                            window_ms=args.vote_window, encoder=encoder)
+    try:
+        result = runner.run()
+    finally:
+        detector.close()
+        if reader is not None:
+            time.sleep(0.5)     # 等待最后一条指令的回显
+            ser.stop()
+            reader.stop()
+            ser.ser.close()
+        if emulator is not None:
+            emulator.stop()
+    print(f"共处理 {result['frames']} 帧, 吞吐 {result['fps']} FPS, 发送 {len(result['commands'])} 条指令")
+    for name, stats in result["stages"].items():
+        print(f"  {name}: {stats}")
+    if isinstance(ser, SerialWriter):
+        print(f"  serial_writer: {ser.stats()}")
+    if tracker is not None:
+        print(f"  latency: {tracker.summary()}")
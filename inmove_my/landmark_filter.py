@@ -0,0 +1,50 @@
+import numpy as np
+
+
+def _alpha(cutoff, dt):
+    """一阶低通的平滑系数，cutoff 可以是数组"""
+    tau = 1.0 / (2 * np.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter:
+    """
+    One Euro 自适应低通滤波，对整个关键点数组（如 (21, 3)）逐元素向量化处理
+    静止时截止频率接近 min_cutoff，强力去抖；快速移动时截止频率随速度升高（beta），
+    几乎不引入滞后。与固定长度滑动窗口不同，没有固定的帧数延迟
+    每只手使用独立的实例保存状态
+    """
+
+    def __init__(self, min_cutoff=1.5, beta=0.01, d_cutoff=1.0, max_gap=0.5):
+        self.min_cutoff = min_cutoff    # 静止时的截止频率(Hz)，越小越平滑
+        self.beta = beta                # 速度系数，单位 1/(坐标单位/秒)，越大跟手越快
+        self.d_cutoff = d_cutoff        # 速度估计的截止频率(Hz)
+        self.max_gap = max_gap          # 两帧间隔超过该值(秒)视为手重新出现，重置状态
+        self.reset()
+
+    def reset(self):
+        self._x = None
+        self._dx = None
+        self._t = None
+
+    def __call__(self, x, timestamp):
+        """
+        :param x: 本帧关键点数组
+        :param timestamp: 帧时间（秒）
+        :return: 滤波后的数组（float32，新数组）
+        """
+        x = np.asarray(x, dtype=np.float32)
+        if self._x is None or self._x.shape != x.shape:
+            self._x, self._dx, self._t = x.copy(), np.zeros_like(x), timestamp
+            return x.copy()
+        dt = timestamp - self._t
+        if dt <= 0 or dt > self.max_gap:
+            self._x, self._dx, self._t = x.copy(), np.zeros_like(x), timestamp
+            return x.copy()
+
+        dx = (x - self._x) / dt
+        self._dx += _alpha(self.d_cutoff, dt) * (dx - self._dx)
+        cutoff = self.min_cutoff + self.beta * np.abs(self._dx)
+        self._x += _alpha(cutoff, dt) * (x - self._x)
+        self._t = timestamp
+        return self._x.copy()
@@ -0,0 +1,116 @@
+import cv2
+import numpy as np
+
+from frame_pool import reuse
+from hand_detector import HandDetector, NUM_LANDMARKS, EMPTY_RESULTS, results_from_array
+
+
+class FlowTracker:
+    """
+    混合跟踪：每隔 detectInterval 帧运行一次MediaPipe，中间帧用金字塔LK光流传播21个关键点
+    前后向光流误差超过阈值或有效点过少时，立即在当前帧重新检测
+    接口与 HandDetector 一致，可直接替换 VideoThread 中的检测器
+    """
+
+    # 结果已还原成MediaPipe结构，直接复用本地实现
+    findPosition = HandDetector.findPosition
+    findLandmarks = HandDetector.findLandmarks
+
+    def __init__(self, detector, detectInterval=3, maxError=3.0, minValid=15,
+                 winSize=(21, 21), maxLevel=3):
+        self.detector = detector
+        self.detectInterval = detectInterval
+        self.maxError = maxError    # 前后向误差中位数阈值(像素)
+        self.minValid = minValid    # 每只手最少有效跟踪点数
+        self.lk_params = dict(
+            winSize=winSize, maxLevel=maxLevel,
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+
+        self.mpHands = detector.mpHands
+        self.mpDraw = detector.mpDraw
+        self.results = EMPTY_RESULTS
+        self.handedness = None
+        self.flow_stats = {"detect": 0, "track": 0, "redetect": 0}
+
+        self._landmarks = np.zeros((0, NUM_LANDMARKS, 3), dtype=np.float32)  # 归一化坐标
+        self._since_detect = 0
+        self._gray = None
+        self._prev_gray = None
+
+    @property
+    def roiMode(self):
+        return getattr(self.detector, 'roiMode', False)
+
+    @property
+    def roi_stats(self):
+        return getattr(self.detector, 'roi_stats', {})
+
+    def _detect(self, frame, draw):
+        self.detector.findHands(frame, draw)
+        self.results = self.detector.results
+        self.handedness = self.detector.handedness
+        self._landmarks = np.array(self.detector._landmark_array(), dtype=np.float32)  # 拷贝，跟踪时原地更新
+        self._since_detect = 0
+        self.flow_stats["detect"] += 1
+
+    def _track(self, frame):
+        """用光流把上一帧关键点传播到当前帧，失败返回False"""
+        h, w = frame.shape[:2]
+        scale = np.array((w, h), dtype=np.float32)
+        prev_pts = (self._landmarks[:, :, :2] * scale).reshape(-1, 1, 2)
+
+        next_pts, status, _ = cv2.calcOpticalFlowPyrLK(
+            self._prev_gray, self._gray, prev_pts, None, **self.lk_params)
+        back_pts, back_status, _ = cv2.calcOpticalFlowPyrLK(
+            self._gray, self._prev_gray, next_pts, None, **self.lk_params)
+
+        # 前后向一致性检查
+        fb_error = np.linalg.norm(prev_pts - back_pts, axis=-1).reshape(-1, NUM_LANDMARKS)
+        valid = ((status & back_status).reshape(-1, NUM_LANDMARKS) == 1) & (fb_error < self.maxError)
+        if (valid.sum(axis=1) < self.minValid).any():
+            return False
+        if (np.median(fb_error, axis=1) > self.maxError).any():
+            return False
+
+        # 无效点沿用本手有效点的平均位移
+        moved = next_pts.reshape(-1, NUM_LANDMARKS, 2)
+        prev = prev_pts.reshape(-1, NUM_LANDMARKS, 2)
+        for i in range(len(moved)):
+            shift = (moved[i][valid[i]] - prev[i][valid[i]]).mean(axis=0)
+            moved[i][~valid[i]] = prev[i][~valid[i]] + shift
+
+        # z 保持上次检测的值
+        self._landmarks[:, :, :2] = moved / scale
+        self.results = results_from_array(self._landmarks, self.handedness or [])
+        self.flow_stats["track"] += 1
+        return True
+
+    def findHands(self, frame, draw=True):
+        self._prev_gray, self._gray = self._gray, reuse(self._prev_gray, frame.shape[:2])
+        code = cv2.COLOR_RGB2GRAY if getattr(self.detector, 'rgbInput', False) else cv2.COLOR_BGR2GRAY
+        cv2.cvtColor(frame, code, dst=self._gray)
+
+        self._since_detect += 1
+        need_detect = (len(self._landmarks) == 0 or self._prev_gray is None
+                       or self._prev_gray.shape != self._gray.shape
+                       or self._since_detect >= self.detectInterval)
+        if need_detect:
+            self._detect(frame, draw)
+            return frame
+
+        if not self._track(frame):
+            # 跟踪误差过大，重新检测
+            self.flow_stats["redetect"] += 1
+            self._detect(frame, draw)
+            return frame
+
+        if draw:
+            for hand_landmarks in self.results.multi_hand_landmarks:
+                self.mpDraw.draw_landmarks(frame, hand_landmarks, self.mpHands.HAND_CONNECTIONS)
+        return frame
+
+    def _landmark_array(self):
+        return self._landmarks.copy()
+
+    def close(self):
+        self.detector.close()
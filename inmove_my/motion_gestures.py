@@ -0,0 +1,134 @@
+from collections import deque
+
+import numpy as np
+
+from finger_state import FINGER_NAMES, CHAIN_SLOTS
+
+SWIPE_LEFT, SWIPE_RIGHT, SWIPE_UP, SWIPE_DOWN = "swipe_left", "swipe_right", "swipe_up", "swipe_down"
+WAVE = "wave"
+TAP_PREFIX = "tap_"
+PALM_CENTER = [0, 5, 9, 13, 17]   # 手腕和四指根部，平均作为手掌中心
+PALM_BASE = 9
+
+
+class MotionRecognizer:
+    """
+    动态手势流式识别：挥动(swipe)、摆手(wave)、手指点击(tap)
+    每帧只做常数量的更新：手掌轨迹存入定长环形缓冲，窗口起点随时间前移，
+    摆手只记录方向反转的时刻，点击是每根手指的小状态机，不回扫历史
+    位移以手掌长度（手腕->中指根部）为单位，与距离摄像头远近无关
+    """
+
+    def __init__(self, swipe_ms=500, swipe_distance=2.0, wave_ms=1500, wave_amplitude=0.6,
+                 wave_reversals=3, tap_ms=400, tap_on=0.6, tap_off=0.3, refractory_ms=600,
+                 capacity=64):
+        self.swipe_ms = swipe_ms                # 挥动须在该时间内完成
+        self.swipe_distance = swipe_distance    # 挥动最小位移（手掌长度）
+        self.wave_ms = wave_ms
+        self.wave_amplitude = wave_amplitude    # 摆手单次摆幅（手掌长度）
+        self.wave_reversals = wave_reversals    # 窗口内方向反转次数
+        self.tap_ms = tap_ms                    # 弯下再伸直须在该时间内完成
+        self.tap_on = tap_on
+        self.tap_off = tap_off
+        self.refractory_ms = refractory_ms      # 同类事件触发后的冷却时间
+
+        self._times = np.zeros(capacity)
+        self._points = np.zeros((capacity, 2), dtype=np.float32)
+        self._fingers = len(CHAIN_SLOTS)
+        self._last_event = {}
+        self.reset()
+
+    def reset(self):
+        """手离开画面时清空轨迹"""
+        self._head = 0      # 下一个写入位置
+        self._tail = 0      # 窗口内最早的点
+        self._count = 0
+        self._extreme = None        # 摆手：当前方向上的极值x
+        self._direction = 0
+        self._reversals = deque(maxlen=self.wave_reversals * 2)
+        self._tap_start = np.full(self._fingers, -np.inf)
+        self._tap_down = np.zeros(self._fingers, dtype=bool)
+
+    def _fire(self, name, now, events):
+        if now - self._last_event.get(name, -np.inf) >= self.refractory_ms:
+            self._last_event[name] = now
+            events.append(name)
+
+    def _push(self, point, now):
+        capacity = len(self._times)
+        if self._count == capacity:
+            self._tail = (self._tail + 1) % capacity
+            self._count -= 1
+        self._times[self._head] = now
+        self._points[self._head] = point
+        self._head = (self._head + 1) % capacity
+        self._count += 1
+        # 丢弃窗口之外的旧点（均摊O(1)）
+        while self._count > 1 and self._times[self._tail] < now - self.swipe_ms:
+            self._tail = (self._tail + 1) % capacity
+            self._count -= 1
+
+    def _update_swipe(self, point, now, events):
+        dx, dy = point - self._points[self._tail]
+        if max(abs(dx), abs(dy)) < self.swipe_distance:
+            return
+        if abs(dx) >= 2 * abs(dy):
+            self._fire(SWIPE_RIGHT if dx > 0 else SWIPE_LEFT, now, events)
+        elif abs(dy) >= 2 * abs(dx):
+            self._fire(SWIPE_DOWN if dy > 0 else SWIPE_UP, now, events)
+        else:
+            return
+        # 触发后从当前点重新开始，避免同一次挥动重复触发
+        self._tail = (self._head - 1) % len(self._times)
+        self._count = 1
+
+    def _update_wave(self, x, now, events):
+        if self._extreme is None:
+            self._extreme = x
+            return
+        moved = x - self._extreme
+        if self._direction == 0:
+            if abs(moved) >= self.wave_amplitude:
+                self._direction = 1 if moved > 0 else -1
+                self._extreme = x
+        elif moved * self._direction > 0:
+            self._extreme = x   # 同方向继续移动，更新极值
+        elif abs(moved) >= self.wave_amplitude:
+            # 反向移动超过摆幅，记一次反转
+            self._direction = -self._direction
+            self._extreme = x
+            self._reversals.append(now)
+        while self._reversals and self._reversals[0] < now - self.wave_ms:
+            self._reversals.popleft()
+        if len(self._reversals) >= self.wave_reversals:
+            self._reversals.clear()
+            self._fire(WAVE, now, events)
+
+    def _update_taps(self, flexion, now, events):
+        values = flexion[CHAIN_SLOTS]
+        pressed = ~self._tap_down & (values >= self.tap_on)
+        self._tap_start[pressed] = now
+        self._tap_down |= pressed
+        released = self._tap_down & (values <= self.tap_off)
+        self._tap_down &= ~released
+        for i in np.flatnonzero(released & (now - self._tap_start <= self.tap_ms)):
+            self._fire(TAP_PREFIX + FINGER_NAMES[CHAIN_SLOTS[i]], now, events)
+
+    def update(self, landmarks, flexion, timestamp_ms):
+        """
+        输入一只手的一帧
+        :param landmarks: (21, 3) 像素坐标
+        :param flexion: (6,) 连续弯曲程度，见 finger_flexion
+        :param timestamp_ms: 帧时间（毫秒）
+        :return: 本帧触发的事件名列表
+        """
+        landmarks = np.asarray(landmarks, dtype=np.float32)
+        size = np.linalg.norm(landmarks[PALM_BASE, :2] - landmarks[0, :2]) + 1e-6
+        point = landmarks[PALM_CENTER, :2].mean(axis=0) / size
+
+        events = []
+        self._push(point, timestamp_ms)
+        self._update_swipe(point, timestamp_ms, events)
+        self._update_wave(point[0], timestamp_ms, events)
+        self._update_taps(np.asarray(flexion), timestamp_ms, events)
+        return events
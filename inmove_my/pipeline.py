@@ -0,0 +1,176 @@
+import threading
+import time
+from collections import deque
+
+# 队列满时的处理策略
+DROP_OLDEST = "drop_oldest"   # 丢弃最旧的数据（适合视频帧，保证新鲜度）
+BLOCK = "block"               # 阻塞上游直到有空位（适合不能丢的串口指令）
+
+# 流水线结束标记
+END = object()
+
+
+class StageQueue:
+    """有界队列，支持丢旧/阻塞两种满队策略，并记录深度与丢弃数"""
+
+    def __init__(self, maxsize=2, policy=DROP_OLDEST):
+        if policy not in (DROP_OLDEST, BLOCK):
+            raise ValueError(f"未知队列策略: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+        self.max_depth = 0
+
+    def put(self, item, on_drop=None):
+        with self._cond:
+            if item is not END:
+                if self.policy == BLOCK:
+                    self._cond.wait_for(lambda: len(self._items) < self.maxsize or self._closed)
+                    if self._closed:
+                        return
+                elif len(self._items) >= self.maxsize:
+                    old = self._items.popleft()
+                    self.dropped += 1
+                    if on_drop is not None:
+                        on_drop(old)
+            self._items.append(item)
+            self.max_depth = max(self.max_depth, len(self._items))
+            self._cond.notify_all()
+
+    def get(self, timeout=None):
+        """取出一项，超时返回None"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self._closed, timeout):
+                return None
+            if not self._items:
+                return END
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        """唤醒所有等待者，之后get返回END"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def depth(self):
+        with self._cond:
+            return len(self._items)
+
+
+class Stage(threading.Thread):
+    """
+    流水线中的一个阶段，在独立线程中运行
+    func(item) 返回下一阶段的输入，返回None表示本项到此为止；
+    没有输入队列的源阶段以 func(None) 反复产生数据，返回END时流水线结束
+    """
+
+    def __init__(self, name, func, inbox=None, on_drop=None):
+        super().__init__(name=name, daemon=True)
+        self.func = func
+        self.inbox = inbox
+        self.outputs = []       # 下游输入队列，可以有多个
+        self.on_drop = on_drop  # 下游丢弃数据时的回调（用于归还缓冲）
+        self.running = True
+        self.error = None
+        self.on_error = None    # 本阶段异常时的回调（流水线据此停止所有阶段）
+        self.processed = 0
+        self.busy_time = 0.0
+
+    def _emit(self, item):
+        for queue in self.outputs:
+            queue.put(item, self.on_drop)
+
+    def run(self):
+        try:
+            while self.running:
+                if self.inbox is not None:
+                    item = self.inbox.get(timeout=0.1)
+                    if item is None:
+                        continue
+                    if item is END:
+                        break
+                else:
+                    item = None
+                start = time.perf_counter()
+                result = self.func(item)
+                self.busy_time += time.perf_counter() - start
+                if result is END:
+                    break
+                self.processed += 1
+                if result is not None:
+                    self._emit(result)
+        except Exception as e:
+            self.error = e
+            if self.on_error is not None:
+                self.on_error()
+        finally:
+            self._emit(END)
+
+    def stats(self):
+        avg_ms = self.busy_time / self.processed * 1000 if self.processed else 0.0
+        info = {"processed": self.processed, "avg_ms": avg_ms}
+        if self.inbox is not None:
+            info.update(depth=self.inbox.depth(), maxsize=self.inbox.maxsize,
+                        max_depth=self.inbox.max_depth, dropped=self.inbox.dropped)
+        return info
+
+
+class Pipeline:
+    """由有界队列连接的多阶段流水线，吞吐量取决于最慢的阶段而不是各阶段之和"""
+
+    def __init__(self):
+        self.stages = {}
+
+    def add_stage(self, name, func, upstream=None, maxsize=2, policy=DROP_OLDEST, on_drop=None):
+        """
+        添加阶段
+        :param upstream: 上游阶段名（可为列表），默认接在最后添加的阶段之后；第一个阶段为源阶段
+        """
+        if not self.stages:
+            stage = Stage(name, func, on_drop=on_drop)
+        else:
+            if upstream is None:
+                upstream = list(self.stages)[-1]
+            if isinstance(upstream, str):
+                upstream = [upstream]
+            stage = Stage(name, func, StageQueue(maxsize, policy), on_drop=on_drop)
+            for up in upstream:
+                self.stages[up].outputs.append(stage.inbox)
+        # 任一阶段异常时整条流水线停止：上游阶段不会继续运行，也不会阻塞在已无人消费的队列上
+        stage.on_error = self.abort
+        self.stages[name] = stage
+        return stage
+
+    def start(self):
+        for stage in self.stages.values():
+            stage.start()
+        return self
+
+    def is_alive(self):
+        return any(stage.is_alive() for stage in self.stages.values())
+
+    def join(self, timeout=None):
+        for stage in self.stages.values():
+            stage.join(timeout)
+
+    def abort(self):
+        """通知所有阶段退出并唤醒阻塞在队列上的线程，不等待"""
+        for stage in self.stages.values():
+            stage.running = False
+            if stage.inbox is not None:
+                stage.inbox.close()
+
+    def stop(self):
+        self.abort()
+        self.join(timeout=1.0)
+
+    def errors(self):
+        return {name: stage.error for name, stage in self.stages.items() if stage.error is not None}
+
+    def stats(self):
+        return {name: stage.stats() for name, stage in self.stages.items()}
@@ -0,0 +1,184 @@
+import csv
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from serial_protocol import SYNC, FRAME_STATE, FrameDecoder
+
+RECEIVED_PREFIX = "Received: "          # 下位机收到指令
+COMPLETE_PREFIX = "Current state: "     # 150步扫动完成
+RECEIVE = "receive"
+COMPLETE = "complete"
+
+# 直方图分桶边界(ms)，最后一桶为 >= 2000ms
+HISTOGRAM_EDGES_MS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+
+
+def parse_ack(line):
+    """
+    解析下位机回显，二进制协议下附带序号
+    "Received: 011111 #12" -> ("receive", "011111", 12)；"Current state: 011111" -> ("complete", "011111", None)
+    其他行返回None
+    """
+    for kind, prefix in ((RECEIVE, RECEIVED_PREFIX), (COMPLETE, COMPLETE_PREFIX)):
+        if line.startswith(prefix):
+            parts = line[len(prefix):].split()
+            if not parts or len(parts[0]) != 6:
+                return None
+            seq = None
+            if len(parts) > 1 and parts[1].startswith("#") and parts[1][1:].isdigit():
+                seq = int(parts[1][1:])
+            return kind, parts[0], seq
+    return None
+
+
+def sent_command(data):
+    """
+    实际写出的字节 -> (6位指令, 序号)
+    文本指令没有序号；比例控制等下位机不回显的数据返回None
+    """
+    if data[:1] == bytes((SYNC,)):
+        frames = FrameDecoder().feed(data)
+        if frames and frames[0][0] == FRAME_STATE:
+            return format(frames[0][2][0], "06b"), frames[0][1]
+        return None
+    text = data.decode("ascii", errors="ignore").strip()
+    if len(text) == 6 and set(text) <= {"0", "1"}:
+        return text, None
+    return None
+
+
+class LatencyHistogram:
+    """固定分桶计数 + 最近样本（用于分位数）"""
+
+    def __init__(self, edges=HISTOGRAM_EDGES_MS, history=1024):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.zeros(len(edges), dtype=np.int64)
+        self.samples = deque(maxlen=history)
+
+    def add(self, ms):
+        self.counts[max(np.searchsorted(self.edges, ms, side="right") - 1, 0)] += 1
+        self.samples.append(ms)
+
+    def summary(self):
+        if not self.samples:
+            return {"count": 0}
+        values = np.fromiter(self.samples, dtype=np.float64)
+        return {"count": int(self.counts.sum()), "p50": round(float(np.percentile(values, 50)), 2),
+                "p95": round(float(np.percentile(values, 95)), 2), "max": round(float(values.max()), 2)}
+
+    def buckets(self):
+        """[("0-1ms", 计数), ..., (">=2000ms", 计数)]"""
+        labels = [f"{a:g}-{b:g}ms" for a, b in zip(self.edges[:-1], self.edges[1:])] + [f">={self.edges[-1]:g}ms"]
+        return list(zip(labels, self.counts.tolist()))
+
+
+class LatencyTracker:
+    """
+    一个串口（一只机械手）的指令往返延迟统计
+    sent() 由写线程在指令实际写出时调用，on_line() 由读线程对每行回显调用；
+    有序号时按序号匹配，文本协议按指令内容匹配最早的未确认指令
+    分别统计 指令->下位机收到（链路）和 指令->动作完成（链路+舵机扫动）
+    """
+
+    def __init__(self, name, timeout=2.0, capacity=64, history=4096):
+        self.name = name
+        self.timeout = timeout      # 超过该时间未完成的指令不再等待
+        self._lock = threading.Lock()
+        self._pending = deque()     # [指令, 序号, 发送时间, 收到时间]
+        self.capacity = capacity
+        self.receive = LatencyHistogram()
+        self.complete = LatencyHistogram()
+        self.records = deque(maxlen=history)    # (序号, 指令, 发送时间, 收到延迟ms, 完成延迟ms)
+        self.lost = 0           # 超时仍未收到回显的指令数
+        self.unmatched = 0      # 无法匹配到发送记录的回显数
+
+    def sent(self, data, timestamp=None):
+        command = sent_command(data)
+        if command is None:
+            return
+        now = time.perf_counter() if timestamp is None else timestamp
+        with self._lock:
+            self._expire(now)
+            if len(self._pending) >= self.capacity:
+                self._finish(self._pending.popleft())
+            self._pending.append([command[0], command[1], now, None])
+
+    def cancel(self, data, timestamp):
+        """撤销 sent() 记录的一次发送（写超时，数据没有写出），不计入丢失"""
+        command = sent_command(data)
+        if command is None:
+            return
+        with self._lock:
+            for entry in self._pending:
+                if entry[:3] == [command[0], command[1], timestamp] and entry[3] is None:
+                    self._pending.remove(entry)
+                    return
+
+    def on_line(self, line, timestamp=None):
+        """处理一行回显，是确认行时返回True"""
+        ack = parse_ack(line)
+        if ack is None:
+            return False
+        kind, command, seq = ack
+        now = time.perf_counter() if timestamp is None else timestamp
+        with self._lock:
+            self._expire(now)
+            matches = [i for i, entry in enumerate(self._pending)
+                       if entry[0] == command and (seq is None or entry[1] == seq)
+                       and (entry[3] is None) == (kind == RECEIVE)]
+            if not matches:
+                self.unmatched += 1
+                return True
+            if kind == RECEIVE:
+                entry = self._pending[matches[0]]
+                entry[3] = now
+                self.receive.add((now - entry[2]) * 1000)
+            else:
+                # 动作完成对应最近一条已收到的相同指令，更早的指令已被覆盖，一并结束
+                index = matches[-1]
+                for _ in range(index):
+                    self._finish(self._pending.popleft())
+                entry = self._pending.popleft()
+                self.complete.add((now - entry[2]) * 1000)
+                self._finish(entry, now)
+        return True
+
+    def _expire(self, now):
+        while self._pending and now - self._pending[0][2] > self.timeout:
+            self._finish(self._pending.popleft())
+
+    def _finish(self, entry, completed=None):
+        command, seq, sent, received = entry
+        if received is None:
+            self.lost += 1
+        self.records.append((seq, command, sent,
+                             None if received is None else (received - sent) * 1000,
+                             None if completed is None else (completed - sent) * 1000))
+
+    def summary(self):
+        with self._lock:
+            return {"receive_ms": self.receive.summary(), "complete_ms": self.complete.summary(),
+                    "lost": self.lost, "unmatched": self.unmatched}
+
+
+def export_latency(path, trackers):
+    """把各通道的逐条记录和直方图写入CSV"""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["channel", "seq", "command", "sent_s", "receive_ms", "complete_ms"])
+        for tracker in trackers:
+            with tracker._lock:
+                records = list(tracker.records)
+            for seq, command, sent, receive_ms, complete_ms in records:
+                writer.writerow([tracker.name, "" if seq is None else seq, command, f"{sent:.6f}",
+                                 "" if receive_ms is None else f"{receive_ms:.3f}",
+                                 "" if complete_ms is None else f"{complete_ms:.3f}"])
+        writer.writerow([])
+        writer.writerow(["channel", "histogram", "bucket", "count"])
+        for tracker in trackers:
+            for kind, histogram in ((RECEIVE, tracker.receive), (COMPLETE, tracker.complete)):
+                for bucket, count in histogram.buckets():
+                    writer.writerow([tracker.name, kind, bucket, count])
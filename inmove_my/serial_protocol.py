@@ -0,0 +1,179 @@
+import threading
+import time
+
+import numpy as np
+
+from servo_stream import decode_positions
+
+# 二进制帧：SYNC | 版本<<4|类型 | 序号 | 负载长度 | 负载 | CRC8
+# CRC8 覆盖同步字节之后到负载结束的所有字节（多项式0x07，初值0）
+SYNC = 0xA5
+VERSION = 1
+HEADER_SIZE = 4
+
+FRAME_STATE = 0x1       # 负载1字节：6位手指状态码，最高位为手腕，同 STATE_MESSAGES
+FRAME_POSITIONS = 0x2   # 负载6字节：各手指目标位置 0(伸直)~255(弯曲)，顺序同 FINGER_NAMES
+FRAME_BAUD = 0x3        # 负载4字节：小端 uint32 新波特率
+FRAME_PING = 0x4        # 无负载，下位机回复 "Pong"
+PAYLOAD_LENGTHS = {FRAME_STATE: 1, FRAME_POSITIONS: 6, FRAME_BAUD: 4, FRAME_PING: 0}
+
+DEFAULT_BAUDRATE = 9600
+FAST_BAUDRATE = 115200
+
+
+def _crc8_table():
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+        table.append(crc)
+    return bytes(table)
+
+
+CRC8_TABLE = _crc8_table()
+
+
+def crc8(data, crc=0):
+    for byte in data:
+        crc = CRC8_TABLE[crc ^ byte]
+    return crc
+
+
+def encode_frame(frame_type, seq, payload=b""):
+    """组帧，返回 bytes"""
+    body = bytes((VERSION << 4 | frame_type, seq & 0xFF, len(payload))) + bytes(payload)
+    return bytes((SYNC,)) + body + bytes((crc8(body),))
+
+
+class FrameEncoder:
+    """
+    按端口维护发送序号的帧编码器，可被处理线程和比例控制发送线程同时使用
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.seq = 0
+
+    def _next(self, frame_type, payload=b""):
+        with self._lock:
+            seq = self.seq
+            self.seq = (seq + 1) & 0xFF
+        return encode_frame(frame_type, seq, payload)
+
+    def encode_state(self, code):
+        return self._next(FRAME_STATE, bytes((code & 0x3F,)))
+
+    def encode_positions(self, positions):
+        return self._next(FRAME_POSITIONS, bytes(np.asarray(positions, dtype=np.uint8)))
+
+    def encode_baud(self, baudrate):
+        return self._next(FRAME_BAUD, int(baudrate).to_bytes(4, "little"))
+
+    def encode_ping(self):
+        return self._next(FRAME_PING)
+
+    def encode_command(self, command):
+        """文本指令（"011111" 或 "P00FF..."）转为对应的帧，无法解析返回None"""
+        command = command.strip()
+        if len(command) == 6 and set(command) <= {"0", "1"}:
+            return self.encode_state(int(command, 2))
+        positions = decode_positions(command)
+        if positions is not None:
+            return self.encode_positions(positions)
+        return None
+
+
+class FrameDecoder:
+    """
+    流式解帧：feed() 接收任意切分的字节，返回完整且校验通过的帧 [(类型, 序号, 负载)]
+    CRC错误或版本/长度非法时从同步字节之后重新搜索，不会把损坏的数据当作指令
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self.frames = 0
+        self.crc_errors = 0
+        self.invalid = 0        # 版本不符、类型未知或长度非法
+        self.skipped = 0        # 搜索同步字节时丢弃的字节数
+
+    def feed(self, data):
+        self._buffer += data
+        buffer = self._buffer
+        frames = []
+        while True:
+            start = buffer.find(SYNC)
+            if start < 0:
+                self.skipped += len(buffer)
+                buffer.clear()
+                break
+            if start:
+                self.skipped += start
+                del buffer[:start]
+            if len(buffer) < HEADER_SIZE:
+                break
+            version, frame_type, length = buffer[1] >> 4, buffer[1] & 0x0F, buffer[3]
+            if version != VERSION or PAYLOAD_LENGTHS.get(frame_type) != length:
+                self.invalid += 1
+                del buffer[:1]
+                continue
+            end = HEADER_SIZE + length + 1
+            if len(buffer) < end:
+                break
+            if crc8(buffer[1:end - 1]) != buffer[end - 1]:
+                self.crc_errors += 1
+                del buffer[:1]
+                continue
+            frames.append((frame_type, buffer[2], bytes(buffer[HEADER_SIZE:end - 1])))
+            self.frames += 1
+            del buffer[:end]
+        return frames
+
+    def stats(self):
+        return {"frames": self.frames, "crc_errors": self.crc_errors,
+                "invalid": self.invalid, "skipped": self.skipped}
+
+
+def _wait_line(ser, expected, timeout):
+    """读取下位机输出直到出现 expected 开头的行，超时返回False"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        line = ser.readline().decode("utf-8", errors="ignore").strip()
+        if line.startswith(expected):
+            return True
+    return False
+
+
+def _ping(ser, encoder, timeout):
+    ser.reset_input_buffer()
+    ser.write(encoder.encode_ping())
+    ser.flush()
+    return _wait_line(ser, "Pong", timeout)
+
+
+def negotiate_baud(ser, encoder, baudrate=FAST_BAUDRATE, timeout=0.5, boot_timeout=3.0):
+    """
+    切换到二进制协议并协商更高的波特率，应在启动串口监听线程之前调用；
+    需要数秒，不要在界面线程中调用
+    1. 以当前波特率发送 FRAME_BAUD，下位机回复 "Baud: <波特率>" 后切换
+    2. 主机切换后发送 FRAME_PING，收到 "Pong" 即确认；
+       下位机切换后1秒内没有收到有效帧会自行恢复原波特率
+    下位机没有回复时再以新波特率探测一次（上次运行已切换、下位机未复位的情况）
+    ESP32 在打开串口时复位，setup() 中 initializeServos() 要1秒以上才开始处理串口数据，
+    因此失败后以原波特率重试，直到超过 boot_timeout
+    :return: bool 下位机是否支持二进制协议（失败时串口恢复原波特率）
+    """
+    original = ser.baudrate
+    deadline = time.perf_counter() + boot_timeout
+    while True:
+        ser.reset_input_buffer()
+        ser.write(encoder.encode_baud(baudrate))
+        ser.flush()
+        # 无论是否收到回复都以新波特率确认一次
+        _wait_line(ser, f"Baud: {baudrate}", timeout)
+        ser.baudrate = baudrate
+        if _ping(ser, encoder, timeout):
+            return True
+        ser.baudrate = original
+        if time.perf_counter() >= deadline:
+            return False
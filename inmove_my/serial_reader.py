@@ -0,0 +1,102 @@
+import threading
+import traceback
+
+MAX_LINE = 256   # 单行最大长度，超过时丢弃这一行
+
+
+class SerialReader:
+    """
+    事件驱动的串口读取线程，代替 in_waiting + sleep 轮询
+    阻塞读取（依赖串口的 timeout 唤醒检查停止标志）：有数据时立即返回，空闲时不占CPU；
+    收到的字节增量切分成行，每行回调 on_line(str)。行缓冲有上限，下位机输出异常时不会无限增长
+    stop() 后线程在一个 timeout 内退出，不会在每次重新启动时遗留线程
+    """
+
+    def __init__(self, ser, on_line, on_error=None, max_line=MAX_LINE):
+        self.ser = ser
+        self.on_line = on_line
+        self.on_error = on_error
+        self.max_line = max_line
+        self._buffer = bytearray()
+        self._discarding = False    # 正在丢弃超长行的剩余部分
+        self._thread = None
+        self.running = False
+        self.lines = 0
+        self.overflows = 0      # 超长被丢弃的行数
+        self.callback_errors = 0    # on_line 回调抛出的异常数（不会中断读取）
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self.run, name=f"serial_reader_{self.ser.port}", daemon=True)
+        self._thread.start()
+        return self
+
+    def run(self):
+        while self.running:
+            try:
+                # 先阻塞等待至少1个字节，再一次取走缓冲区中已到达的全部数据
+                data = self.ser.read(1)
+                if data and self.ser.in_waiting:
+                    data += self.ser.read(self.ser.in_waiting)
+            except Exception as e:
+                if self.running and self.on_error is not None:
+                    self.on_error(e)
+                break
+            if data:
+                self.feed(data)
+        self.running = False
+
+    def feed(self, data):
+        """增量切分行"""
+        buffer = self._buffer
+        buffer += data
+        while True:
+            end = buffer.find(b"\n")
+            if end < 0:
+                break
+            line = bytes(buffer[:end])
+            del buffer[:end + 1]
+            if self._discarding:
+                self._discarding = False
+                continue
+            if len(line) > self.max_line:
+                self.overflows += 1
+                continue
+            line = line.decode("utf-8", errors="replace").strip()
+            if line:
+                self.lines += 1
+                try:
+                    self.on_line(line)
+                except Exception:
+                    self.callback_errors += 1
+                    print(traceback.format_exc())
+        if len(buffer) > self.max_line:
+            # 没有换行的超长数据：丢弃到下一个换行为止
+            self.overflows += 1
+            self._discarding = True
+            buffer.clear()
+
+    def stop(self, timeout=1.0):
+        self.running = False
+        cancel = getattr(self.ser, "cancel_read", None)
+        if cancel is not None:
+            try:
+                cancel()
+            except Exception:
+                pass
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+            self._thread = None
+
+
+def serial_monitor(ser, status_signal, latency=None):
+    """
+    启动监听Arduino串口输出的线程（阻塞读取，不轮询），返回 SerialReader，关闭串口前调用其 stop()
+    :param status_signal: pyqtSignal(str)，跨线程把回显交给界面显示
+    :param latency: LatencyTracker，回显行同时用于匹配指令确认
+    """
+    def on_line(line):
+        if latency is not None:
+            latency.on_line(line)
+        status_signal.emit(f"[Arduino]: {line}")
+    return SerialReader(ser, on_line, lambda e: status_signal.emit(f"串口连接异常: {str(e)}")).start()
@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import serial
+
+
+def _summary(samples):
+    """延迟样本(ms) -> {mean, p95, max}"""
+    if not samples:
+        return None
+    values = np.fromiter(samples, dtype=np.float64)
+    return {"mean": round(float(values.mean()), 3), "p95": round(float(np.percentile(values, 95)), 3),
+            "max": round(float(values.max()), 3)}
+
+
+class SerialWriter:
+    """
+    串口异步写线程
+    调用方 write() 只把数据放进单槽邮箱后立即返回，写线程取出后 write + flush；
+    端口忙时尚未写出的旧数据直接被新数据覆盖（最新值优先），不排队，
+    串口卡顿时处理线程不会阻塞，恢复后也不会补发一串过时的手势
+    提供与 serial.Serial 相同的 write/flush/is_open 接口，可直接代替串口对象传给 VideoThread、ServoStreamer
+    on_write(data, 开始写的时间) 在每次实际写出前调用（合并掉的数据不会出现），用于往返延迟统计；
+    先记录再写，下位机回显再快也不会早于发送记录到达读线程
+    on_written(data) 在写完（write + flush 成功）后调用，用于报告发送成功
+    写超时（write_timeout）只计入 timeouts 并丢弃该条，同时调用 on_timeout(data, 开始写的时间) 撤销发送记录；
+    端口关闭等真正的I/O错误才停止写线程
+    """
+
+    def __init__(self, ser, history=256, on_write=None, on_written=None, on_timeout=None):
+        self.ser = ser
+        self.on_write = on_write
+        self.on_written = on_written
+        self.on_timeout = on_timeout
+        self._cond = threading.Condition()
+        self._pending = None        # (数据, 提交时间)
+        self._thread = None
+        self.running = False
+        self.error = None
+        self.submitted = 0          # write() 调用次数
+        self.written = 0            # 实际写出次数
+        self.coalesced = 0          # 被更新数据覆盖、未写出的次数
+        self.timeouts = 0           # 写超时次数（只丢失这一条，写线程继续运行）
+        self.last_timeout = None
+        self.queue_wait = deque(maxlen=history)   # 提交到开始写的等待(ms)
+        self.write_time = deque(maxlen=history)   # write + flush 耗时(ms)
+
+    @property
+    def is_open(self):
+        return self.running and self.error is None and self.ser.is_open
+
+    @property
+    def port(self):
+        return self.ser.port
+
+    def write(self, data):
+        with self._cond:
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = (bytes(data), time.perf_counter())
+            self.submitted += 1
+            self._cond.notify()
+        return len(data)
+
+    def flush(self):
+        """由写线程在每次写入后flush，调用方不等待"""
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name=f"serial_writer_{self.ser.port}", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and self.running:
+                    self._cond.wait()
+                if self._pending is None:
+                    break
+                data, submitted = self._pending
+                self._pending = None
+            start = time.perf_counter()
+            if self.on_write is not None:
+                self.on_write(data, start)
+            try:
+                self.ser.write(data)
+                self.ser.flush()
+            except serial.SerialTimeoutException as e:
+                # 端口暂时卡住：丢弃这一条，下一条最新数据照常写
+                self.timeouts += 1
+                self.last_timeout = e
+                if self.on_timeout is not None:
+                    self.on_timeout(data, start)
+                continue
+            except Exception as e:
+                # 端口关闭、设备拔出等真正的I/O错误才停止
+                self.error = e
+                break
+            end = time.perf_counter()
+            self.queue_wait.append((start - submitted) * 1000)
+            self.write_time.append((end - start) * 1000)
+            self.written += 1
+            if self.on_written is not None:
+                self.on_written(data)
+
+    def stop(self, timeout=1.0):
+        """停止写线程，邮箱中最后一条数据会先写出"""
+        with self._cond:
+            self.running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self):
+        return {"submitted": self.submitted, "written": self.written, "coalesced": self.coalesced,
+                "timeouts": self.timeouts,
+                "queue_wait_ms": _summary(self.queue_wait), "write_ms": _summary(self.write_time)}
@@ -0,0 +1,104 @@
+import threading
+import time
+
+import numpy as np
+
+# 比例控制指令：'P' + 6个两位十六进制位置(00伸直~FF弯曲) + '\n'，顺序同 FINGER_NAMES
+POSITION_PREFIX = "P"
+POSITION_MAX = 255
+
+
+def flexion_to_positions(flexion):
+    """连续弯曲程度 0~1 (6,) -> 舵机目标位置 uint8 (6,)"""
+    return np.rint(np.clip(flexion, 0.0, 1.0) * POSITION_MAX).astype(np.uint8)
+
+
+def encode_positions(positions):
+    """uint8 (6,) -> b"P00FF80...\n"，共14字节"""
+    return (POSITION_PREFIX + bytes(np.asarray(positions, dtype=np.uint8)).hex().upper() + "\n").encode("ascii")
+
+
+def decode_positions(line):
+    """解析比例控制指令，格式错误返回None"""
+    line = line.strip()
+    if len(line) != 13 or not line.startswith(POSITION_PREFIX):
+        return None
+    try:
+        return np.frombuffer(bytes.fromhex(line[1:]), dtype=np.uint8)
+    except ValueError:
+        return None
+
+
+def pose_to_positions(command):
+    """姿态指令（6位开关指令或比例控制指令）-> 目标位置，无法解析返回None"""
+    command = command.strip()
+    if len(command) == 6 and set(command) <= {"0", "1"}:
+        return np.array([POSITION_MAX if c == "1" else 0 for c in command], dtype=np.uint8)
+    return decode_positions(command)
+
+
+class ServoStreamer:
+    """
+    按固定频率把最新的舵机目标位置发送到下位机
+    处理线程 update() 只覆盖目标值，发送线程每个周期取最新值；
+    与上次发送相比变化不超过 deadband 时跳过本周期，降低串口占用
+    encode 把目标位置编码为发送字节，默认文本指令，二进制协议时传入 FrameEncoder.encode_positions
+    """
+
+    def __init__(self, ser, rate_hz=20, deadband=3, encode=encode_positions):
+        self.ser = ser
+        self.encode = encode
+        self.period = 1.0 / rate_hz
+        self.deadband = deadband
+        self._lock = threading.Lock()
+        self._target = None
+        self._sent = None
+        self._thread = None
+        self.running = False
+        self.sent = 0       # 已发送条数
+        self.skipped = 0    # 因变化过小跳过的周期数
+        self.error = None
+
+    def update(self, positions):
+        with self._lock:
+            self._target = np.asarray(positions, dtype=np.uint8).copy()
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name="servo_stream", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        next_time = time.perf_counter()
+        while self.running:
+            with self._lock:
+                target = self._target
+            if target is not None:
+                if self._sent is not None and \
+                        np.abs(target.astype(np.int16) - self._sent).max() <= self.deadband:
+                    self.skipped += 1
+                else:
+                    try:
+                        self.ser.write(self.encode(target))
+                        self._sent = target
+                        self.sent += 1
+                    except Exception as e:
+                        self.error = e
+                        break
+            # 按绝对时间排程，避免写串口耗时累积成频率漂移
+            next_time += self.period
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_time = time.perf_counter()
+
+    def stop(self):
+        self.running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def stats(self):
+        return {"sent": self.sent, "skipped": self.skipped}
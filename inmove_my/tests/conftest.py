@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 各模块以脚本方式运行、平铺导入（from serial_protocol import ...），测试时同样把 inmove_my 加入搜索路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,25 @@
+"""视频文件回放的帧时间戳"""
+import cv2
+import numpy as np
+import pytest
+
+from capture import VideoFileSource, PACED
+
+
+def test_video_file_timestamps_match_frames(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (32, 32))
+    if not writer.isOpened():
+        pytest.skip("OpenCV 不支持写入 MJPG")
+    for i in range(5):
+        writer.write(np.full((32, 32, 3), i * 40, dtype=np.uint8))
+    writer.release()
+
+    source = VideoFileSource(path, mode=PACED)
+    waits = []
+    source._wait_until = waits.append   # 记录每帧的回放时间，不实际等待
+    while source.read()[0]:
+        pass
+    source.release()
+    # 第 i 帧在 i/fps 秒播放，不能滞后一帧
+    assert waits == pytest.approx([0.0, 0.1, 0.2, 0.3, 0.4])
@@ -0,0 +1,39 @@
+"""推理进程封装：槽位用尽时提前取回的结果不能丢"""
+import queue
+from collections import deque
+
+import numpy as np
+import pytest
+
+pytest.importorskip("mediapipe")
+
+from detect_worker import RemoteHandDetector
+
+
+def fake_worker(detector, shape=(4, 4, 3)):
+    """不启动子进程，用普通队列代替进程间队列"""
+    detector._shape = shape
+    detector._frames = np.zeros((detector.slots,) + shape, dtype=np.uint8)
+    detector._requests = queue.Queue()
+    detector._responses = queue.Queue()
+    detector._free_slots = deque(range(detector.slots))
+
+
+def respond(detector):
+    seq, slot = detector._requests.get_nowait()
+    detector._responses.put((seq, np.full((1, 21, 3), seq, dtype=np.float32), ["Right"], {}))
+
+
+def test_result_consumed_by_submit_is_returned_later():
+    detector = RemoteHandDetector(slots=2)
+    fake_worker(detector)
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+    assert detector.submit(frame) == 1
+    assert detector.submit(frame) == 2
+    respond(detector)
+    respond(detector)
+    # 槽位用尽：submit 取回结果1腾出槽位，结果1仍由下一次 result() 返回
+    assert detector.submit(frame) == 3
+    respond(detector)
+    assert [detector.result(timeout=0.1)[0] for _ in range(3)] == [1, 2, 3]
+    assert len(detector._free_slots) == 2
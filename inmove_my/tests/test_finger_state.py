@@ -0,0 +1,105 @@
+"""手指状态：弯曲判断、弯曲程度和投票引擎（时间窗、滞回、保持时间、重置）"""
+import numpy as np
+
+from finger_state import (FINGER_CHAINS, STATE_MESSAGES, FingerStateEngine, encode_state,
+                          finger_flexion, fingers_bent)
+
+OPEN = np.zeros(6, dtype=bool)
+FIST = np.array([False, True, True, True, True, True])
+
+
+def hand(bent_fingers=(), thumb_dx=10.0):
+    """像素坐标 (21, 3)：四指指尖在PIP关节上方(伸直)或下方(弯曲)，拇指指尖相对IP关节偏移 thumb_dx"""
+    landmarks = np.full((21, 3), 100.0, dtype=np.float32)
+    for tip, pip in ((8, 6), (12, 10), (16, 14), (20, 18)):
+        landmarks[pip, 1] = 100
+        landmarks[tip, 1] = 130 if tip in bent_fingers else 70
+    landmarks[3, 0] = 100
+    landmarks[4, 0] = 100 + thumb_dx
+    return landmarks
+
+
+def test_fingers_bent():
+    bent = fingers_bent(np.stack([hand((8, 20)), hand(thumb_dx=10), hand(thumb_dx=10)]),
+                        ["Right", "Right", "Left"])
+    assert bent.tolist() == [[False, True, False, False, True, True],
+                             [False, False, False, False, True, False],
+                             [False, False, False, False, False, False]]
+    assert fingers_bent(np.zeros((0, 21, 3)), []).shape == (0, 6)
+
+
+def test_finger_flexion_straight_and_curled():
+    landmarks = np.zeros((2, 21, 3), dtype=np.float32)
+    for f, chain in enumerate(FINGER_CHAINS):
+        angle = -np.pi / 2 + (f - 2) * 0.3     # 各手指从手腕呈扇形伸出
+        straight = curled = np.zeros(3, dtype=np.float32)
+        for i, joint in enumerate(chain[1:]):
+            straight = straight + 20 * np.array((np.cos(angle), np.sin(angle), 0))
+            # 握紧：第一段之后每个关节弯折90度
+            turn = angle + np.pi / 2 * i
+            curled = curled + 20 * np.array((np.cos(turn), np.sin(turn), 0))
+            landmarks[0, joint] = straight
+            landmarks[1, joint] = curled
+    flexion = finger_flexion(landmarks)
+    assert flexion.shape == (2, 6)
+    assert np.all(flexion[:, 0] == 0)   # 手腕恒为0
+    assert np.allclose(flexion[0], 0)
+    assert np.all(flexion[1, 1:] > 0.9)
+
+
+def test_state_messages_match_codes():
+    assert encode_state(FIST) == int("011111", 2)
+    assert STATE_MESSAGES[encode_state(FIST)] == "011111"
+
+
+def feed(engine, bent, start_ms, count, step_ms=33.3):
+    """以约30FPS连续送入同一判断结果，返回每帧的变化掩码"""
+    return [engine.update(bent, start_ms + i * step_ms) for i in range(count)]
+
+
+def test_engine_first_frame_does_not_flip():
+    engine = FingerStateEngine(window_ms=60, hold_ms=100)
+    assert engine.update(FIST, 0.0) == 0
+    assert engine.state == 0
+
+
+def test_engine_flips_after_full_window():
+    engine = FingerStateEngine(window_ms=60, hold_ms=100)
+    changes = feed(engine, FIST, 0.0, 4)
+    assert changes == [0, 0, 0b011111, 0]
+    assert engine.state == 0b011111
+
+
+def test_engine_hysteresis_ignores_single_glitch():
+    engine = FingerStateEngine(window_ms=100, hold_ms=0)
+    feed(engine, FIST, 0.0, 10)
+    # 单帧误判只占窗口的1/4，低于 off_ratio 的要求，状态保持
+    assert engine.update(OPEN, 333.0) == 0
+    assert feed(engine, FIST, 366.0, 3) == [0, 0, 0]
+    assert engine.state == 0b011111
+
+
+def test_engine_hold_time():
+    engine = FingerStateEngine(window_ms=0, hold_ms=100)
+    assert engine.update(FIST, 0.0) == 0b011111
+    # 改变后100ms内不再改变
+    assert engine.update(OPEN, 50.0) == 0
+    assert engine.update(OPEN, 100.0) == 0b011111
+    assert engine.state == 0
+
+
+def test_engine_reset_reports_cleared_bits():
+    engine = FingerStateEngine(window_ms=60, hold_ms=100)
+    feed(engine, FIST, 0.0, 4)
+    assert engine.reset() == 0b011111
+    assert engine.state == 0
+    assert engine.reset() == 0
+
+
+def test_engine_clock_rollback_reports_reset():
+    engine = FingerStateEngine(window_ms=60, hold_ms=100)
+    feed(engine, FIST, 1000.0, 4)
+    # 视频从头重新播放：状态清零并报告变化，首帧不会立即翻转
+    assert engine.update(FIST, 0.0) == 0b011111
+    assert engine.state == 0
+    assert feed(engine, FIST, 33.3, 2) == [0, 0b011111]
@@ -0,0 +1,182 @@
+"""
+下位机仿真（firmware_emulator.py）上的串口链路测试，不需要硬件
+运行：在 inmove_my 目录下执行 python -m pytest -q tests
+"""
+import sys
+import threading
+import time
+
+import pytest
+
+serial = pytest.importorskip("serial")
+
+# 仿真下位机基于 Linux/macOS 伪终端
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="需要伪终端（pty）")
+
+from firmware_emulator import FirmwareEmulator, PWM_RANGES
+from serial_latency import LatencyTracker
+from serial_protocol import FrameEncoder, FAST_BAUDRATE, DEFAULT_BAUDRATE, negotiate_baud
+from serial_reader import serial_monitor
+from serial_writer import SerialWriter
+
+
+class StatusSignal:
+    """代替 MainWindow.serial_status（pyqtSignal），收集监听线程发出的回显"""
+
+    def __init__(self):
+        self.lines = []
+        self._cond = threading.Condition()
+
+    def emit(self, text):
+        with self._cond:
+            self.lines.append(text)
+            self._cond.notify_all()
+
+    def wait_for(self, text, count=1, timeout=3.0):
+        """等待包含 text 的回显出现 count 次，返回这些行"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                matches = [line for line in self.lines if text in line]
+                remaining = deadline - time.monotonic()
+                if len(matches) >= count or remaining <= 0:
+                    return matches
+                self._cond.wait(remaining)
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return predicate()
+
+
+@pytest.fixture
+def emulator():
+    emulator = FirmwareEmulator(boot_ms=50, seed=0).start()
+    assert emulator.wait_ready(2.0)
+    yield emulator
+    emulator.stop()
+
+
+@pytest.fixture
+def link(emulator):
+    """与 MainWindow 相同的组装：SerialWriter -> 下位机 -> serial_monitor -> LatencyTracker"""
+    ser = serial.Serial(emulator.port, DEFAULT_BAUDRATE, timeout=0.1, write_timeout=1)
+    tracker = LatencyTracker("test")
+    writer = SerialWriter(ser, on_write=tracker.sent).start()
+    status = StatusSignal()
+    reader = None
+
+    def start_monitor():
+        nonlocal reader
+        reader = serial_monitor(ser, status, tracker)
+
+    yield ser, writer, status, tracker, start_monitor
+    writer.stop()
+    if reader is not None:
+        reader.stop()
+    ser.close()
+
+
+def test_text_command(emulator, link):
+    ser, writer, status, tracker, start_monitor = link
+    start_monitor()
+    writer.write(b"011111\n")
+    assert status.wait_for("Received: 011111")
+    assert status.wait_for("Current state: 011111")
+    assert emulator.state1 == [False, True, True, True, True, True]
+    summary = tracker.summary()
+    assert summary["receive_ms"]["count"] == 1
+    assert summary["complete_ms"]["count"] == 1
+    assert summary["unmatched"] == 0
+
+
+def test_binary_command_after_negotiation(emulator, link):
+    ser, writer, status, tracker, start_monitor = link
+    encoder = FrameEncoder()
+    assert negotiate_baud(ser, encoder, FAST_BAUDRATE)
+    assert ser.baudrate == FAST_BAUDRATE
+    assert emulator.baudrate == FAST_BAUDRATE
+    start_monitor()
+    writer.write(encoder.encode_command("001111"))
+    assert status.wait_for("Current state: 001111 #")
+    assert emulator.state1 == [False, False, True, True, True, True]
+    summary = tracker.summary()
+    assert summary["complete_ms"]["count"] == 1
+    assert summary["unmatched"] == 0 and summary["lost"] == 0
+
+
+def test_negotiation_waits_for_boot():
+    """打开串口时下位机还在 setup() 中，协商应重试到启动完成"""
+    emulator = FirmwareEmulator(boot_ms=1500).start()
+    try:
+        ser = serial.Serial(emulator.port, DEFAULT_BAUDRATE, timeout=0.1, write_timeout=1)
+        try:
+            assert negotiate_baud(ser, FrameEncoder(), FAST_BAUDRATE)
+            assert emulator.baudrate == FAST_BAUDRATE
+        finally:
+            ser.close()
+    finally:
+        emulator.stop()
+
+
+def test_wrong_host_baud_fails(emulator):
+    """上位机波特率与下位机不一致时线路上只有乱码：指令不被执行，协商失败"""
+    ser = serial.Serial(emulator.port, FAST_BAUDRATE, timeout=0.1, write_timeout=1)
+    try:
+        ser.write(b"011111\n")
+        ser.flush()
+        time.sleep(0.2)
+        assert emulator.stats()["commands"] == 0
+        assert not negotiate_baud(ser, FrameEncoder(), FAST_BAUDRATE, boot_timeout=0.5)
+        assert emulator.baudrate == DEFAULT_BAUDRATE
+        assert emulator.stats()["baud_mismatch_bytes"] > 0
+    finally:
+        ser.close()
+
+
+def test_crc_error_rejected(emulator, link):
+    ser, writer, status, tracker, start_monitor = link
+    start_monitor()
+    frame = bytearray(FrameEncoder().encode_command("011111"))
+    frame[-1] ^= 0xFF
+    writer.write(bytes(frame))
+    assert status.wait_for("Error: CRC mismatch")
+    time.sleep(0.1)
+    assert not status.wait_for("Received:", timeout=0)
+    assert emulator.state0 == [False] * 6
+    assert emulator.stats()["crc_errors"] == 1
+    assert emulator.stats()["commands"] == 0
+
+
+def test_command_mid_sweep(emulator, link):
+    """扫动期间到达的新指令在下一步生效，动作完成的回显附带该指令的序号"""
+    ser, writer, status, tracker, start_monitor = link
+    start_monitor()
+    encoder = FrameEncoder()
+    writer.write(encoder.encode_command("011111"))
+    assert status.wait_for("Processing gesture change...")
+    writer.write(encoder.encode_command("000011"))
+    completions = status.wait_for("Current state:")
+    assert completions == ["[Arduino]: Current state: 000011 #1"]
+    assert emulator.stats()["sweeps"] == 1
+    time.sleep(0.1)
+    summary = tracker.summary()
+    assert summary["receive_ms"]["count"] == 2
+    assert summary["complete_ms"]["count"] == 1
+    assert summary["unmatched"] == 0
+
+
+def test_bit_command_after_position_sweeps_to_endpoint(emulator, link):
+    """比例控制停在中间位置后，阈值化结果相同的开关指令仍要扫到端点"""
+    ser, writer, status, tracker, start_monitor = link
+    start_monitor()
+    writer.write(b"P00C0C0C0C0C0\n")
+    assert wait_until(lambda: emulator.current_pos == [0] + [0xC0] * 5)
+    assert emulator.state1 == [False] + [True] * 5
+    writer.write(b"011111\n")
+    assert status.wait_for("Current state: 011111")
+    assert emulator.stats()["sweeps"] == 1
+    assert list(emulator.pwm[1:]) == [flex for _, flex in PWM_RANGES[1:]]
+    assert emulator.current_pos == [0] + [255] * 5
@@ -0,0 +1,101 @@
+"""
+无界面回放（headless.py）：图片序列 -> 检测 -> 手指状态投票 -> 串口替身/仿真下位机
+检测器按帧内像素值返回预设关键点，不依赖 MediaPipe
+"""
+import sys
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from headless import HeadlessRunner, NullSerial
+from serial_protocol import FrameDecoder, FrameEncoder
+
+OPEN, FIST = "open", "fist"
+
+
+def hand(pose):
+    """归一化关键点 (21, 3)：四指指尖高于/低于PIP关节，拇指指尖在IP关节右/左侧"""
+    landmarks = np.full((21, 3), 0.5, dtype=np.float32)
+    landmarks[[6, 10, 14, 18], 1] = 0.4
+    landmarks[[8, 12, 16, 20], 1] = 0.2 if pose == OPEN else 0.6
+    landmarks[3, 0] = 0.5
+    landmarks[4, 0] = 0.6 if pose == OPEN else 0.4
+    return landmarks
+
+
+class ScriptedDetector:
+    """帧的像素值即帧号，按 script[帧号] 返回一只左手（镜像后为右手）的关键点"""
+
+    def __init__(self, script):
+        self.script = script
+        self.pose = None
+
+    def findHands(self, frame, draw=False):
+        self.pose = self.script[int(frame[0, 0, 0])]
+        return frame
+
+    def findLandmarks(self, frame):
+        h, w = frame.shape[:2]
+        normalized = hand(self.pose)[None]
+        return normalized, normalized * np.array((w, h, w), dtype=np.float32), ["Left"]
+
+
+@pytest.fixture
+def frames(tmp_path):
+    """45帧@30FPS：张开 -> 握拳 -> 张开，各0.5秒"""
+    script = [OPEN] * 15 + [FIST] * 15 + [OPEN] * 15
+    for index in range(len(script)):
+        cv2.imwrite(str(tmp_path / f"{index:03d}.png"), np.full((48, 64, 3), index, dtype=np.uint8))
+    return str(tmp_path), script
+
+
+def test_replay_to_null_serial(frames):
+    directory, script = frames
+    ser = NullSerial()
+    result = HeadlessRunner(ScriptedDetector(script), ser, directory).run()
+    assert result["frames"] == len(script)
+    assert result["commands"] == ["011111", "000000"]
+    assert ser.written == [b"011111\n", b"000000\n"]
+    assert result["stages"]["detect"]["processed"] == len(script)
+
+
+def test_replay_binary_frames(frames):
+    directory, script = frames
+    ser = NullSerial()
+    HeadlessRunner(ScriptedDetector(script), ser, directory, encoder=FrameEncoder()).run()
+    decoded = FrameDecoder().feed(b"".join(ser.written))
+    assert [(seq, payload[0]) for _, seq, payload in decoded] == [(0, 0b011111), (1, 0)]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="需要伪终端（pty）")
+def test_replay_to_emulator(frames):
+    serial = pytest.importorskip("serial")
+    from firmware_emulator import FirmwareEmulator
+    from serial_latency import LatencyTracker
+    from serial_reader import SerialReader
+    from serial_writer import SerialWriter
+
+    directory, script = frames
+    emulator = FirmwareEmulator(boot_ms=50).start()
+    try:
+        assert emulator.wait_ready(2.0)
+        port = serial.Serial(emulator.port, 9600, timeout=0.1, write_timeout=1)
+        tracker = LatencyTracker("headless")
+        writer = SerialWriter(port, on_write=tracker.sent).start()
+        reader = SerialReader(port, tracker.on_line).start()
+        try:
+            HeadlessRunner(ScriptedDetector(script), writer, directory).run()
+            deadline = time.monotonic() + 3.0
+            while tracker.summary()["complete_ms"]["count"] < 1 and time.monotonic() < deadline:
+                time.sleep(0.05)
+        finally:
+            writer.stop()
+            reader.stop()
+            port.close()
+        assert emulator.stats()["commands"] >= 1
+        assert tracker.summary()["unmatched"] == 0
+        assert tracker.summary()["receive_ms"]["count"] >= 1
+    finally:
+        emulator.stop()
@@ -0,0 +1,43 @@
+"""One Euro 关键点滤波"""
+import numpy as np
+
+from landmark_filter import OneEuroFilter
+
+
+def test_first_sample_passes_through():
+    x = np.arange(63, dtype=np.float32).reshape(21, 3)
+    out = OneEuroFilter()(x, 0.0)
+    assert np.array_equal(out, x)
+    assert out is not x
+
+
+def test_static_jitter_is_smoothed():
+    rng = np.random.default_rng(0)
+    smoothing = OneEuroFilter(min_cutoff=1.0, beta=0.0)
+    truth = np.full((21, 3), 100.0, dtype=np.float32)
+    raw, filtered = [], []
+    for i in range(60):
+        x = truth + rng.normal(0, 2.0, truth.shape).astype(np.float32)
+        raw.append(x)
+        filtered.append(smoothing(x, i / 30))
+    assert np.std(filtered[10:]) < np.std(raw[10:]) / 2
+
+
+def test_fast_motion_follows_with_beta():
+    # 同样的截止频率，beta 越大快速移动时滞后越小
+    lag = {}
+    for beta in (0.0, 1.0):
+        smoothing = OneEuroFilter(min_cutoff=1.0, beta=beta)
+        for i in range(30):
+            out = smoothing(np.full(3, i * 20.0, dtype=np.float32), i / 30)
+        lag[beta] = 29 * 20.0 - out[0]
+    assert lag[1.0] < lag[0.0] / 2
+
+
+def test_gap_resets_state():
+    smoothing = OneEuroFilter(max_gap=0.5)
+    smoothing(np.zeros(3, dtype=np.float32), 0.0)
+    smoothing(np.zeros(3, dtype=np.float32), 0.033)
+    # 手消失后重新出现：直接采用新位置，不从旧位置滑过去
+    out = smoothing(np.full(3, 50.0, dtype=np.float32), 1.0)
+    assert np.array_equal(out, np.full(3, 50.0))
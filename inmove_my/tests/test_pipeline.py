@@ -0,0 +1,81 @@
+"""流水线：有界队列的丢旧/阻塞策略和阶段异常时整条流水线停止"""
+import threading
+import time
+
+import pytest
+
+from pipeline import StageQueue, Pipeline, END, BLOCK, DROP_OLDEST
+
+
+def test_drop_oldest_keeps_newest():
+    queue = StageQueue(maxsize=2, policy=DROP_OLDEST)
+    dropped = []
+    for item in range(5):
+        queue.put(item, dropped.append)
+    assert [queue.get(0), queue.get(0)] == [3, 4]
+    assert dropped == [0, 1, 2]
+    assert queue.dropped == 3
+    assert queue.max_depth == 2
+    assert queue.get(0) is None
+
+
+def test_block_waits_for_space():
+    queue = StageQueue(maxsize=1, policy=BLOCK)
+    queue.put(1)
+    done = threading.Event()
+    threading.Thread(target=lambda: (queue.put(2), done.set()), daemon=True).start()
+    assert not done.wait(0.1)
+    assert queue.get(0) == 1
+    assert done.wait(1.0)
+    assert queue.get(0) == 2
+    assert queue.dropped == 0
+
+
+def test_close_wakes_blocked_put_and_get():
+    queue = StageQueue(maxsize=1, policy=BLOCK)
+    queue.put(1)
+    done = threading.Event()
+    threading.Thread(target=lambda: (queue.put(2), done.set()), daemon=True).start()
+    queue.close()
+    assert done.wait(1.0)
+    assert queue.get(0) == 1
+    assert queue.get(0) is END
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        StageQueue(policy="fifo")
+
+
+def test_pipeline_runs_to_end():
+    items = iter(range(20))
+    results = []
+    pipeline = Pipeline()
+    pipeline.add_stage("source", lambda _: next(items, END))
+    pipeline.add_stage("double", lambda x: x * 2, maxsize=2, policy=BLOCK)
+    pipeline.add_stage("sink", results.append, maxsize=2, policy=BLOCK)
+    pipeline.start()
+    pipeline.join(2.0)
+    assert not pipeline.is_alive()
+    assert results == [x * 2 for x in range(20)]
+    assert pipeline.errors() == {}
+
+
+def test_stage_error_stops_whole_pipeline():
+    def fail(item):
+        if item == 3:
+            raise ValueError("boom")
+        return item
+
+    pipeline = Pipeline()
+    # 源阶段不会自行结束，只能被其他阶段的异常停止
+    pipeline.add_stage("source", lambda _: (time.sleep(0.001), 3)[1])
+    pipeline.add_stage("fail", fail, maxsize=1, policy=BLOCK)
+    pipeline.add_stage("sink", lambda item: None, maxsize=1, policy=BLOCK)
+    pipeline.start()
+    deadline = time.monotonic() + 2.0
+    while pipeline.is_alive() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not pipeline.is_alive()
+    assert list(pipeline.errors()) == ["fail"]
+    assert isinstance(pipeline.errors()["fail"], ValueError)
@@ -0,0 +1,83 @@
+"""下位机回显解析和指令往返延迟匹配"""
+import pytest
+
+from serial_latency import parse_ack, sent_command, LatencyTracker, RECEIVE, COMPLETE
+from serial_protocol import FrameEncoder
+
+
+def test_parse_ack():
+    assert parse_ack("Received: 011111 #12") == (RECEIVE, "011111", 12)
+    assert parse_ack("Received: 011111") == (RECEIVE, "011111", None)
+    assert parse_ack("Current state: 000011 #3") == (COMPLETE, "000011", 3)
+    assert parse_ack("Processing gesture change...") is None
+    assert parse_ack("Received: 0111") is None
+
+
+def test_sent_command():
+    encoder = FrameEncoder()
+    assert sent_command(b"011111\n") == ("011111", None)
+    assert sent_command(encoder.encode_command("000011")) == ("000011", 0)
+    # 比例控制指令下位机不回显，不参与匹配
+    assert sent_command(encoder.encode_positions([0] * 6)) is None
+    assert sent_command(b"P00FF80010203\n") is None
+
+
+def test_text_acks_match_by_command():
+    tracker = LatencyTracker("test")
+    tracker.sent(b"011111\n", 0.0)
+    assert tracker.on_line("Received: 011111", 0.002)
+    assert tracker.on_line("Current state: 011111", 0.100)
+    summary = tracker.summary()
+    assert summary["receive_ms"]["p50"] == 2.0
+    assert summary["complete_ms"]["p50"] == 100.0
+    assert summary["lost"] == 0 and summary["unmatched"] == 0
+
+
+def test_binary_acks_match_by_seq():
+    encoder = FrameEncoder()
+    tracker = LatencyTracker("test")
+    tracker.sent(encoder.encode_command("011111"), 0.0)
+    tracker.sent(encoder.encode_command("011111"), 0.010)
+    tracker.on_line("Received: 011111 #1", 0.011)
+    tracker.on_line("Received: 011111 #0", 0.012)
+    assert tracker.summary()["receive_ms"]["count"] == 2
+    assert sorted(tracker.receive.samples) == pytest.approx([1.0, 12.0])
+
+
+def test_completion_finishes_superseded_commands():
+    # 扫动中途收到的新指令覆盖旧指令，只有最后一条报告完成
+    encoder = FrameEncoder()
+    tracker = LatencyTracker("test")
+    tracker.sent(encoder.encode_command("011111"), 0.0)
+    tracker.on_line("Received: 011111 #0", 0.001)
+    tracker.sent(encoder.encode_command("000011"), 0.030)
+    tracker.on_line("Received: 000011 #1", 0.031)
+    tracker.on_line("Current state: 000011 #1", 0.090)
+    summary = tracker.summary()
+    assert summary["complete_ms"]["count"] == 1
+    assert summary["complete_ms"]["p50"] == 60.0
+    assert summary["lost"] == 0 and summary["unmatched"] == 0
+    assert tracker.records[0][4] is None
+    assert tracker.records[1][4] == pytest.approx(60.0)
+
+
+def test_cancel_removes_timed_out_send():
+    # 写超时的指令没有写出，撤销后既不等待回显也不计为丢失
+    tracker = LatencyTracker("test", timeout=1.0)
+    tracker.sent(b"011111\n", 0.0)
+    tracker.sent(b"011111\n", 0.5)
+    tracker.cancel(b"011111\n", 0.0)
+    assert tracker.on_line("Received: 011111", 0.502)
+    assert tracker.receive.samples[-1] == pytest.approx(2.0)
+    tracker.sent(b"000000\n", 5.0)
+    assert tracker.summary()["lost"] == 0
+
+
+def test_unmatched_and_lost():
+    tracker = LatencyTracker("test", timeout=1.0)
+    assert tracker.on_line("Received: 011111", 0.0)
+    assert tracker.summary()["unmatched"] == 1
+    tracker.sent(b"000011\n", 0.0)
+    tracker.sent(b"000000\n", 2.0)     # 第一条超时未回显
+    assert tracker.summary()["lost"] == 1
+    assert not tracker.on_line("Pong", 2.1)
@@ -0,0 +1,118 @@
+"""二进制帧协议：CRC、组帧/解帧、重新同步和波特率协商的回退"""
+from serial_protocol import (SYNC, VERSION, FRAME_STATE, FRAME_POSITIONS, FRAME_BAUD, FRAME_PING,
+                             FAST_BAUDRATE, DEFAULT_BAUDRATE, crc8, encode_frame,
+                             FrameEncoder, FrameDecoder, negotiate_baud)
+
+
+def test_crc8_check_value():
+    # CRC-8 (多项式0x07，初值0) 的标准校验值
+    assert crc8(b"123456789") == 0xF4
+    assert crc8(b"") == 0
+
+
+def test_frame_layout():
+    frame = encode_frame(FRAME_STATE, 7, b"\x1f")
+    assert frame[0] == SYNC
+    assert frame[1] == VERSION << 4 | FRAME_STATE
+    assert frame[2:4] == bytes((7, 1))
+    assert frame[4] == 0x1F
+    assert frame[5] == crc8(frame[1:5])
+
+
+def test_encoder_round_trip_and_seq_wrap():
+    encoder = FrameEncoder()
+    encoder.seq = 255
+    data = (encoder.encode_state(0b011111) + encoder.encode_positions([0, 255, 128, 1, 2, 3])
+            + encoder.encode_baud(FAST_BAUDRATE) + encoder.encode_ping())
+    frames = FrameDecoder().feed(data)
+    assert frames == [(FRAME_STATE, 255, b"\x1f"),
+                      (FRAME_POSITIONS, 0, bytes([0, 255, 128, 1, 2, 3])),
+                      (FRAME_BAUD, 1, FAST_BAUDRATE.to_bytes(4, "little")),
+                      (FRAME_PING, 2, b"")]
+
+
+def test_encode_command():
+    encoder = FrameEncoder()
+    assert FrameDecoder().feed(encoder.encode_command("000011\n"))[0][2] == b"\x03"
+    assert FrameDecoder().feed(encoder.encode_command("P00FF80010203"))[0][2] == bytes([0, 255, 128, 1, 2, 3])
+    assert encoder.encode_command("01111") is None
+    assert encoder.encode_command("P00FF") is None
+
+
+def test_decoder_split_feed():
+    data = FrameEncoder().encode_positions([10, 20, 30, 40, 50, 60])
+    decoder = FrameDecoder()
+    frames = []
+    for byte in data:
+        frames += decoder.feed(bytes((byte,)))
+    assert frames == [(FRAME_POSITIONS, 0, bytes([10, 20, 30, 40, 50, 60]))]
+
+
+def test_decoder_rejects_crc_error_and_resyncs():
+    encoder = FrameEncoder()
+    bad = bytearray(encoder.encode_state(0b111111))
+    bad[-1] ^= 0xFF
+    good = encoder.encode_state(0b000011)
+    decoder = FrameDecoder()
+    assert decoder.feed(bytes(bad) + good) == [(FRAME_STATE, 1, b"\x03")]
+    assert decoder.crc_errors == 1
+
+
+def test_decoder_resyncs_after_garbage():
+    # 噪声中夹带同步字节和非法头，之后的有效帧仍能解出
+    good = FrameEncoder().encode_state(0b000111)
+    decoder = FrameDecoder()
+    assert decoder.feed(b"\x00\x13" + bytes((SYNC, 0xF1, 0, 9)) + b"xyz" + good) == [(FRAME_STATE, 0, b"\x07")]
+    assert decoder.invalid >= 1
+    assert decoder.skipped > 0
+
+
+class ScriptedSerial:
+    """按写入的帧回复固定行的串口替身；firmware=False 时下位机不回应"""
+
+    def __init__(self, firmware=True):
+        self.firmware = firmware
+        self.baudrate = DEFAULT_BAUDRATE
+        self.device_baudrate = DEFAULT_BAUDRATE
+        self._lines = []
+        self._decoder = FrameDecoder()
+
+    def reset_input_buffer(self):
+        self._lines.clear()
+
+    def write(self, data):
+        if not self.firmware or self.baudrate != self.device_baudrate:
+            return len(data)
+        for frame_type, _, payload in self._decoder.feed(data):
+            if frame_type == FRAME_BAUD:
+                self._lines.append(f"Baud: {int.from_bytes(payload, 'little')}")
+                self.device_baudrate = int.from_bytes(payload, "little")
+            elif frame_type == FRAME_PING:
+                self._lines.append("Pong")
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def readline(self):
+        return (self._lines.pop(0) + "\r\n").encode() if self._lines else b""
+
+
+def test_negotiate_baud_success():
+    ser = ScriptedSerial()
+    assert negotiate_baud(ser, FrameEncoder(), FAST_BAUDRATE, timeout=0.05)
+    assert ser.baudrate == FAST_BAUDRATE
+
+
+def test_negotiate_baud_falls_back_without_firmware_support():
+    ser = ScriptedSerial(firmware=False)
+    assert not negotiate_baud(ser, FrameEncoder(), FAST_BAUDRATE, timeout=0.02, boot_timeout=0.1)
+    assert ser.baudrate == DEFAULT_BAUDRATE
+
+
+def test_negotiate_baud_device_already_switched():
+    # 上次运行已切换、下位机未复位：以新波特率探测成功
+    ser = ScriptedSerial()
+    ser.device_baudrate = FAST_BAUDRATE
+    assert negotiate_baud(ser, FrameEncoder(), FAST_BAUDRATE, timeout=0.05)
+    assert ser.baudrate == FAST_BAUDRATE
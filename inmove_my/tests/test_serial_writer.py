@@ -0,0 +1,99 @@
+"""串口异步写线程：最新值优先合并、写超时不停止、I/O错误停止"""
+import threading
+import time
+
+import pytest
+
+serial = pytest.importorskip("serial")
+
+from serial_writer import SerialWriter
+
+
+class SlowSerial:
+    """每次写入阻塞到 release 被设置，可按次数注入异常"""
+
+    def __init__(self, errors=None):
+        self.port = "slow"
+        self.is_open = True
+        self.written = []
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.errors = list(errors or [])
+
+    def write(self, data):
+        self.started.set()
+        self.release.wait(2.0)
+        if self.errors:
+            error = self.errors.pop(0)
+            if error is not None:
+                raise error
+        self.written.append(data)
+
+    def flush(self):
+        pass
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return predicate()
+
+
+def test_coalesces_to_newest():
+    ser = SlowSerial()
+    writer = SerialWriter(ser).start()
+    try:
+        writer.write(b"a")
+        assert ser.started.wait(1.0)
+        # 端口忙时提交的中间数据被最新数据覆盖
+        for data in (b"b", b"c", b"d"):
+            writer.write(data)
+        ser.release.set()
+        assert wait_until(lambda: writer.written == 2)
+        assert ser.written == [b"a", b"d"]
+        assert writer.stats()["coalesced"] == 2
+        assert writer.stats()["submitted"] == 4
+    finally:
+        writer.stop()
+
+
+def test_timeout_keeps_running():
+    ser = SlowSerial([serial.SerialTimeoutException("Write timeout")])
+    ser.release.set()
+    timed_out, written = [], []
+    writer = SerialWriter(ser, on_written=written.append,
+                          on_timeout=lambda data, start: timed_out.append(data)).start()
+    try:
+        writer.write(b"a")
+        assert wait_until(lambda: writer.timeouts == 1)
+        assert timed_out == [b"a"]
+        writer.write(b"b")
+        assert wait_until(lambda: writer.written == 1)
+        assert ser.written == [b"b"]
+        # 只有真正写出的数据报告发送成功
+        assert written == [b"b"]
+        assert writer.is_open
+    finally:
+        writer.stop()
+
+
+def test_io_error_stops_writer():
+    ser = SlowSerial([serial.SerialException("device disconnected")])
+    ser.release.set()
+    writer = SerialWriter(ser).start()
+    try:
+        writer.write(b"a")
+        assert wait_until(lambda: writer.error is not None)
+        assert not writer.is_open
+    finally:
+        writer.stop()
+
+
+def test_stop_flushes_last_command():
+    ser = SlowSerial()
+    ser.release.set()
+    writer = SerialWriter(ser).start()
+    writer.write(b"last")
+    writer.stop()
+    assert ser.written == [b"last"]
@@ -0,0 +1,80 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+# 中文字体候选：Windows / Linux / macOS
+FONT_PATHS = [
+    "C:/Windows/Fonts/simhei.ttf",
+    "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
+    "/System/Library/Fonts/PingFang.ttc",
+]
+
+
+class TextOverlay:
+    """
+    文字叠加渲染器
+    字体按字号只加载一次；每个 (文本, 字号) 的灰度位图栅格化一次后缓存（LRU），
+    绘制时按颜色在帧上原地alpha混合，只触及文字所在的小块区域，不做整帧转换
+    颜色参数沿用OpenCV的BGR顺序，rgb=True 表示目标帧为RGB
+    """
+
+    def __init__(self, rgb=False, capacity=512):
+        self.rgb = rgb
+        self.capacity = capacity
+        self._fonts = {}
+        self._labels = OrderedDict()   # (text, size) -> (alpha (h, w, 1) float32, left, top)
+        self._lock = threading.Lock()
+        self.misses = 0
+
+    def font(self, size):
+        font = self._fonts.get(size)
+        if font is None:
+            for path in FONT_PATHS:
+                try:
+                    font = ImageFont.truetype(path, size, encoding="utf-8")
+                    break
+                except (OSError, IOError):
+                    continue
+            else:
+                # 如果都找不到，使用默认字体
+                font = ImageFont.load_default()
+                print("警告: 未找到中文字体，使用默认字体")
+            self._fonts[size] = font
+        return font
+
+    def _label(self, text, size):
+        key = (text, size)
+        with self._lock:
+            label = self._labels.get(key)
+            if label is not None:
+                self._labels.move_to_end(key)
+                return label
+        font = self.font(size)
+        left, top, right, bottom = font.getbbox(text)
+        image = Image.new("L", (max(right - left, 1), max(bottom - top, 1)), 0)
+        ImageDraw.Draw(image).text((-left, -top), text, font=font, fill=255)
+        alpha = np.asarray(image, dtype=np.float32)[:, :, None] / 255.0
+        label = (alpha, left, top)
+        with self._lock:
+            self.misses += 1
+            self._labels[key] = label
+            if len(self._labels) > self.capacity:
+                self._labels.popitem(last=False)
+        return label
+
+    def draw(self, frame, text, position, font_size=16, color=(255, 255, 0)):
+        """在 position（文本左上角，与PIL一致）处绘制文本，直接写回原帧并返回"""
+        alpha, left, top = self._label(text, font_size)
+        h, w = frame.shape[:2]
+        x0, y0 = int(position[0]) + left, int(position[1]) + top
+        x1, y1 = min(x0 + alpha.shape[1], w), min(y0 + alpha.shape[0], h)
+        cx, cy = max(x0, 0), max(y0, 0)
+        if x1 <= cx or y1 <= cy:
+            return frame
+        a = alpha[cy - y0:y1 - y0, cx - x0:x1 - x0]
+        roi = frame[cy:y1, cx:x1]
+        fill = np.array(color[::-1] if self.rgb else color, dtype=np.float32)
+        roi[...] = roi + (fill - roi) * a + 0.5
+        return frame
@@ -2,7 +2,6 @@ import cv2
 import mediapipe as mp
 import time
 import serial
-import threading
 from collections import deque
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QPushButton, QVBoxLayout, 
                              QHBoxLayout, QWidget, QLabel, QFrame, QComboBox)
@@ -11,7 +10,8 @@ from PyQt5.QtGui import QImage, QPixmap
 from test7 import get_frame_generator
 import sys
 import numpy as np
-from PIL import Image, ImageDraw, ImageFont
+from text_overlay import TextOverlay
+from serial_reader import serial_monitor
 import traceback
 import pygame
 from pygame import mixer
@@ -66,52 +66,12 @@ class HandDetector():
                         cv2.circle(frame, (cx, cy), 10, (255, 0, 255), -1)
         return lmList, handType
 
-def serial_monitor(ser, status_signal):
-    """独立线程监听Arduino串口输出"""
-    while True:
-        try:
-            if ser.in_waiting > 0:
-                arduino_data = ser.readline().decode('utf-8').strip()
-                if arduino_data:
-                    status_signal.emit(f"[Arduino]: {arduino_data}")
-        except Exception as e:
-            status_signal.emit(f"串口连接异常: {str(e)}")
-            break
-        time.sleep(0.01)
+_text_overlay = TextOverlay()  # 字体只加载一次，文字位图缓存复用
 
 def draw_text_with_chinese(frame, text, position, font_size=16, color=(255, 255, 0)):
-    """使用PIL绘制中文文本（适配小屏幕字体）"""
+    """绘制中文文本（适配小屏幕字体），原地混合到帧上，不做整帧格式转换"""
     try:
-        # 将OpenCV的BGR格式转为PIL的RGB格式
-        img_pil = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-        draw = ImageDraw.Draw(img_pil)
-        
-        # 设置中文字体路径
-        font_path = None
-        try:
-            # Windows系统默认中文字体
-            font_path = "C:/Windows/Fonts/simhei.ttf"
-            font = ImageFont.truetype(font_path, font_size, encoding="utf-8")
-        except:
-            try:
-                # Linux系统默认中文字体
-                font_path = "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc"
-                font = ImageFont.truetype(font_path, font_size, encoding="utf-8")
-            except:
-                try:
-                    # macOS系统默认中文字体
-                    font_path = "/System/Library/Fonts/PingFang.ttc"
-                    font = ImageFont.truetype(font_path, font_size, encoding="utf-8")
-                except:
-                    # 如果都找不到，使用默认字体
-                    font = ImageFont.load_default()
-                    print("警告: 未找到中文字体，使用默认字体")
-        
-        # 绘制文本
-        draw.text(position, text, font=font, fill=(color[2], color[1], color[0]))  # PIL使用RGB顺序
-        
-        # 将PIL图像转回OpenCV格式
-        return cv2.cvtColor(np.array(img_pil), cv2.COLOR_RGB2BGR)
+        return _text_overlay.draw(frame, text, position, font_size, color)
     except Exception as e:
         print(f"文本绘制错误: {e}")
         # 出错时返回原始帧
@@ -364,8 +324,12 @@ class VideoThread(QThread):
 
 
 class MainWindow(QMainWindow):
+    # 串口监听线程的回显经信号转到界面线程显示
+    serial_status = pyqtSignal(str)
+
     def __init__(self):
         super().__init__()
+        self.serial_status.connect(self.update_status)
         
         # 初始化音频控制属性
         pygame.mixer.init()
@@ -478,6 +442,7 @@ class MainWindow(QMainWindow):
         port_label.setStyleSheet("font-size: 12pt; color: #666;")
         self.port_combo = QComboBox()
         self.port_combo.addItems(self.available_ports)
+        self.port_combo.setEditable(True)  # 可手动输入串口，如仿真下位机的伪终端 /tmp/ttyHAND0
         self.port_combo.setStyleSheet("""
             QComboBox {
                 font-size: 11pt;
@@ -753,12 +718,7 @@ class MainWindow(QMainWindow):
             self.status_text.setText(f"串口 {self.ser.port} 打开成功")
             
             # 启动串口监听线程
-            self.serial_thread = threading.Thread(
-                target=serial_monitor, 
-                args=(self.ser, self.update_status),
-                daemon=True
-            )
-            self.serial_thread.start()
+            self.serial_thread = serial_monitor(self.ser, self.serial_status)
             
             # 启动视频处理线程
             self.detector = HandDetector(maxHands=1, detectionCon=0.7)
@@ -937,7 +897,10 @@ class MainWindow(QMainWindow):
         if hasattr(self, 'video_thread') and self.video_thread.isRunning():
             self.video_thread.stop()
         
-        # 关闭串口
+        # 停止串口监听线程并关闭串口
+        if self.serial_thread is not None:
+            self.serial_thread.stop()
+            self.serial_thread = None
         if self.ser and self.ser.is_open:
             self.ser.close()
             self.status_text.setText("串口已关闭")
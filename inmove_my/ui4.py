@@ -1,156 +1,110 @@
 import cv2
-import mediapipe as mp
 import time
 import serial
-import threading
+import functools
 from collections import deque
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QPushButton, QVBoxLayout, 
                              QHBoxLayout, QWidget, QLabel, QFrame, QComboBox)
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
 from PyQt5.QtGui import QImage, QPixmap
 from test7 import get_frame_generator
+from capture import FrameGrabber, open_source, PACED, UNTHROTTLED
+from frame_pool import FramePool, reuse
+from video_view import VideoView
+from hand_detector import HandDetector, SOLUTIONS, TASKS_VIDEO, TASKS_LIVE
+from detect_worker import RemoteHandDetector
+from landmark_tracker import FlowTracker
+from pipeline import Pipeline, END, BLOCK, DROP_OLDEST
+from servo_stream import ServoStreamer, flexion_to_positions, pose_to_positions
+from serial_protocol import FrameEncoder, negotiate_baud, FAST_BAUDRATE
+from serial_writer import SerialWriter
+from serial_reader import serial_monitor
+from serial_latency import LatencyTracker, export_latency, sent_command
+from gesture_library import GestureLibrary, DEFAULT_LIBRARY_PATH
+from motion_gestures import MotionRecognizer
+from landmark_filter import OneEuroFilter
+from finger_classifier import FingerClassifier, DEFAULT_CLASSIFIER_PATH
+from finger_state import (FINGER_NAMES, STATE_BITS, STATE_MESSAGES, FingerStateEngine,
+                          fingers_bent, finger_flexion, MIRROR, MIRRORED_LABEL)
 import sys
 import numpy as np
-from PIL import Image, ImageDraw, ImageFont
 import traceback
 import pygame
 from pygame import mixer
 
-class HandDetector():
-    def __init__(self, mode=False, maxHands=1, detectionCon=0.7, trackCon=0.5):
-        self.mode = mode
-        self.maxHands = maxHands
-        self.detectionCon = detectionCon
-        self.trackCon = trackCon
-
-        self.mpHands = mp.solutions.hands
-        self.hands = self.mpHands.Hands(
-            static_image_mode=self.mode,
-            max_num_hands=self.maxHands,
-            min_detection_confidence=self.detectionCon,
-            min_tracking_confidence=self.trackCon
-        )
-        self.mpDraw = mp.solutions.drawing_utils
-        self.handedness = None  # 存储手的左右信息
-
-    def findHands(self, frame, draw=True):
-        imgRGB = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        self.results = self.hands.process(imgRGB)
-        
-        if self.results.multi_hand_landmarks:
-            self.handedness = []
-            for hand_landmarks, handedness in zip(self.results.multi_hand_landmarks, self.results.multi_handedness):
-                if draw:
-                    self.mpDraw.draw_landmarks(frame, hand_landmarks, self.mpHands.HAND_CONNECTIONS)
-                # 获取手的左右信息
-                self.handedness.append(handedness.classification[0].label)
-        return frame
-    
-    def findPosition(self, frame, handNo=0, draw=False):
-        lmList = []
-        handType = None
-
-        if self.results.multi_hand_landmarks:
-            if handNo < len(self.results.multi_hand_landmarks):
-                myHand = self.results.multi_hand_landmarks[handNo]
-                if self.handedness and handNo < len(self.handedness):
-                    handType = self.handedness[handNo]
+class HandChannel:
+    """一只手的处理通道：手指状态投票引擎 + 对应的下位机串口"""
 
-                for id, lm in enumerate(myHand.landmark):
-                    h, w, c = frame.shape
-                    cx, cy = int(lm.x * w), int(lm.y * h)
-
-                    lmList.append([id, cx, cy])
+    def __init__(self, label, ser, window_ms, hold_ms, stream_rate=None, motion=False, smoothing=None,
+                 encoder=None, latency=None):
+        self.label = label  # "Left"/"Right"，None表示取检测到的第一只手（单手模式）
+        self.ser = ser
+        self.encoder = encoder  # FrameEncoder：下位机已切换到二进制协议，None为文本指令
+        self.latency = latency  # LatencyTracker：该串口的指令往返延迟
+        self.name = "output" if label is None else f"output_{label.lower()}"
+        self.engine = FingerStateEngine(window_ms, hold_ms)
+        # 关键点One Euro滤波（smoothing为其参数），每只手独立保存状态
+        self.filter = OneEuroFilter(**smoothing) if smoothing is not None else None
+        self.prev_finger_state = 0  # 上次发送的6位状态码
+        # 比例控制模式：按固定频率发送各手指目标位置，代替6位开关指令
+        self.streamer = ServoStreamer(ser, stream_rate, **({"encode": encoder.encode_positions} if encoder else {})) \
+            if stream_rate and ser else None
+        # 模板手势识别：候选手势保持 HOLD_MS 后才生效
+        self.gesture = None
+        self.gesture_candidate = None
+        self.gesture_since = 0.0
+        # 动态手势（挥动/摆手/点击）流式识别，最近事件用于HUD显示
+        self.motion = MotionRecognizer() if motion else None
+        self.motion_event = None
+        self.motion_time = 0.0
+        self.finger_changed = False
 
-                    if draw and id == 0:
-                        cv2.circle(frame, (cx, cy), 10, (255, 0, 255), -1)
-        return lmList, handType
-
-def serial_monitor(ser, status_signal):
-    """独立线程监听Arduino串口输出"""
-    while True:
-        try:
-            if ser.in_waiting > 0:
-                arduino_data = ser.readline().decode('utf-8').strip()
-                if arduino_data:
-                    status_signal.emit(f"[Arduino]: {arduino_data}")
-        except Exception as e:
-            status_signal.emit(f"串口连接异常: {str(e)}")
-            break
-        time.sleep(0.01)
-
-def draw_text_with_chinese(frame, text, position, font_size=16, color=(255, 255, 0)):
-    """使用PIL绘制中文文本（适配小屏幕字体）"""
-    try:
-        # 将OpenCV的BGR格式转为PIL的RGB格式
-        img_pil = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-        draw = ImageDraw.Draw(img_pil)
-        
-        # 设置中文字体路径
-        font_path = None
-        try:
-            # Windows系统默认中文字体
-            font_path = "C:/Windows/Fonts/simhei.ttf"
-            font = ImageFont.truetype(font_path, font_size, encoding="utf-8")
-        except:
-            try:
-                # Linux系统默认中文字体
-                font_path = "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc"
-                font = ImageFont.truetype(font_path, font_size, encoding="utf-8")
-            except:
-                try:
-                    # macOS系统默认中文字体
-                    font_path = "/System/Library/Fonts/PingFang.ttc"
-                    font = ImageFont.truetype(font_path, font_size, encoding="utf-8")
-                except:
-                    # 如果都找不到，使用默认字体
-                    font = ImageFont.load_default()
-                    print("警告: 未找到中文字体，使用默认字体")
-        
-        # 绘制文本
-        draw.text(position, text, font=font, fill=(color[2], color[1], color[0]))  # PIL使用RGB顺序
-        
-        # 将PIL图像转回OpenCV格式
-        return cv2.cvtColor(np.array(img_pil), cv2.COLOR_RGB2BGR)
-    except Exception as e:
-        print(f"文本绘制错误: {e}")
-        # 出错时返回原始帧
-        return frame
+    def match(self, handTypes):
+        """返回本通道对应的手在检测结果中的序号，未检测到返回None"""
+        if self.label is None:
+            return 0 if handTypes else None
+        return handTypes.index(self.label) if self.label in handTypes else None
 
 class VideoThread(QThread):
     """视频处理线程"""
-    update_frame = pyqtSignal(np.ndarray)
+    update_frame = pyqtSignal(np.ndarray, object)  # 原始RGB帧, 叠加层数据
     update_status = pyqtSignal(str)
     
-    def __init__(self, detector, ser, parent=None):
+    def __init__(self, detector, ser, parent=None, source=0, source_mode=PACED,
+                 dual_hand=False, left_ser=None, stream_rate=None, gestures=None, motion=False,
+                 finger_model=None, smoothing=None, vote_window_ms=None, encoder=None, left_encoder=None,
+                 latency=None, left_latency=None):
         super().__init__(parent)
         self.detector = detector
         self.ser = ser
+        self.source = source            # 帧源：摄像头编号、视频文件或图片目录
+        self.source_mode = source_mode  # 文件回放模式：paced / unthrottled
         self._main_window = parent  # 存储父窗口引用
         self.running = False
-        self.prev_finger_state = "000000"  # 初始手指状态
-        self.finger_changed = False
         self.demo_mode = False
         self.demo_patterns = ["000000","001111","000111","000011","000010","000000","011111","000000"]
         self.demo_index = 0
         self.demo_timer = 0
         self.demo_interval = 1.5  # 秒
-        self.hand = [["手腕", False], ["食指", False], ["中指", False], 
-                    ["无名指", False], ["拇指", False], ["小指", False]]
         self.frame_count = 0
         self.PROCESSING_INTERVAL = 1
-        self.WINDOW_SIZE = 2
-        self.finger_history = {
-            0: deque(maxlen=self.WINDOW_SIZE),  # 手腕
-            1: deque(maxlen=self.WINDOW_SIZE),  # 食指
-            2: deque(maxlen=self.WINDOW_SIZE),  # 中指
-            3: deque(maxlen=self.WINDOW_SIZE),  # 无名指
-            4: deque(maxlen=self.WINDOW_SIZE),  # 拇指
-            5: deque(maxlen=self.WINDOW_SIZE)   # 小指
-        }
-        for i in range(self.WINDOW_SIZE):
-            for finger in self.finger_history:
-                self.finger_history[finger].append(False)
+        # 投票时间窗：默认约2帧@30FPS；关键点已滤波时不再需要投票窗口
+        if vote_window_ms is None:
+            vote_window_ms = 0 if smoothing is not None else 60
+        self.VOTE_WINDOW_MS = vote_window_ms
+        self.smoothing = smoothing  # One Euro滤波参数，None为不滤波
+        self.HOLD_MS = 100        # 手指状态改变后的最短保持时间
+        self.gestures = gestures  # GestureLibrary，识别到模板手势时发送对应姿态
+        self.finger_model = finger_model  # FingerClassifier，None时用指尖/关节位置启发式判断
+        # 每只手一个通道：双手模式按左右手分别投票并发送到各自的串口
+        self.dual_hand = dual_hand
+        options = dict(window_ms=self.VOTE_WINDOW_MS, hold_ms=self.HOLD_MS, stream_rate=stream_rate,
+                       motion=motion, smoothing=smoothing)
+        if dual_hand:
+            self.channels = [HandChannel("Right", ser, encoder=encoder, latency=latency, **options),
+                             HandChannel("Left", left_ser, encoder=left_encoder, latency=left_latency, **options)]
+        else:
+            self.channels = [HandChannel(None, ser, encoder=encoder, latency=latency, **options)]
         
         # 视频优化参数
         self.resize_frame = True  # 是否调整帧尺寸
@@ -158,202 +112,403 @@ class VideoThread(QThread):
         self.target_height = 480  # 目标高度
         self.skip_frames = 1      # 跳帧处理，每N帧处理1帧
         self.current_skip = 0
+
+        # 采集线程（只保留最新帧）及延迟统计
+        self.grabber = None
+        self.frame_timestamp = 0.0   # 当前处理帧的采集时间
+        self.latency_history = deque(maxlen=100)  # 采集->发送延迟(ms)
+
+        # 预分配缓冲：采集拷贝、缩放各一块；RGB工作帧随数据包在各阶段间流转，
+        # 最后交给显示端持有，显示下一帧时归还
+        self._capture_buf = None
+        self._resize_buf = None
+        self.work_pool = FramePool(count=8)
+
+        # 流水线模式：采集/检测/分类/渲染/输出各自独立线程
+        self.pipelined = True
+        self.pipeline = None
+        self._cap = None
+        self.processed = 0
+        self.pool_drops = 0     # 工作帧缓冲全部被占用而丢弃的帧（只在实时源上发生）
         
     def run(self):
         try:
             self.running = True
-            prevTime = 0
+            self.prevTime = 0
             
-            # 打开摄像头（添加错误处理）
-            cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
+            # 打开帧源（摄像头分辨率按小屏幕优化）
+            cap = open_source(self.source, self.source_mode,
+                              self.target_width, self.target_height, 30)
             if not cap.isOpened():
-                self.update_status.emit("摄像头打开失败")
+                self.update_status.emit(f"视频源打开失败: {cap.name}")
                 return
-                
-            # 设置摄像头分辨率（小屏幕优化）
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.target_width)
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.target_height)
-            cap.set(cv2.CAP_PROP_FPS, 30)
-            
-            self.update_status.emit(f"系统就绪，正在检测手势...")
+            self._cap = cap
 
-            while self.running:
-                # 演示模式处理
-                if self.demo_mode:
-                    current_time = time.time()
-                    if current_time - self.demo_timer > self.demo_interval:
-                        self.demo_timer = current_time
-                        pattern = self.demo_patterns[self.demo_index]
-                        self.send_finger_status(pattern)
-                        self.demo_index = (self.demo_index + 1) % len(self.demo_patterns)
-                        continue  # 跳过正常检测流程
-                
-                ret, frame = cap.read()
-                if not ret:
-                    self.update_status.emit("读取帧失败")
-                    break
-                    
-                self.frame_count += 1
-                self.current_skip += 1
-                
-                # 跳帧处理，减少计算量
-                if self.current_skip <= self.skip_frames:
-                    continue
-                self.current_skip = 0
-                
-                # 调整帧尺寸（如果原始尺寸过大）
-                if self.resize_frame and (frame.shape[1] > self.target_width or frame.shape[0] > self.target_height):
-                    frame = cv2.resize(frame, (self.target_width, self.target_height))
-                
-                # 水平镜像画面（保持检测逻辑不变）
-                frame = cv2.flip(frame, 1)
-                
-                # 始终检测手部并绘制关键点
-                frame = self.detector.findHands(frame)
-                lmList, handType = self.detector.findPosition(frame)
-                
-                # 每帧都检测手指状态，但只在必要时更新平均值
-                current_state = [False] * 6  # 初始化当前帧的手指状态
-                
-                if len(lmList) > 0: 
-                    j = 1
-                    
-                    for i in range(1, 6):
-                            if i == 1:  # 拇指检测
-                                # 根据左右手决定是否取反
-                                if (handType == "Left" and lmList[4][1] <= lmList[3][1]) or \
-                                   (handType == "Right" and lmList[4][1] > lmList[3][1]):
-                                    current_state[4] = True  # 拇指弯曲
-                            else:  # 其他四指检测
-                                finger_tip = i * 4
-                                finger_pip = i * 4 - 2
-                                
-                                if finger_tip < len(lmList) and finger_pip < len(lmList):
-                                    if lmList[finger_tip][2] > lmList[finger_pip][2]:
-                                        current_state[j] = True  # 手指弯曲
-                                
-                                if j == 3:
-                                    j += 2
-                                else:
-                                    j += 1
-                
-                # 更新滑动窗口数据
-                for i in range(6):
-                    self.finger_history[i].append(current_state[i])
-                
-                # 每5帧计算一次平均值并决定最终状态
-                if self.frame_count % self.WINDOW_SIZE == 0:
-                    change = False
-                    threshold = 1  # 窗口大小为2时，只需1帧为True则认为弯曲
-                    
-                    for i in range(6):
-                        # 计算平均值
-                        count_true = sum(self.finger_history[i])
-                        new_state = count_true > threshold
-                        
-                        # 如果状态变化，记录变化
-                        if new_state != self.hand[i][1]:
-                            self.hand[i][1] = new_state
-                            change = True
-                            self.update_status.emit(f"[Python] Frame {self.frame_count}: {self.hand[i][0]}: {'弯曲' if new_state else '伸直'}")
-                    
-                    # 如果状态变化，发送新命令
-                    if change and self.ser and self.ser.is_open:
-                        msg = ""
-                        for i in range(6):
-                            if self.hand[i][1]:
-                                msg += "1"
-                            else:
-                                msg += "0"
-
-                        msg = msg.strip()
-                        # 检测手指状态变化
-                        current_state = msg
-                        self.finger_changed = current_state != self.prev_finger_state
-                        self.prev_finger_state = current_state
-
-                        print(f"finger stage: {current_state}, change: {self.finger_changed}")
-
-                        if self.parent() is not None:
-                            print(f"Parent exists - play_mode: {getattr(self.parent(), 'play_mode', False)}")
-                        else:
-                            print("Warning: Parent is None!")
-
-                        # 如果手指状态变化且处于演奏模式，发送信号
-                        # if self.finger_changed and hasattr(self.parent(), 'play_mode') and self.parent().play_mode:
-                        if self.finger_changed and hasattr(self, '_main_window'):
-                            print(f"finger stage: {current_state}")
-                            self._main_window.last_boost_time = time.time()
-                            self._main_window.set_volume(self._main_window.boost_volume)
-                            self.update_status.emit(f"[音量提升] 检测到手势变化，音量提升至{int(self._main_window.boost_volume*100)}%")
-                            # 仅提升音量，不发送信号给Arduino
-                        
-                        self.update_status.emit(f"[Python] Sending: {msg}")
-                        self.send_finger_status(msg)
-                
-                # 计算并显示实际FPS（字体大小调整为18）
-                currentTime = time.time()
-                if prevTime != 0:
-                    fps = 1 / (currentTime - prevTime)
-                    frame = draw_text_with_chinese(frame, f"实际FPS: {int(fps)}", (10, 50), 18, (255, 0, 255))
-                prevTime = currentTime
-                
-                # 显示处理参数（字体大小调整为18）
-                frame = draw_text_with_chinese(frame, f"滑动窗口: {self.WINDOW_SIZE}帧", (10, 80), 18, (255, 255, 0))
-                frame = draw_text_with_chinese(frame, f"帧计数: {self.frame_count}", (10, 110), 18, (255, 255, 0))
-
-                # 添加状态显示（字体大小调整为16，间距缩小）
-                y_offset = 140
-                # 显示手的左右信息
-                if handType:
-                    frame = draw_text_with_chinese(
-                        frame,
-                        f"检测到: {handType}",
-                        (10, y_offset),
-                        16,
-                        (255, 255, 255))
-                    y_offset += 30
-                
-                for i, (name, state) in enumerate(self.hand):
-                    color = (0, 255, 0) if state else (0, 0, 255)
-                    frame = draw_text_with_chinese(
-                        frame, 
-                        f"{name}: {'弯曲' if state else '伸直'}", 
-                        (10, y_offset + i * 30),  # 行间距缩小
-                        16,  # 字体大小减小
-                        color
-                    )
-
-                # 转换BGR到RGB用于Qt显示
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                self.update_frame.emit(frame)
-
-            cap.release()
-            self.update_status.emit("视频线程已停止")
+            # 实时源启动独立采集线程，推理变慢时自动丢弃旧帧；
+            # 不限速回放则逐帧同步读取，保证每帧都被处理
+            self.grabber = FrameGrabber(cap).start() if cap.live else None
+            start_time = time.perf_counter()
+            self.processed = 0
+            self.pool_drops = 0
+
+            self.update_status.emit(f"系统就绪，正在检测手势... ({cap.name})")
+            errors = {}
+            try:
+                errors = self._process(cap)
+            finally:
+                self.running = False  # 阻塞等待缓冲的采集阶段随之退出
+                # 无论正常结束还是阶段异常，都先释放摄像头并停止比例控制发送，下次启动才能重新打开
+                if self.pipeline is not None:
+                    self.pipeline.stop()
+                for channel in self.channels:
+                    if channel.streamer is not None:
+                        channel.streamer.stop()
+                if self.grabber is not None:
+                    self.grabber.stop()
+                cap.release()
+            for name, error in errors.items():
+                raise RuntimeError(f"{name}阶段异常: {error}")
+
+            elapsed = time.perf_counter() - start_time
+            processed = self.processed - self.pool_drops
+            summary = f"共处理 {processed} 帧, 吞吐 {processed / elapsed:.1f} FPS" if elapsed > 0 else ""
+            if self.pool_drops:
+                summary += f", 缓冲不足丢弃 {self.pool_drops} 帧"
+            if self.latency_history:
+                avg_latency = sum(self.latency_history) / len(self.latency_history)
+                summary += f", 平均延迟 {avg_latency:.1f}ms"
+            if getattr(self.detector, 'roiMode', False):
+                summary += f", 检测次数 {self.detector.roi_stats}"
+            if hasattr(self.detector, 'flow_stats'):
+                summary += f", 光流跟踪 {self.detector.flow_stats}"
+            print(f"[{cap.name}] {summary}")
+            if self.pipeline is not None:
+                for name, stats in self.pipeline.stats().items():
+                    print(f"  {name}: {stats}")
+            for channel in self.channels:
+                if channel.streamer is not None:
+                    print(f"  servo_stream {channel.label or ''}: {channel.streamer.stats()}"
+                          + (f", 异常 {channel.streamer.error}" if channel.streamer.error else ""))
+                if isinstance(channel.ser, SerialWriter):
+                    print(f"  serial_writer {channel.ser.port}: {channel.ser.stats()}")
+                if channel.latency is not None:
+                    print(f"  latency {channel.latency.name}: {channel.latency.summary()}")
+            self.update_status.emit(f"视频线程已停止 ({summary})")
         except Exception as e:
             self.update_status.emit(f"视频线程异常: {str(e)}")
             import traceback
             print(traceback.format_exc())
 
+    def _process(self, cap):
+        """运行各处理阶段直到结束，返回流水线各阶段的异常 {阶段名: 异常}"""
+        for channel in self.channels:
+            if channel.streamer is not None:
+                channel.streamer.start()
+
+        if self.pipelined:
+            # 各阶段独立线程：第N+1帧检测时第N帧可以同时渲染和发送
+            self.pipeline = Pipeline()
+            self.pipeline.add_stage("capture", self._capture_stage, on_drop=self._release_packet)
+            # 实时源只检测最新帧；不限速回放则逐帧检测
+            self.pipeline.add_stage("detect", self._detect_stage, maxsize=1,
+                                    policy=DROP_OLDEST if cap.live else BLOCK)
+            self.pipeline.add_stage("classify", self._classify_stage, maxsize=2, policy=BLOCK,
+                                    on_drop=self._release_packet)
+            # 每个串口一个输出阶段，一个串口写入慢不会拖住另一只手
+            for channel in self.channels:
+                self.pipeline.add_stage(channel.name, functools.partial(self._output_stage, channel),
+                                        upstream="classify", maxsize=4, policy=BLOCK)
+            self.pipeline.add_stage("render", self._render_stage, upstream="classify",
+                                    maxsize=1, policy=DROP_OLDEST)
+            self.pipeline.start()
+            while self.running and self.pipeline.is_alive():
+                self.msleep(50)
+            self.pipeline.stop()
+            return self.pipeline.errors()
+        else:
+            # 串行模式：同一线程内依次执行各阶段
+            while self.running:
+                packet = self._capture_stage(None)
+                if packet is END:
+                    break
+                if packet is None:
+                    continue
+                packet = self._classify_stage(self._detect_stage(packet))
+                for channel in self.channels:
+                    self._output_stage(channel, packet)
+                self._render_stage(packet)
+        return {}
+
+    def _release_packet(self, packet):
+        """数据包被丢弃或渲染完毕时归还工作帧缓冲"""
+        frame = packet.get("frame")
+        if frame is not None:
+            self.work_pool.release(frame)
+
+    def _capture_stage(self, _):
+        """采集阶段：读帧、跳帧、缩放、镜像，返回数据包；None表示本轮无输出，END表示结束"""
+        # 演示模式处理
+        if self.demo_mode:
+            current_time = time.time()
+            if current_time - self.demo_timer > self.demo_interval:
+                self.demo_timer = current_time
+                pattern = self.demo_patterns[self.demo_index]
+                self.demo_index = (self.demo_index + 1) % len(self.demo_patterns)
+                # 演示指令直接发送，不经过会丢弃旧数据的检测队列；没有串口的通道（双手模式未指定左手串口）跳过
+                for channel in self.channels:
+                    if channel.ser is not None:
+                        self.send_finger_status(pattern, channel.ser, channel.encoder)
+                return None
+
+        if self.grabber is not None:
+            ret, frame, timestamp, seq = self.grabber.read(self._capture_buf)
+            media_time = timestamp
+            if not ret:
+                if not self.grabber.running:
+                    self.update_status.emit("读取帧失败")
+                    return END
+                return None
+        else:
+            ret, frame = self._cap.read(self._capture_buf)
+            timestamp = time.perf_counter()
+            # 不限速回放按视频时间投票，结果与处理速度无关
+            media_time = self.processed / getattr(self._cap, 'fps', 30.0)
+            if not ret:
+                self.update_status.emit("视频源播放结束")
+                return END
+        self.processed += 1
+        self._capture_buf = frame
+
+        self.frame_count += 1
+        self.current_skip += 1
+        
+        # 跳帧处理，减少计算量
+        if self.current_skip <= self.skip_frames:
+            return None
+        self.current_skip = 0
+        
+        # 调整帧尺寸（如果原始尺寸过大）
+        if self.resize_frame and (frame.shape[1] > self.target_width or frame.shape[0] > self.target_height):
+            self._resize_buf = reuse(self._resize_buf, (self.target_height, self.target_width, 3))
+            frame = cv2.resize(frame, (self.target_width, self.target_height), dst=self._resize_buf)
+        
+        # 转换为RGB后在各阶段间流转（检测和显示都直接使用），只转换这一次；
+        # 镜像不在像素上做，而是作用于关键点坐标，显示时与拷贝合并
+        work = self.work_pool.acquire(frame.shape)
+        # 不限速回放要处理每一帧：等待显示端归还缓冲，而不是丢帧
+        while work is None and not self._cap.live and self.running:
+            work = self.work_pool.acquire(frame.shape, timeout=0.1)
+        if work is None:
+            self.pool_drops += 1
+            return None  # 实时源：下游缓冲全部占用，丢弃本帧
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=work)
+        return {"frame": work, "timestamp": timestamp, "media_time": media_time,
+                "frame_count": self.frame_count}
+
+    def _detect_stage(self, packet):
+        """检测阶段：检测手部，关键点换算到镜像画面坐标"""
+        frame = packet["frame"]
+        self.detector.findHands(frame, draw=False)
+        # 关键点数组 (hands, 21, 3)，像素坐标保留小数和z
+        normalized, pixels, handTypes = self.detector.findLandmarks(frame)
+        packet["normalized"] = normalized * MIRROR + (1, 0, 0)
+        packet["landmarks"] = pixels * MIRROR + (frame.shape[1], 0, 0)
+        packet["handTypes"] = [MIRRORED_LABEL.get(t, t) for t in handTypes]
+        return packet
+
+    def _classify_stage(self, packet):
+        """分类阶段：判断手指状态、滑动窗口投票，状态变化时生成待发送指令"""
+        # 所有手一次性向量化计算，再按左右手分发到各自通道
+        landmarks, handTypes = packet["landmarks"], packet["handTypes"]
+        if self.smoothing is not None:
+            # 每只手用各自的滤波器去抖后再分类
+            landmarks = landmarks.copy()
+            for channel in self.channels:
+                index = channel.match(handTypes)
+                if index is None:
+                    channel.filter.reset()
+                else:
+                    landmarks[index] = channel.filter(landmarks[index], packet["media_time"])
+        classify = self.finger_model.predict if self.finger_model is not None else fingers_bent
+        bent = classify(landmarks, handTypes)
+        flexion = finger_flexion(landmarks)
+        matches = self.gestures.match(landmarks, handTypes) if self.gestures is not None else None
+
+        packet["msgs"] = {}
+        packet["hands"] = []
+        for channel in self.channels:
+            index = channel.match(handTypes)
+            if index is None:
+                current_state = STATE_BITS[0]  # 未检测到这只手时视为全部伸直
+                channel_flexion = np.zeros(6, dtype=np.float32)
+            else:
+                current_state = bent[index]
+                channel_flexion = flexion[index]  # 各手指连续弯曲程度 0~1
+
+            msg = self._vote(channel, current_state, packet)
+            if matches is not None:
+                gesture = matches[index][0] if index is not None else None
+                gesture_msg = self._update_gesture(channel, gesture, packet)
+                if gesture_msg or channel.gesture is not None:
+                    msg = gesture_msg  # 模板手势生效期间保持其姿态
+            if channel.motion is not None:
+                motion_msg = self._update_motion(channel, index, landmarks, channel_flexion, packet)
+                if motion_msg:
+                    msg = motion_msg
+
+            if channel.streamer is not None:
+                # 比例控制：只更新目标位置，由发送线程按固定频率下发
+                positions = pose_to_positions(self.gestures.action(channel.gesture) or "") \
+                    if channel.gesture is not None else None
+                if positions is not None:
+                    channel.streamer.update(positions)
+                elif index is not None:
+                    channel.streamer.update(flexion_to_positions(channel_flexion))
+            elif msg:
+                packet["msgs"][channel.label] = msg
+            # 渲染阶段与本阶段并行，传递状态快照
+            motion_event = channel.motion_event \
+                if packet["media_time"] - channel.motion_time < 1.0 else None  # 事件显示1秒
+            packet["hands"].append((channel.label, channel.engine.state, channel_flexion,
+                                    channel.gesture or motion_event))
+        return packet
+
+    def _update_gesture(self, channel, gesture, packet):
+        """模板手势去抖，生效的手势变化时返回其姿态指令；手势结束时恢复逐指状态"""
+        now = packet["media_time"] * 1000
+        if gesture != channel.gesture_candidate:
+            channel.gesture_candidate = gesture
+            channel.gesture_since = now
+            return None
+        if gesture == channel.gesture or now - channel.gesture_since < self.HOLD_MS:
+            return None
+        channel.gesture = gesture
+        prefix = f"{channel.label} " if channel.label else ""
+        self.update_status.emit(f"[手势] {prefix}{gesture or '无'}")
+        if not (channel.ser and channel.ser.is_open):
+            return None
+        if gesture is None:
+            return STATE_MESSAGES[channel.engine.state]
+        return self.gestures.action(gesture)
+
+    def _update_motion(self, channel, index, landmarks, flexion, packet):
+        """动态手势识别，事件在手势库中配置了动作时返回对应指令"""
+        if index is None:
+            channel.motion.reset()
+            return None
+        msg = None
+        for event in channel.motion.update(landmarks[index], flexion, packet["media_time"] * 1000):
+            channel.motion_event = event
+            channel.motion_time = packet["media_time"]
+            prefix = f"{channel.label} " if channel.label else ""
+            self.update_status.emit(f"[动作] {prefix}{event}")
+            if self.gestures is not None and self.gestures.action(event) and \
+                    channel.ser and channel.ser.is_open:
+                msg = self.gestures.action(event)
+        return msg
+
+    def _vote(self, channel, current_state, packet):
+        """一个通道投票，状态变化时返回待发送指令"""
+        changed = channel.engine.update(current_state, packet["media_time"] * 1000)
+        if not changed:
+            return None
+        state = channel.engine.state
+        prefix = f"{channel.label} " if channel.label else ""
+        for i in np.flatnonzero(STATE_BITS[changed]):
+            self.update_status.emit(f"[Python] Frame {packet['frame_count']}: {prefix}{FINGER_NAMES[i]}: {'弯曲' if STATE_BITS[state][i] else '伸直'}")
+        
+        # 如果状态变化，发送新命令
+        if not (channel.ser and channel.ser.is_open):
+            return None
+        # 检测手指状态变化，指令直接查表
+        msg = STATE_MESSAGES[state]
+        channel.finger_changed = state != channel.prev_finger_state
+        channel.prev_finger_state = state
+
+        print(f"finger stage: {prefix}{msg}, change: {channel.finger_changed}")
+
+        if self.parent() is not None:
+            print(f"Parent exists - play_mode: {getattr(self.parent(), 'play_mode', False)}")
+        else:
+            print("Warning: Parent is None!")
+
+        # 如果手指状态变化且处于演奏模式，发送信号
+        # if self.finger_changed and hasattr(self.parent(), 'play_mode') and self.parent().play_mode:
+        if channel.finger_changed and hasattr(self, '_main_window'):
+            print(f"finger stage: {prefix}{msg}")
+            self._main_window.last_boost_time = time.time()
+            self._main_window.set_volume(self._main_window.boost_volume)
+            self.update_status.emit(f"[音量提升] 检测到手势变化，音量提升至{int(self._main_window.boost_volume*100)}%")
+            # 仅提升音量，不发送信号给Arduino
+        return msg
+
+    def _output_stage(self, channel, packet):
+        """输出阶段：把本通道的指令发送到对应的下位机"""
+        msg = packet["msgs"].get(channel.label)
+        if not msg:
+            return None
+        # 采集到发送的延迟
+        latency_ms = (time.perf_counter() - packet["timestamp"]) * 1000
+        self.latency_history.append(latency_ms)
+        prefix = f"{channel.label} " if channel.label else ""
+        self.update_status.emit(f"[Python] Sending: {prefix}{msg} (延迟 {latency_ms:.1f}ms)")
+        self.send_finger_status(msg, channel.ser, channel.encoder)
+        return None
+
+    def _render_stage(self, packet):
+        """渲染阶段：整理叠加层数据，连同原始帧交给界面绘制（绘制在显示端按需进行）"""
+
+        # 计算实际FPS
+        currentTime = time.time()
+        fps = 1 / (currentTime - self.prevTime) if self.prevTime != 0 else None
+        self.prevTime = currentTime
+
+        overlay = {
+            "fps": fps,
+            "vote_window_ms": self.VOTE_WINDOW_MS,
+            "smoothing": self.smoothing is not None,
+            "frame_count": packet["frame_count"],
+            "grabber": self.grabber.stats() if self.grabber is not None else None,
+            "queues": {name: (s["depth"], s["maxsize"]) for name, s in self.pipeline.stats().items()
+                       if "depth" in s} if self.pipeline is not None else None,
+            "handTypes": packet["handTypes"],
+            "hands": packet["hands"],
+            "landmarks": packet["normalized"],  # 镜像后的归一化坐标
+            "links": {channel.label: channel.latency.summary() for channel in self.channels
+                      if channel.latency is not None},
+        }
+        # 工作帧所有权交给显示端，显示下一帧时归还 work_pool
+        self.update_frame.emit(packet["frame"], overlay)
+        return None
+
     def stop(self):
         self.running = False
         self.wait()  # 等待线程安全退出
 
-    def send_finger_status(self, finger_status):
+    def send_finger_status(self, finger_status, ser, encoder=None):
         """
         发送手指状态到下位机
         :param finger_status: 6位字符串，如"011111"
-        :return: bool 发送是否成功
+        :param ser: 目标串口（通道各自的串口，不会改发到其他串口）
+        :param encoder: 该串口的 FrameEncoder，给定时按二进制帧发送
+        :return: bool 发送是否成功（SerialWriter 为是否已排队，写完后由写线程报告发送成功）
         """
-        if not self.ser or not self.ser.is_open:
+        if getattr(ser, 'error', None) is not None:
+            self.update_status.emit(f"串口发送失败: {ser.error}")
+            return False
+        if not ser or not ser.is_open:
             self.update_status.emit("串口未连接，无法发送")
             return False
         
         try:
             msg = finger_status + '\n'
-            self.ser.write(msg.encode("ascii"))
-            self.ser.flush()
-            self.update_status.emit(f"[发送成功]: {msg.strip()}")
+            frame = encoder.encode_command(finger_status) if encoder is not None else None
+            ser.write(frame if frame is not None else msg.encode("ascii"))
+            ser.flush()
+            if isinstance(ser, SerialWriter):
+                self.update_status.emit(f"[已排队]: {msg.strip()}")
+            else:
+                self.update_status.emit(f"[发送成功]: {msg.strip()}")
             return True
         except serial.SerialException as e:
             self.update_status.emit(f"串口发送失败: {str(e)}")
@@ -363,9 +518,80 @@ class VideoThread(QThread):
             return False
 
 
+class ProtocolNegotiator(QThread):
+    """
+    后台协商二进制帧协议：下位机在打开串口时复位，协商要等它启动完成，可能需要数秒，
+    放在界面线程会卡住窗口
+    完成后 negotiated 发出与 ports 一一对应的 FrameEncoder 列表，不支持的串口为None（文本指令）
+    """
+    negotiated = pyqtSignal(list)
+    update_status = pyqtSignal(str)
+
+    def __init__(self, ports, baudrate, parent=None):
+        super().__init__(parent)
+        self.ports = ports
+        self.baudrate = baudrate
+
+    def run(self):
+        encoders = []
+        for ser in self.ports:
+            self.update_status.emit(f"串口 {ser.port} 正在协商二进制协议...")
+            encoder = FrameEncoder()
+            try:
+                supported = negotiate_baud(ser, encoder, self.baudrate)
+            except Exception as e:
+                self.update_status.emit(f"串口 {ser.port} 协商异常: {e}")
+                supported = False
+            if supported:
+                self.update_status.emit(f"串口 {ser.port} 已切换到二进制协议 @{self.baudrate}")
+            else:
+                self.update_status.emit(f"串口 {ser.port} 下位机不支持二进制协议，使用文本指令")
+            encoders.append(encoder if supported else None)
+        self.negotiated.emit(encoders)
+
+
 class MainWindow(QMainWindow):
-    def __init__(self):
+    # 串口监听线程的回显经信号转到界面线程显示
+    serial_status = pyqtSignal(str)
+
+    def __init__(self, source=0, source_mode=PACED, inference_process=False,
+                 backend=SOLUTIONS, model_complexity=1, delegate="cpu", flow_interval=1,
+                 dual_hand=False, left_port=None, stream_rate=None, gesture_library=None,
+                 motion_gestures=False, finger_model=None, smoothing=None, vote_window_ms=None,
+                 binary_baud=None, latency_log=None, port=None):
         super().__init__()
+        self.serial_status.connect(self.update_status)
+
+        # 帧源配置（默认摄像头0，也可回放视频文件/图片目录）
+        self.source = source
+        self.source_mode = source_mode
+        self.inference_process = inference_process  # 是否在独立进程中运行手势推理
+        # 推理后端配置：solutions / video / live_stream，按机器选最快的
+        self.detector_backend = backend
+        self.model_complexity = model_complexity
+        self.delegate = delegate
+        # 每N帧运行一次MediaPipe，中间帧用光流跟踪关键点；1表示每帧检测
+        self.flow_interval = flow_interval
+        # 默认串口（可以是 firmware_emulator.py 的伪终端），None为界面选择
+        self.port = port
+        # 双手模式：右手用界面选择的串口，左手用 left_port
+        self.dual_hand = dual_hand
+        self.left_port = left_port
+        # 比例控制模式的发送频率(Hz)，None为原有6位开关指令
+        self.stream_rate = stream_rate
+        # 手势模板库路径，None为不做模板识别
+        self.gesture_library = gesture_library
+        # 是否识别挥动/摆手/点击等动态手势
+        self.motion_gestures = motion_gestures
+        # 学习得到的手指状态分类器路径，None为启发式判断
+        self.finger_model = finger_model
+        # 关键点One Euro滤波参数 {"min_cutoff", "beta"}，以及投票窗口（None为自动）
+        self.smoothing = smoothing
+        self.vote_window_ms = vote_window_ms
+        # 二进制帧协议协商的波特率，None为文本指令@9600
+        self.binary_baud = binary_baud
+        # 指令往返延迟记录导出的CSV路径，None为不导出（界面上始终显示）
+        self.latency_log = latency_log
         
         # 初始化音频控制属性
         pygame.mixer.init()
@@ -385,7 +611,16 @@ class MainWindow(QMainWindow):
         
         # 先初始化状态变量
         self.ser = None
+        self.left_ser = None
+        self.encoder = None
+        self.left_encoder = None
+        self.writer = None  # 串口异步写线程，视频线程只向其提交指令
+        self.left_writer = None
+        self.latency = None  # 各串口的指令往返延迟统计
+        self.left_latency = None
         self.serial_thread = None
+        self.left_serial_thread = None
+        self.negotiator = None  # 正在进行的协议协商线程
         self.is_running = False  # 移到这里，在init_ui之前初始化
         self.play_mode = False  # 演奏模式状态
         
@@ -420,9 +655,7 @@ class MainWindow(QMainWindow):
         video_layout.setContentsMargins(0, 0, 0, 0)
         
         # 手势视频显示 (主窗口)
-        self.video_label = QLabel("等待视频流...")
-        self.video_label.setAlignment(Qt.AlignCenter)
-        self.video_label.setStyleSheet("background-color: black; color: white;")
+        self.video_label = VideoView("等待视频流...")
         video_layout.addWidget(self.video_label)
         
         # 添加图片显示层（作为窗口的直接子部件）
@@ -457,6 +690,9 @@ class MainWindow(QMainWindow):
         # 串口选择下拉框（缩短宽度）
         self.port_combo = QComboBox()
         self.port_combo.addItems(self.available_ports)
+        self.port_combo.setEditable(True)  # 可手动输入串口，如仿真下位机的伪终端 /tmp/ttyHAND0
+        if self.port:
+            self.port_combo.setCurrentText(self.port)
         self.port_combo.setFixedSize(400, 40)  # 固定宽度280px，高度40px
         self.port_combo.setStyleSheet("""
             QComboBox {
@@ -663,7 +899,7 @@ class MainWindow(QMainWindow):
             self.stop_program()
 
     def start_program(self):
-        """开始程序按钮处理函数"""
+        """开始程序按钮处理函数：打开串口，协商协议（后台线程）后再启动各线程"""
         self.toggle_btn.setEnabled(False)  # 防止重复点击
         self.status_text.setText("系统正在启动...")
         
@@ -680,18 +916,102 @@ class MainWindow(QMainWindow):
                 write_timeout=1
             )
             self.status_text.setText(f"串口 {self.ser.port} 打开成功")
+            ports = [self.ser]
+
+            # 双手模式打开左手串口（未指定时左手只显示不发送）
+            if self.dual_hand and self.left_port:
+                self.left_ser = serial.Serial(
+                    port=self.left_port,
+                    baudrate=9600,
+                    timeout=0.1,
+                    write_timeout=1
+                )
+                ports.append(self.left_ser)
+                self.status_text.setText(f"串口 {self.ser.port} / {self.left_ser.port} 打开成功")
+        except serial.SerialException as e:
+            self.status_text.setText(f"串口打开失败: {e}")
+            self.toggle_btn.setEnabled(True)
+            return
+        except Exception as e:
+            self.status_text.setText(f"启动程序失败: {e}")
+            self.toggle_btn.setEnabled(True)
+            return
+
+        if not self.binary_baud:
+            self.continue_start([None] * len(ports))
+            return
+        self.negotiator = ProtocolNegotiator(ports, self.binary_baud, self)
+        self.negotiator.update_status.connect(self.update_status)
+        self.negotiator.negotiated.connect(self.on_negotiated)
+        self.negotiator.start()
+
+    def on_negotiated(self, encoders):
+        if self.sender() is not self.negotiator:
+            return  # 协商期间程序已结束
+        self.negotiator = None
+        self.continue_start(encoders)
+
+    def start_writer(self, ser, tracker):
+        """
+        启动串口写线程：写出前记录发送时间，写完后报告发送成功，写超时撤销发送记录
+        回调在写线程中执行，经 serial_status 信号转到GUI线程
+        """
+        def written(data):
+            command = sent_command(data)
+            if command is not None:  # 比例控制帧频率高，不逐条报告
+                self.serial_status.emit(f"[发送成功]: {command[0]}")
+
+        def timed_out(data, start):
+            tracker.cancel(data, start)
+            command = sent_command(data)
+            if command is not None:
+                self.serial_status.emit(f"串口 {ser.port} 写超时，已丢弃: {command[0]}")
+
+        return SerialWriter(ser, on_write=tracker.sent, on_written=written, on_timeout=timed_out).start()
+
+    def continue_start(self, encoders):
+        """
+        串口协议确定后启动写线程、监听线程和视频处理线程
+        :param encoders: 与已打开串口（右手、左手）对应的 FrameEncoder，None为文本指令
+        """
+        try:
+            self.encoder = encoders[0]
+            self.latency = LatencyTracker("right" if self.dual_hand else "main")
+            self.writer = self.start_writer(self.ser, self.latency)
             
             # 启动串口监听线程
-            self.serial_thread = threading.Thread(
-                target=serial_monitor, 
-                args=(self.ser, self.update_status),
-                daemon=True
-            )
-            self.serial_thread.start()
+            self.serial_thread = serial_monitor(self.ser, self.serial_status, self.latency)
+
+            if self.dual_hand and self.left_port:
+                self.left_encoder = encoders[1]
+                self.left_latency = LatencyTracker("left")
+                self.left_writer = self.start_writer(self.left_ser, self.left_latency)
+                self.left_serial_thread = serial_monitor(self.left_ser, self.serial_status, self.left_latency)
             
             # 启动视频处理线程
-            self.detector = HandDetector(maxHands=1, detectionCon=0.7)
-            self.video_thread = VideoThread(self.detector, self.ser, self)  # 传递self作为parent
+            detector_cls = RemoteHandDetector if self.inference_process else HandDetector
+            self.detector = detector_cls(maxHands=2 if self.dual_hand else 1,
+                                         detectionCon=0.7, roiMode=True, rgbInput=True,
+                                         backend=self.detector_backend,
+                                         modelComplexity=self.model_complexity,
+                                         delegate=self.delegate)
+            if self.flow_interval > 1:
+                self.detector = FlowTracker(self.detector, detectInterval=self.flow_interval)
+            self.video_thread = VideoThread(self.detector, self.writer, self,  # 传递self作为parent
+                                            source=self.source, source_mode=self.source_mode,
+                                            dual_hand=self.dual_hand, left_ser=self.left_writer,
+                                            stream_rate=self.stream_rate,
+                                            gestures=GestureLibrary(self.gesture_library)
+                                            if self.gesture_library else None,
+                                            motion=self.motion_gestures,
+                                            finger_model=FingerClassifier.load(self.finger_model)
+                                            if self.finger_model else None,
+                                            smoothing=self.smoothing,
+                                            vote_window_ms=self.vote_window_ms,
+                                            encoder=self.encoder, left_encoder=self.left_encoder,
+                                            latency=self.latency, left_latency=self.left_latency)
+            if self.flow_interval > 1:
+                self.video_thread.skip_frames = 0  # 光流帧很便宜，不再跳帧
             self.video_thread.update_frame.connect(self.update_video_frame)
             self.video_thread.update_status.connect(self.update_status)
             self.video_thread.start()
@@ -702,13 +1022,10 @@ class MainWindow(QMainWindow):
             self.update_button_style()
             self.toggle_btn.setEnabled(True)
             
-        except serial.SerialException as e:
-            self.status_text.setText(f"串口打开失败: {e}")
-            self.toggle_btn.setEnabled(True)
         except Exception as e:
             self.status_text.setText(f"启动程序失败: {e}")
             self.toggle_btn.setEnabled(True)
-    
+
     def toggle_demo_mode(self):
         """切换演示模式"""
         if hasattr(self, 'video_thread') and self.video_thread.isRunning():
@@ -851,6 +1168,11 @@ class MainWindow(QMainWindow):
         """结束程序按钮处理函数"""
         self.toggle_btn.setEnabled(False)  # 防止重复点击
         self.status_text.setText("系统正在关闭...")
+
+        # 协商尚未完成（启动过程中关闭窗口）：等协商线程结束后再关闭串口
+        if self.negotiator is not None:
+            self.negotiator.wait()
+            self.negotiator = None
         
         # 停止音乐可视化
         if hasattr(self, 'music_timer'):
@@ -865,16 +1187,35 @@ class MainWindow(QMainWindow):
         if hasattr(self, 'video_thread') and self.video_thread.isRunning():
             self.video_thread.stop()
         
-        # 关闭串口
+        # 释放检测器（独立推理进程会随之退出）
+        if hasattr(self, 'detector'):
+            self.detector.close()
+            del self.detector
+
+        # 停止写线程（先写出最后一条指令）和监听线程，再关闭串口
+        for worker in (self.writer, self.left_writer, self.serial_thread, self.left_serial_thread):
+            if worker is not None:
+                worker.stop()
+        self.writer = self.left_writer = None
+        self.serial_thread = self.left_serial_thread = None
+        trackers = [tracker for tracker in (self.latency, self.left_latency) if tracker is not None]
+        if trackers and self.latency_log:
+            export_latency(self.latency_log, trackers)
+            print(f"指令往返延迟已导出: {self.latency_log}")
+        self.latency = self.left_latency = None
         if self.ser and self.ser.is_open:
             self.ser.close()
             self.status_text.setText("串口已关闭")
+        if self.left_ser and self.left_ser.is_open:
+            self.left_ser.close()
         
         # 更新状态
         self.is_running = False
         self.toggle_btn.setText("开始程序")
         self.update_button_style()
-        self.video_label.setText("等待视频流...")
+        previous = self.video_label.setText("等待视频流...")
+        if previous is not None and hasattr(self, 'video_thread'):
+            self.video_thread.work_pool.release(previous)
         self.status_text.setText("系统已停止")
         self.toggle_btn.setEnabled(True)
     
@@ -917,38 +1258,27 @@ class MainWindow(QMainWindow):
             self.music_timer.stop()
             self.music_viz_label.setText("音乐播放结束")
 
-    def update_video_frame(self, frame):
-        """更新视频帧显示，确保铺满视频区域"""
-        height, width, channel = frame.shape
-        bytes_per_line = channel * width
-        qt_image = QImage(frame.data, width, height, bytes_per_line, QImage.Format_RGB888)
-        # 让视频帧自适应视频标签大小，保持比例并平滑缩放
-        self.video_label.setPixmap(QPixmap.fromImage(qt_image).scaled(
-            self.video_label.size(), 
-            Qt.KeepAspectRatio, 
-            Qt.SmoothTransformation
-        ))
+    def update_video_frame(self, frame, overlay):
+        """更新视频帧显示：原始帧和叠加层交给 VideoView，重绘时按控件大小绘制"""
+        previous = self.video_label.set_frame(frame, overlay)
+        # 上一帧不再显示，归还缓冲给视频线程复用
+        if previous is not None and hasattr(self, 'video_thread'):
+            self.video_thread.work_pool.release(previous)
     
     def update_status(self, message):
         """更新状态文本"""
         self.status_text.setText(message)
     
-    def resizeEvent(self, event):
-        """窗口大小变化时，更新视频显示"""
-        if hasattr(self, 'video_label') and self.video_label.pixmap():
-            self.video_label.setPixmap(self.video_label.pixmap().scaled(
-                self.video_label.size(), 
-                Qt.KeepAspectRatio, 
-                Qt.SmoothTransformation
-            ))
-        super().resizeEvent(event)
-    
     def closeEvent(self, event):
         """窗口关闭事件处理"""
         self.stop_program()
         event.accept()
 
 if __name__ == "__main__":
+    # 打包成exe后子进程需要
+    import multiprocessing
+    multiprocessing.freeze_support()
+
     # 添加全局异常处理
     def exception_hook(exctype, value, tb):
         print(f"全局异常捕获: {exctype}, {value}")
@@ -958,12 +1288,63 @@ if __name__ == "__main__":
     
     sys._excepthook = sys.excepthook
     sys.excepthook = exception_hook
+
+    # 命令行参数：--source 指定视频文件/图片目录，--unthrottled 不限速回放（测最大吞吐量）
+    import argparse
+    parser = argparse.ArgumentParser(description="手势控制系统")
+    parser.add_argument("--source", default="0", help="摄像头编号、视频文件(MP4/AVI)或图片目录(PNG/JPEG)")
+    parser.add_argument("--unthrottled", action="store_true", help="文件回放不按原始时间戳限速")
+    parser.add_argument("--worker", action="store_true", help="在独立进程中运行MediaPipe推理")
+    parser.add_argument("--backend", default=SOLUTIONS, choices=[SOLUTIONS, TASKS_VIDEO, TASKS_LIVE],
+                        help="推理后端")
+    parser.add_argument("--model-complexity", type=int, default=1, choices=[0, 1],
+                        help="solutions后端模型复杂度，0更快")
+    parser.add_argument("--delegate", default="cpu", choices=["cpu", "gpu"], help="Tasks后端计算设备")
+    parser.add_argument("--flow-interval", type=int, default=1,
+                        help="每N帧运行一次MediaPipe，中间帧光流跟踪（1为关闭）")
+    parser.add_argument("--port", default=None, help="串口，默认取界面选择（仿真下位机时填伪终端路径）")
+    parser.add_argument("--dual-hand", action="store_true", help="双手模式：左右手分别控制两只机械手")
+    parser.add_argument("--left-port", default=None, help="双手模式下左手机械手的串口")
+    parser.add_argument("--proportional", type=float, nargs="?", const=20.0, default=None, metavar="HZ",
+                        help="比例控制模式：按固定频率发送各手指目标位置（默认20Hz）")
+    parser.add_argument("--gestures", nargs="?", const=DEFAULT_LIBRARY_PATH, default=None, metavar="PATH",
+                        help="启用手势模板识别（模板用 gesture_library.py record 录制）")
+    parser.add_argument("--motion", action="store_true", help="识别挥动、摆手、手指点击等动态手势")
+    parser.add_argument("--finger-model", nargs="?", const=DEFAULT_CLASSIFIER_PATH, default=None, metavar="PATH",
+                        help="用训练好的分类器判断手指状态（见 finger_classifier.py）")
+    parser.add_argument("--one-euro", action="store_true", help="关键点One Euro滤波去抖（默认同时取消投票窗口）")
+    parser.add_argument("--euro-cutoff", type=float, default=1.5, help="One Euro 静止截止频率(Hz)，越小越平滑")
+    parser.add_argument("--euro-beta", type=float, default=0.01, help="One Euro 速度系数，越大跟手越快")
+    parser.add_argument("--vote-window", type=int, default=None, help="手指状态投票窗口(ms)")
+    parser.add_argument("--latency-log", nargs="?", const="latency.csv", default=None, metavar="PATH",
+                        help="结束时导出指令->收到/动作完成的往返延迟记录和直方图(CSV)")
+    parser.add_argument("--binary", type=int, nargs="?", const=FAST_BAUDRATE, default=None, metavar="BAUD",
+                        help="使用带CRC的二进制帧协议并协商波特率（默认115200）")
+    args, qt_args = parser.parse_known_args()
     
-    app = QApplication(sys.argv)
+    app = QApplication(sys.argv[:1] + qt_args)
     # 设置全局字体，确保中文显示正常 
     font = app.font()
     font.setFamily("SimHei")  # Windows/Linux默认中文字体
     app.setFont(font)
     
-    window = MainWindow()
+    window = MainWindow(source=args.source,
+                        source_mode=UNTHROTTLED if args.unthrottled else PACED,
+                        inference_process=args.worker,
+                        backend=args.backend,
+                        model_complexity=args.model_complexity,
+                        delegate=args.delegate,
+                        flow_interval=args.flow_interval,
+                        dual_hand=args.dual_hand,
+                        left_port=args.left_port,
+                        stream_rate=args.proportional,
+                        gesture_library=args.gestures,
+                        motion_gestures=args.motion,
+                        finger_model=args.finger_model,
+                        smoothing=dict(min_cutoff=args.euro_cutoff, beta=args.euro_beta)
+                        if args.one_euro else None,
+                        vote_window_ms=args.vote_window,
+                        binary_baud=args.binary,
+                        latency_log=args.latency_log,
+                        port=args.port)
     sys.exit(app.exec_())
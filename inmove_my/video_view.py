@@ -0,0 +1,147 @@
+from PyQt5.QtCore import Qt, QRectF, QPointF
+from PyQt5.QtGui import QImage, QPainter, QPen, QColor, QFont
+from PyQt5.QtWidgets import QWidget
+
+from finger_state import FINGER_NAMES, STATE_BITS
+from hand_detector import HAND_CONNECTIONS
+
+
+def _qcolor(bgr):
+    """沿用OpenCV的BGR颜色参数"""
+    return QColor(bgr[2], bgr[1], bgr[0])
+
+
+class VideoView(QWidget):
+    """
+    视频显示控件：视频线程只提供原始RGB帧和叠加层数据（关键点、手指状态、FPS等），
+    镜像、缩放、骨架和HUD文字都在重绘时用QPainter按显示分辨率绘制，全屏时文字依然清晰
+    帧缓冲不拷贝，直到下一帧到来时才交还给调用方
+    """
+
+    def __init__(self, text="", parent=None):
+        super().__init__(parent)
+        self._text = text
+        self._frame = None
+        self._image = None
+        self._overlay = None
+        self._fonts = {}
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.setMinimumSize(1, 1)
+
+    def setText(self, text):
+        """显示提示文字并清除画面，返回之前持有的帧缓冲"""
+        previous = self._frame
+        self._text = text
+        self._frame = self._image = self._overlay = None
+        self.update()
+        return previous
+
+    def set_frame(self, frame, overlay=None):
+        """
+        显示新的一帧，返回之前持有的帧缓冲（可以归还复用）
+        :param frame: RGB帧（未镜像）
+        :param overlay: 叠加层数据，见 VideoThread._render_stage
+        """
+        previous = self._frame
+        height, width, channel = frame.shape
+        self._frame = frame
+        self._image = QImage(frame.data, width, height, channel * width, QImage.Format_RGB888)
+        self._overlay = overlay
+        self.update()
+        return previous
+
+    def _font(self, size):
+        font = self._fonts.get(size)
+        if font is None:
+            font = QFont("SimHei")
+            font.setPixelSize(size)
+            self._fonts[size] = font
+        return font
+
+    def _draw_text(self, painter, text, position, size=16, color=(255, 255, 0)):
+        """position为文本左上角（帧坐标），与原先PIL绘制一致"""
+        painter.setFont(self._font(size))
+        painter.setPen(_qcolor(color))
+        painter.drawText(QRectF(position[0], position[1], 2000, size * 1.5),
+                         Qt.AlignLeft | Qt.AlignTop, text)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.black)
+        if self._image is None:
+            painter.setPen(Qt.white)
+            painter.drawText(self.rect(), Qt.AlignCenter, self._text)
+            return
+
+        # 保持比例铺满控件，之后所有绘制都使用帧坐标
+        width, height = self._image.width(), self._image.height()
+        scale = min(self.width() / width, self.height() / height)
+        painter.translate((self.width() - width * scale) / 2, (self.height() - height * scale) / 2)
+        painter.scale(scale, scale)
+        painter.setRenderHints(QPainter.SmoothPixmapTransform | QPainter.Antialiasing |
+                               QPainter.TextAntialiasing)
+
+        # 镜像显示（关键点坐标已是镜像后的）
+        painter.save()
+        painter.translate(width, 0)
+        painter.scale(-1, 1)
+        painter.drawImage(0, 0, self._image)
+        painter.restore()
+
+        if self._overlay is not None:
+            self._draw_skeleton(painter, width, height)
+            self._draw_hud(painter)
+
+    def _draw_skeleton(self, painter, width, height):
+        for hand in self._overlay["landmarks"]:
+            points = [QPointF(x * width, y * height) for x, y, _ in hand]
+            painter.setPen(QPen(QColor(224, 224, 224), 2))
+            for start, end in HAND_CONNECTIONS:
+                painter.drawLine(points[start], points[end])
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor(255, 0, 0))
+            for point in points:
+                painter.drawEllipse(point, 3, 3)
+            painter.setBrush(Qt.NoBrush)
+
+    def _draw_hud(self, painter):
+        overlay = self._overlay
+        if overlay["fps"]:
+            self._draw_text(painter, f"实际FPS: {int(overlay['fps'])}", (10, 50), 18, (255, 0, 255))
+        self._draw_text(painter, f"投票窗口: {overlay['vote_window_ms']}ms" + (" + One Euro" if overlay["smoothing"] else ""),
+                        (10, 80), 18, (255, 255, 0))
+        self._draw_text(painter, f"帧计数: {overlay['frame_count']}", (10, 110), 18, (255, 255, 0))
+        if overlay["grabber"] is not None:
+            stats = overlay["grabber"]
+            self._draw_text(painter, f"丢弃旧帧: {stats['dropped']} ({stats['drop_rate']:.0%})", (10, 140), 18, (255, 255, 0))
+        if overlay["queues"] is not None:
+            depths = " ".join(f"{name}:{depth}/{maxsize}" for name, (depth, maxsize) in overlay["queues"].items())
+            self._draw_text(painter, f"队列 {depths}", (10, 170), 16, (255, 255, 0))
+
+        y_offset = 200
+        # 显示手的左右信息
+        if overlay["handTypes"]:
+            self._draw_text(painter, f"检测到: {', '.join(overlay['handTypes'])}", (10, y_offset), 16, (255, 255, 255))
+            y_offset += 30
+
+        # 双手模式每只手一列
+        for column, (label, state, flexion, gesture) in enumerate(overlay["hands"]):
+            x = 10 + column * 220
+            y = y_offset
+            if label:
+                self._draw_text(painter, label, (x, y), 16, (255, 255, 255))
+                y += 30
+            if gesture:
+                self._draw_text(painter, f"手势: {gesture}", (x, y), 16, (0, 255, 255))
+                y += 30
+            for i, (name, bent) in enumerate(zip(FINGER_NAMES, STATE_BITS[state])):
+                color = (0, 255, 0) if bent else (0, 0, 255)
+                self._draw_text(painter, f"{name}: {'弯曲' if bent else '伸直'} {flexion[i]:.2f}",
+                                (x, y + i * 30), 16, color)
+            # 指令往返延迟中位数：链路（下位机收到）/ 动作完成（含舵机扫动）
+            link = overlay["links"].get(label)
+            if link is not None:
+                receive, complete = link["receive_ms"], link["complete_ms"]
+                self._draw_text(painter, "链路 " + (f"{receive['p50']:.1f}ms" if receive["count"] else "--") +
+                                " / 动作 " + (f"{complete['p50']:.0f}ms" if complete["count"] else "--"),
+                                (x, y + len(FINGER_NAMES) * 30), 16, (255, 255, 0))
@@ -46,14 +46,43 @@
 #define MAX_ITERATIONS 150
 #define STEP_SIZE 10
 #define GESTURE_LENGTH 6
+#define POSITION_LENGTH 13   // 比例控制指令：'P' + 6个两位十六进制位置
+#define POSITION_MAX 255     // 位置0为伸直，255为弯曲
+#define DEFAULT_BAUD 9600
+
+// 二进制帧：SYNC | 版本<<4|类型 | 序号 | 负载长度 | 负载 | CRC8（多项式0x07，覆盖同步字节之后到负载结束）
+#define FRAME_SYNC 0xA5
+#define FRAME_VERSION 1
+#define FRAME_HEADER 4
+#define FRAME_MAX_PAYLOAD 16
+#define FRAME_STATE 0x1      // 1字节6位手指状态码，最高位为手腕
+#define FRAME_POSITIONS 0x2  // 6字节目标位置
+#define FRAME_BAUD 0x3       // 4字节小端新波特率
+#define FRAME_PING 0x4       // 无负载，回复 "Pong"
+#define FRAME_TIMEOUT_MS 20      // 帧内字节间隔超时，丢弃残帧
+#define BAUD_CONFIRM_MS 1000     // 切换波特率后该时间内未收到有效帧则恢复默认波特率
 
 Adafruit_PWMServoDriver pwm = Adafruit_PWMServoDriver();
 
 bool state0[GESTURE_LENGTH] = {false, false, false, false, false, false};
 bool state1[GESTURE_LENGTH] = {false, false, false, false, false, false};
 bool change = false;
-char sData;
-String state;
+volatile uint8_t targetPos[GESTURE_LENGTH] = {0, 0, 0, 0, 0, 0};
+volatile bool positionUpdate = false;
+// 各舵机当前位置 0(伸直)~255(弯曲)：比例控制可能停在中间位置，state1只是其阈值化结果
+uint8_t currentPos[GESTURE_LENGTH] = {0, 0, 0, 0, 0, 0};
+
+// 接收解析状态（固定缓冲，不做String拼接）
+uint8_t frame[FRAME_HEADER + FRAME_MAX_PAYLOAD + 1];
+uint8_t frameLength = 0;             // 已收到的帧字节数，0表示不在帧内
+unsigned long lastByteTime = 0;
+char line[POSITION_LENGTH + 1];      // 文本指令缓冲，兼容旧上位机
+uint8_t lineLength = 0;
+unsigned long baudConfirmDeadline = 0;
+unsigned long crcErrors = 0;
+// 最近一条二进制状态指令的序号，回显时附带 " #序号" 供上位机匹配确认
+volatile uint8_t stateSeq = 0;
+volatile bool stateSeqValid = false;
 
 // 手指对应的舵机通道
 const int wrist = 0;
@@ -125,48 +154,199 @@ bool validateGestureData(String data) {
   return true;
 }
 
+// 解析比例控制指令，如 "P00FF8033FC00"
+bool parsePositionData(String data) {
+  if (data.length() != POSITION_LENGTH || data.charAt(0) != 'P') {
+    Serial.println("Error: Invalid position data");
+    return false;
+  }
+  uint8_t values[GESTURE_LENGTH];
+  for (int i = 0; i < GESTURE_LENGTH; i++) {
+    String hex = data.substring(1 + 2 * i, 3 + 2 * i);
+    char *end;
+    long value = strtol(hex.c_str(), &end, 16);
+    if (*end != '\0') {
+      Serial.println("Error: Invalid character in position data");
+      return false;
+    }
+    values[i] = value;
+  }
+  for (int i = 0; i < GESTURE_LENGTH; i++) {
+    targetPos[i] = values[i];
+  }
+  return true;
+}
+
+// 按比例把手指直接移动到目标位置
+void setFingerPosition(int fingerId, uint8_t position) {
+  int straighten, flex;
+  getPwmRange(fingerId, straighten, flex);
+  int currentPwm = straighten + (long)(flex - straighten) * position / POSITION_MAX;
+  pwm.setPWM(fingerId, 0, currentPwm);
+}
+
+// 手指需要扫动：状态改变，或比例控制后停在中间位置、不在目标端点上
+bool needsMove(int i) {
+  return state0[i] != state1[i] || currentPos[i] != (state0[i] ? POSITION_MAX : 0);
+}
+
 // 检查手指状态是否变化
 bool hasStateChanged() {
   for (int i = 0; i < GESTURE_LENGTH; i++) {
-    if (state0[i] != state1[i]) {
+    if (needsMove(i)) {
       return true;
     }
   }
   return false;
 }
 
-// 数据接收任务函数
+uint8_t crc8(const uint8_t *data, size_t length) {
+  uint8_t crc = 0;
+  for (size_t i = 0; i < length; i++) {
+    crc ^= data[i];
+    for (int bit = 0; bit < 8; bit++) {
+      crc = (crc & 0x80) ? (crc << 1) ^ 0x07 : crc << 1;
+    }
+  }
+  return crc;
+}
+
+// 各帧类型的负载长度，未知类型返回-1
+int payloadLength(uint8_t type) {
+  switch (type) {
+    case FRAME_STATE: return 1;
+    case FRAME_POSITIONS: return GESTURE_LENGTH;
+    case FRAME_BAUD: return 4;
+    case FRAME_PING: return 0;
+    default: return -1;
+  }
+}
+
+// 处理一个校验通过的二进制帧
+void handleFrame(uint8_t type, uint8_t seq, const uint8_t *payload) {
+  switch (type) {
+    case FRAME_STATE:
+      for (int i = 0; i < GESTURE_LENGTH; i++) {
+        state0[i] = (payload[0] >> (GESTURE_LENGTH - 1 - i)) & 1;
+      }
+      stateSeq = seq;
+      stateSeqValid = true;
+      change = true;
+      Serial.print("Received: ");
+      for (bool s : state0) Serial.print(s ? "1" : "0");
+      Serial.print(" #");
+      Serial.println(seq);
+      break;
+    case FRAME_POSITIONS:
+      // 比例控制指令高频下发，不回显
+      for (int i = 0; i < GESTURE_LENGTH; i++) {
+        targetPos[i] = payload[i];
+      }
+      positionUpdate = true;
+      break;
+    case FRAME_BAUD: {
+      uint32_t baud = payload[0] | (uint32_t)payload[1] << 8 | (uint32_t)payload[2] << 16 | (uint32_t)payload[3] << 24;
+      Serial.print("Baud: ");
+      Serial.println(baud);
+      Serial.flush();
+      Serial.updateBaudRate(baud);
+      // 新波特率下收到第一个有效帧才算确认
+      baudConfirmDeadline = millis() + BAUD_CONFIRM_MS;
+      return;
+    }
+    case FRAME_PING:
+      Serial.println("Pong");
+      break;
+  }
+  baudConfirmDeadline = 0;
+}
+
+// 二进制帧逐字节解析，帧头非法或CRC错误时丢弃整帧
+void parseFrameByte(uint8_t b) {
+  frame[frameLength++] = b;
+  if (frameLength == FRAME_HEADER) {
+    if ((frame[1] >> 4) != FRAME_VERSION || payloadLength(frame[1] & 0x0F) != frame[3]) {
+      Serial.println("Error: Unsupported frame");
+      frameLength = 0;
+    }
+  } else if (frameLength > FRAME_HEADER && frameLength == FRAME_HEADER + frame[3] + 1) {
+    if (crc8(frame + 1, frameLength - 2) == frame[frameLength - 1]) {
+      handleFrame(frame[1] & 0x0F, frame[2], frame + FRAME_HEADER);
+    } else {
+      crcErrors++;
+      Serial.print("Error: CRC mismatch (");
+      Serial.print(crcErrors);
+      Serial.println(")");
+    }
+    frameLength = 0;
+  }
+}
+
+// 文本指令逐字节解析（"011111\n" 或 "P00FF8033FC00\n"）
+void parseTextByte(char c) {
+  if (c == '\n') {
+    line[lineLength] = '\0';
+    String data(line);
+    if (line[0] == 'P') {
+      // 比例控制指令高频下发，不回显
+      if (parsePositionData(data)) {
+        positionUpdate = true;
+      }
+    } else if (validateGestureData(data)) {
+      for (int i = 0; i < GESTURE_LENGTH; i++) {
+        state0[i] = (line[i] == '1');
+      }
+      stateSeqValid = false;
+      change = true;
+      Serial.print("Received: ");
+      Serial.println(data);
+    }
+    lineLength = 0;
+  } else if (isHexadecimalDigit(c) || c == 'P') {
+    if (lineLength < POSITION_LENGTH) {
+      line[lineLength++] = c;
+    } else {
+      lineLength = 0;
+    }
+  }
+}
+
+// 数据接收任务函数：有数据时逐字节处理，不再逐字节延时
 void receiveDataCode(void * parameter) {
   for (;;) {
     while (Serial.available()) {
-      sData = Serial.read();
-      delay(2);
-      if (sData == '\n') {
-        if (validateGestureData(state)) {
-          for (int i = 0; i < GESTURE_LENGTH; i++) {
-            state0[i] = (state.charAt(i) == '1');
-          }
-          change = true;
-          Serial.print("Received: ");
-          Serial.println(state);
-        }
-        state = "";
-      } else if (sData >= '0' && sData <= '1') {
-        state += sData;
-      }
-      if (state.length() > GESTURE_LENGTH) {
-        state = "";
+      uint8_t b = Serial.read();
+      lastByteTime = millis();
+      if (frameLength > 0) {
+        parseFrameByte(b);
+      } else if (b == FRAME_SYNC) {
+        frame[0] = b;
+        frameLength = 1;
+      } else {
+        parseTextByte(b);
       }
     }
-    delay(2);
+    if (frameLength > 0 && millis() - lastByteTime > FRAME_TIMEOUT_MS) {
+      frameLength = 0;
+    }
+    // 主机没有在新波特率下确认，恢复默认波特率
+    if (baudConfirmDeadline && (long)(millis() - baudConfirmDeadline) > 0) {
+      baudConfirmDeadline = 0;
+      Serial.updateBaudRate(DEFAULT_BAUD);
+    }
+    delay(1);
   }
 }
 
-// 移动手指函数
-void moveFinger(int fingerId, bool targetFlex, int iteration) {
+// 移动手指函数：在端点上的手指从另一端点扫到目标端点，
+// 停在中间位置的手指从扫动开始时的位置 startPos 出发
+void moveFinger(int fingerId, uint8_t startPos, bool targetFlex, int iteration) {
   int straighten, flex;
   getPwmRange(fingerId, straighten, flex);
   int startPwm = targetFlex ? straighten : flex;
+  if (startPos != 0 && startPos != POSITION_MAX) {
+    startPwm = straighten + (long)(flex - straighten) * startPos / POSITION_MAX;
+  }
   int endPwm = targetFlex ? flex : straighten;
   float progress = (float)iteration / MAX_ITERATIONS;
   int currentPwm = startPwm + (endPwm - startPwm) * progress;
@@ -176,7 +356,7 @@ void moveFinger(int fingerId, bool targetFlex, int iteration) {
 TaskHandle_t receiveData; // 任务句柄
 
 void setup() {
-  Serial.begin(9600);
+  Serial.begin(DEFAULT_BAUD);
   Serial.println("ESP32 Hand Control Started");
 
   Wire.begin();
@@ -198,20 +378,42 @@ void setup() {
 }
 
 void loop() {
+  // 比例控制：舵机直接转到指令位置，不做150步扫动
+  if (positionUpdate) {
+    positionUpdate = false;
+    for (int j = 0; j < GESTURE_LENGTH; j++) {
+      setFingerPosition(fingerPins[j], targetPos[j]);
+      currentPos[j] = targetPos[j];
+      state1[j] = targetPos[j] > POSITION_MAX / 2;
+    }
+  }
   if (change && hasStateChanged()) {
     Serial.println("Processing gesture change...");
+    uint8_t startPos[GESTURE_LENGTH];
+    memcpy(startPos, currentPos, sizeof(currentPos));
     for (int i = 0; i <= MAX_ITERATIONS; i += STEP_SIZE) {
       for (int j = 0; j < GESTURE_LENGTH; j++) {
-        if (state0[j] != state1[j]) {
-          moveFinger(fingerPins[j], state0[j], i);
+        if (needsMove(j)) {
+          moveFinger(fingerPins[j], startPos[j], state0[j], i);
         }
       }
       delay(5);
     }
+    // 扫动期间可能收到新指令（每步都重新读取state0），
+    // 序号与复制的state0同时读取，回显的序号对应打印出的状态
+    uint8_t seq = stateSeq;
+    bool hasSeq = stateSeqValid;
     memcpy(state1, state0, sizeof(state0));
+    for (int j = 0; j < GESTURE_LENGTH; j++) {
+      currentPos[j] = state1[j] ? POSITION_MAX : 0;
+    }
     change = false;
     Serial.print("Current state: ");
     for (bool s : state1) Serial.print(s ? "1" : "0");
+    if (hasSeq) {
+      Serial.print(" #");
+      Serial.print(seq);
+    }
     Serial.println();
   }
   delay(5);